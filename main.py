@@ -1,19 +1,20 @@
-import asyncio
-from multiprocessing import Process
-from starkbank_webhook_test.constants import PRIVATE_KEY_PATH
-from starkbank_webhook_test.services.invoice_generator import (
-    SETTINGS_FILE_PATH as INVOICE_GENERATOR_SETTINGS_FILE,
+from starkbank_webhook_test.constants import (
+    INVOICE_GENERATOR_SETTINGS_PATH,
+    PRIVATE_KEY_PATH,
+    TRANSFER_GENERATOR_SETTINGS_PATH,
 )
-from starkbank_webhook_test.services.transfer_generator import (
-    SETTINGS_FILE_PATH as TRANSFER_GENERATOR_SETTINGS_FILE,
-)
-from starkbank_webhook_test.services.transfer_generator import TransferGeneratorService
-from starkbank_webhook_test.services.invoice_generator import InvoiceGeneratorService
+from starkbank_webhook_test.supervisor import ServiceSupervisor
 
 
+# The services are imported by the worker processes, so the supervisor starts
+# without loading the Stark Bank SDK, Faker and requests
 def invoice_generator():
+    from starkbank_webhook_test.services.invoice_generator import (
+        InvoiceGeneratorService,
+    )
+
     invoice_generator_service = InvoiceGeneratorService(
-        settings_file_path=INVOICE_GENERATOR_SETTINGS_FILE,
+        settings_file_path=INVOICE_GENERATOR_SETTINGS_PATH,
         private_key_path=PRIVATE_KEY_PATH,
     )
 
@@ -21,22 +22,37 @@ def invoice_generator():
 
 
 def transfer_generator():
+    from starkbank_webhook_test.services.transfer_generator import (
+        TransferGeneratorService,
+    )
+
     transfer_generator_service = TransferGeneratorService(
-        settings_file_path=TRANSFER_GENERATOR_SETTINGS_FILE,
+        settings_file_path=TRANSFER_GENERATOR_SETTINGS_PATH,
         private_key_path=PRIVATE_KEY_PATH,
     )
 
     transfer_generator_service.run()
 
-async def main():
-    loop = asyncio.get_event_loop()    
-    tasks = [
-        loop.run_in_executor(None, invoice_generator),
-        loop.run_in_executor(None, transfer_generator),
-    ]
-    
-    await asyncio.gather(*tasks)
+
+def main():
+    supervisor = ServiceSupervisor()
+    supervisor.add_service(
+        'invoice_generator',
+        invoice_generator,
+        workers=ServiceSupervisor.load_workers(
+            INVOICE_GENERATOR_SETTINGS_PATH
+        ),
+    )
+    supervisor.add_service(
+        'transfer_generator',
+        transfer_generator,
+        workers=ServiceSupervisor.load_workers(
+            TRANSFER_GENERATOR_SETTINGS_PATH
+        ),
+    )
+
+    supervisor.run()
 
 
-if __name__ == "__main__":    
-    asyncio.run(main())
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.starkbank_integration import (
+    INVOICE_BATCH_LIMIT,
+    StarkbankIntegration,
+    StarkbankIntegrationError,
+)
+
+async_integration_logger = logging.getLogger('async_starkbank_integration')
+async_integration_logger.setLevel(logging.DEBUG)
+
+
+class AsyncStarkbankIntegration:
+    """
+    An asyncio interface for integrating with Stark Bank API.
+
+    The Stark Bank SDK and the webhook polling are blocking, so each call runs
+    on a dedicated thread pool sized to the concurrency limit, while a
+    semaphore bounds how many requests are in flight at the same time.
+
+    Attributes:
+        - integration (StarkbankIntegration): The underlying blocking integration.
+        - max_concurrency (int): The maximum number of requests in flight.
+    """
+
+    def __init__(
+        self,
+        environment: str,
+        id: str,
+        private_key: str,
+        auth_type: str,
+        webhook_url: str,
+        max_concurrency: int = 100,
+    ):
+        """
+        Initialize the AsyncStarkbankIntegration with the required data.
+
+        Args:
+            - environment (str): The environment ('sandbox' or 'production').
+            - id (str): The user ID (Project ID or Organization ID).
+            - private_key (str): The private key content for ECDSA authentication.
+            - auth_type (str): The type of authentication ('project' or 'organization').
+            - webhook_url (str): The URL for the webhook.
+            - max_concurrency (int): The maximum number of requests in flight.
+        """
+        if max_concurrency < 1:
+            raise StarkbankIntegrationError(
+                'Invalid parameter: max_concurrency must be positive'
+            )
+
+        self.integration = StarkbankIntegration(
+            environment,
+            id,
+            private_key,
+            auth_type,
+            webhook_url,
+            connection_pool=ConnectionPool(pool_size=max_concurrency),
+        )
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='starkbank_integration',
+        )
+        self._semaphore = None
+
+    @property
+    def user(self):
+        return self.integration.user
+
+    async def _run(self, function, *args):
+        """
+        Run a blocking call on the thread pool within the concurrency limit.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, partial(function, *args)
+            )
+
+    async def connect(self):
+        """
+        Connect to Stark Bank API using the authenticator and set the user attribute.
+
+        Raises:
+            - StarkbankIntegrationError: If authentication fails.
+        """
+        await self._run(self.integration.connect)
+
+    async def issue_invoices(
+        self, num_invoices, batch_size=INVOICE_BATCH_LIMIT, max_retries=3
+    ):
+        """
+        Issue the specified number of random invoices sending the chunks concurrently.
+
+        Args:
+            num_invoices (int): Number of invoices to issue.
+            batch_size (int): Number of invoices per request.
+            max_retries (int): Number of retries for a failed chunk.
+
+        Returns:
+            list[InvoiceBatchResult]: The result of each chunk, in order.
+        """
+        batch_size = max(1, min(batch_size, INVOICE_BATCH_LIMIT))
+        invoices = []
+        for _ in range(num_invoices):
+            try:
+                invoices.append(
+                    self.integration._build_invoice(
+                        self.integration._generate_random_invoice_data()
+                    )
+                )
+            except StarkbankIntegrationError as sie:
+                async_integration_logger.error(f'Invoice build Error:{sie}')
+
+        chunks = [
+            invoices[start : start + batch_size]
+            for start in range(0, len(invoices), batch_size)
+        ]
+        results = await asyncio.gather(
+            *[
+                self._run(
+                    self.integration._issue_invoice_chunk,
+                    index,
+                    chunk,
+                    max_retries,
+                )
+                for index, chunk in enumerate(chunks)
+            ]
+        )
+
+        for result in results:
+            if not result.succeeded:
+                async_integration_logger.error(
+                    f'Invoice chunk {result.index} Error:{result.error}'
+                )
+
+        return results
+
+    async def create_transfers(self, amounts, external_ids=None):
+        """
+        Create one transfer for each amount, sending the requests concurrently.
+
+        Each transfer is sent with a unique external ID, so a retried request
+        is rejected by Stark Bank instead of paying the transfer twice.
+
+        Args:
+            amounts (list[int]): The amounts to transfer.
+            external_ids (list[str]): The unique ID of each transfer, random
+                ones by default.
+
+        Returns:
+            list: True for each successful transfer or the StarkbankIntegrationError
+                raised by the failed one, in the same order as the amounts.
+        """
+        if external_ids is None:
+            external_ids = [f'transfer-{uuid.uuid4().hex}' for _ in amounts]
+
+        return await asyncio.gather(
+            *[
+                self._run(
+                    self.integration._create_transfer, amount, external_id
+                )
+                for amount, external_id in zip(amounts, external_ids)
+            ],
+            return_exceptions=True,
+        )
+
+    async def listen(self):
+        """
+        Listen to the webhook events.
+
+        Returns:
+            Response: The response containing the webhook events.
+
+        Raises:
+            StarkbankIntegrationError: If an error occurs during webhook listening.
+        """
+        return await self._run(self.integration.listen_webhook_events)
+
+    async def process(self, events_response):
+        """
+        Process the webhook events received in the response.
+
+        Args:
+            events_response (Response): The response containing the events.
+
+        Raises:
+            StarkbankIntegrationError: If an error occurs during event processing.
+        """
+        await self._run(
+            self.integration.process_webhook_events, events_response
+        )
+
+    def close(self):
+        """
+        Wait for the pending requests and release the thread pool.
+        """
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
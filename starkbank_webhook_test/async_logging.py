@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    TimedRotatingFileHandler,
+)
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Format each record as a single JSON object per line.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class BatchedFileHandler(TimedRotatingFileHandler):
+    """
+    A TimedRotatingFileHandler writing many records with a single write.
+    """
+
+    def emit_batch(self, records):
+        """
+        Write the records and flush the file once.
+
+        Args:
+            - records (list[logging.LogRecord]): The records to write.
+        """
+        if not records:
+            return
+
+        try:
+            if self.shouldRollover(records[0]):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+
+            lines = [
+                self.format(record) + self.terminator for record in records
+            ]
+            self.stream.write(''.join(lines))
+            self.flush()
+        except Exception:
+            for record in records:
+                self.handleError(record)
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    A QueueListener handing the queued records to its handlers in batches.
+
+    The dequeued records are buffered until `batch_size` of them are waiting
+    or the queue is empty, and stopping the listener hands over the rest.
+    Handlers with an `emit_batch` method receive the buffered records at
+    once, while the other handlers receive them one by one.
+    """
+
+    def __init__(self, log_queue, *handlers, batch_size: int = 100):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self._batch = []
+
+    def handle(self, record):
+        """
+        Buffer a record, handing over the batch once it is full or the queue
+        is empty.
+        """
+        self._batch.append(self.prepare(record))
+        if len(self._batch) >= self.batch_size or self.queue.empty():
+            self.flush()
+
+    def flush(self):
+        """
+        Hand the buffered records over to the handlers.
+        """
+        records, self._batch = self._batch, []
+        if records:
+            self.handle_batch(records)
+
+    def stop(self):
+        """
+        Stop the listener thread and hand over the buffered records.
+        """
+        super().stop()
+        self.flush()
+
+    def handle_batch(self, records):
+        """
+        Hand a batch of prepared records to each handler above its level.
+        """
+        for handler in self.handlers:
+            accepted = [
+                record for record in records if record.levelno >= handler.level
+            ]
+            if hasattr(handler, 'emit_batch'):
+                handler.acquire()
+                try:
+                    handler.emit_batch(
+                        [
+                            record
+                            for record in accepted
+                            if handler.filter(record)
+                        ]
+                    )
+                finally:
+                    handler.release()
+            else:
+                for record in accepted:
+                    handler.handle(record)
+
+
+class QueueLogging:
+    """
+    A non-blocking logging pipeline writing the records of some loggers to a file.
+
+    The loggers only put their records on an in-memory queue, while a
+    listener thread writes them to a daily rotating file in batches, so a
+    slow disk or a file rotation never stalls the logging thread. Stopping
+    the pipeline writes every queued record before closing the file.
+
+    Attributes:
+        - file_path (str): The path of the log file.
+        - loggers (list[str]): The names of the loggers sent to the file.
+        - json_lines (bool): Write each record as a JSON object per line.
+        - batch_size (int): The maximum number of records written at once.
+        - when (str): The rotation interval of the file.
+        - backup_count (int): The number of rotated files kept.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        loggers: list,
+        json_lines: bool = False,
+        batch_size: int = 100,
+        when: str = 'midnight',
+        backup_count: int = 7,
+        level: int = logging.DEBUG,
+    ):
+        """
+        Initialize the QueueLogging without opening the file.
+
+        Args:
+            - file_path (str): The path of the log file.
+            - loggers (list[str]): The names of the loggers sent to the file.
+            - json_lines (bool): Write each record as a JSON object per line.
+            - batch_size (int): The maximum number of records written at once.
+            - when (str): The rotation interval of the file.
+            - backup_count (int): The number of rotated files kept.
+            - level (int): The minimum level written to the file.
+        """
+        if batch_size < 1:
+            raise ValueError('Invalid batch_size. Use a positive integer.')
+
+        self.file_path = file_path
+        self.loggers = list(loggers)
+        self.json_lines = json_lines
+        self.batch_size = batch_size
+        self.when = when
+        self.backup_count = backup_count
+        self.level = level
+        self._queue_handler = None
+        self._listener = None
+
+    @property
+    def running(self):
+        return self._listener is not None
+
+    def start(self):
+        """
+        Open the file and route the loggers through the queue.
+        """
+        if self.running:
+            return
+
+        os.makedirs(
+            os.path.dirname(os.path.abspath(self.file_path)), exist_ok=True
+        )
+        file_handler = BatchedFileHandler(
+            self.file_path,
+            when=self.when,
+            backupCount=self.backup_count,
+            encoding='utf-8',
+        )
+        file_handler.setLevel(self.level)
+        if self.json_lines:
+            file_handler.setFormatter(JsonLineFormatter())
+
+        log_queue = queue.SimpleQueue()
+        self._queue_handler = QueueHandler(log_queue)
+        self._listener = BatchingQueueListener(
+            log_queue, file_handler, batch_size=self.batch_size
+        )
+        self._listener.start()
+
+        for name in self.loggers:
+            logging.getLogger(name).addHandler(self._queue_handler)
+
+    def stop(self):
+        """
+        Detach the loggers, write the queued records and close the file.
+        """
+        if not self.running:
+            return
+
+        for name in self.loggers:
+            logging.getLogger(name).removeHandler(self._queue_handler)
+
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        self._queue_handler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stop()
@@ -1,7 +1,6 @@
 import os
 
-import starkbank
-from starkbank.error import InputErrors, InternalServerError, InvalidSignatureError
+from starkbank_webhook_test.auth.credential_cache import credential_cache
 
 
 class Authenticator:
@@ -55,29 +54,23 @@ class Authenticator:
         """
         Authenticate and return a Stark Bank user based on the authentication type.
 
+        The user is shared with the other Authenticators of the process using
+        the same credentials, and it is not assigned to `starkbank.user`, so
+        it must be passed to the SDK calls.
+
         Returns:
             starkbank.Project or starkbank.Organization: The authenticated user.
         """
+        from starkbank.error import (
+            InputErrors,
+            InternalServerError,
+            InvalidSignatureError,
+        )
+
         try:
-            if self.auth_type == 'project':
-                user = starkbank.Project(
-                    environment=self.environment,
-                    id=self.id,
-                    private_key=self.private_key,
-                )
-            elif self.auth_type == 'organization':
-                user = starkbank.Organization(
-                    environment=self.environment,
-                    id=self.id,
-                    private_key=self.private_key,
-                )
-            else:
-                raise ValueError(
-                    "Invalid authentication type. Use 'project' or 'organization'."
-                )
-
-            starkbank.user = user
-            return user
+            return credential_cache.get(
+                self.environment, self.id, self.private_key, self.auth_type
+            )
 
         except InvalidSignatureError as e:
             raise AuthenticationError(f'Invalid signature: {e}')
@@ -105,6 +98,9 @@ class Authenticator:
         Raises:
             - AuthenticationError: If an error occurs during key creation.
         """
+        import starkbank
+        from starkbank.error import InternalServerError
+
         try:
             private_key, public_key = starkbank.key.create(destination_path)
             return private_key, public_key
@@ -0,0 +1,85 @@
+import hashlib
+import threading
+
+
+class CredentialCache:
+    """
+    A process-wide cache of the authenticated Stark Bank users.
+
+    Creating a starkbank.Project or starkbank.Organization parses its PEM
+    private key, so each user is created once per (environment, id,
+    auth_type) and shared by every integration of the process using these
+    credentials. A different private key for the same credentials replaces
+    the cached user, so a rotated key takes effect on the next `get`.
+
+    The users are returned to the callers, which pass them explicitly to the
+    SDK calls, so the integrations of several tenants can run concurrently
+    without overwriting the global `starkbank.user`.
+    """
+
+    def __init__(self):
+        self._users = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(private_key: str):
+        return hashlib.sha256(private_key.encode()).hexdigest()
+
+    def get(self, environment: str, id: str, private_key: str, auth_type: str):
+        """
+        Return the user of some credentials, creating it on first use.
+
+        Args:
+            - environment (str): The environment ('sandbox' or 'production').
+            - id (str): The user ID (Project ID or Organization ID).
+            - private_key (str): The private key content for ECDSA authentication.
+            - auth_type (str): The type of authentication ('project' or 'organization').
+
+        Returns:
+            starkbank.Project or starkbank.Organization: The cached user.
+
+        Raises:
+            - ValueError: If the authentication type is invalid.
+        """
+        key = (environment, id, auth_type)
+        fingerprint = self._fingerprint(private_key)
+
+        with self._lock:
+            cached = self._users.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                return cached[1]
+
+        import starkbank
+
+        if auth_type == 'project':
+            user = starkbank.Project(
+                environment=environment, id=id, private_key=private_key
+            )
+        elif auth_type == 'organization':
+            user = starkbank.Organization(
+                environment=environment, id=id, private_key=private_key
+            )
+        else:
+            raise ValueError(
+                "Invalid authentication type. Use 'project' or 'organization'."
+            )
+
+        with self._lock:
+            # Keep the user cached by a concurrent call, if any
+            cached = self._users.setdefault(key, (fingerprint, user))
+            if cached[0] != fingerprint:
+                self._users[key] = cached = (fingerprint, user)
+            return cached[1]
+
+    def __len__(self):
+        return len(self._users)
+
+    def clear(self):
+        """
+        Forget every cached user.
+        """
+        with self._lock:
+            self._users = {}
+
+
+credential_cache = CredentialCache()
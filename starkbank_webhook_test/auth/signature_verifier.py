@@ -0,0 +1,287 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from ellipticcurve import Ecdsa, PublicKey, Signature
+from starkbank import Event
+from starkbank.error import InvalidSignatureError
+
+# Not part of the documented SDK interface: the versions of starkbank and
+# starkcore providing them are pinned in pyproject.toml
+from starkbank.utils import rest
+from starkcore.utils.api import from_api_json
+
+_EVENT_RESOURCE = {'class': Event, 'name': 'Event'}
+
+
+@lru_cache(maxsize=4)
+def _load_public_key(public_key_pem):
+    """
+    Parse a public key once per process.
+    """
+    return PublicKey.fromPem(public_key_pem)
+
+
+def _is_signature_valid(content, signature, public_key):
+    """
+    Check an ECDSA signature against the content as sent and as normalized JSON.
+    """
+    if Ecdsa.verify(
+        message=content, signature=signature, publicKey=public_key
+    ):
+        return True
+
+    try:
+        normalized = json.dumps(json.loads(content), sort_keys=True)
+    except ValueError:
+        return False
+
+    return Ecdsa.verify(
+        message=normalized, signature=signature, publicKey=public_key
+    )
+
+
+def _verify_signature(content, signature, public_key_pem):
+    """
+    Check a base-64 signature against the content in a worker process.
+
+    Returns:
+        bool: True if the signature matches the content.
+    """
+    try:
+        signature = Signature.fromBase64(signature)
+    except Exception:
+        return False
+
+    return _is_signature_valid(
+        content, signature, _load_public_key(public_key_pem)
+    )
+
+
+class SignatureVerifier:
+    """
+    A class for verifying and parsing the Stark Bank webhook events.
+
+    It replaces `starkbank.event.parse` with the same verification rules, while
+    caching the Stark Bank public key for `key_ttl` seconds and memoizing the
+    events already verified by their content hash and signature, so redelivered
+    events skip the ECDSA verification. Batches of events can be verified on a
+    process pool, so the verification is not bound to a single core.
+
+    Attributes:
+        - user (starkbank.Project or starkbank.Organization): The user fetching the public key.
+        - key_ttl (float): How long in seconds the public key is cached.
+        - cache_size (int): The maximum number of memoized events.
+        - processes (int): The number of verification processes, 0 to verify in-process.
+    """
+
+    def __init__(
+        self,
+        user=None,
+        key_ttl: float = 3600,
+        cache_size: int = 10000,
+        processes: int = 0,
+    ):
+        """
+        Initialize the SignatureVerifier without fetching the public key.
+
+        Args:
+            - user (starkbank.Project or starkbank.Organization): The user fetching the public key.
+            - key_ttl (float): How long in seconds the public key is cached.
+            - cache_size (int): The maximum number of memoized events.
+            - processes (int): The number of verification processes, 0 to verify in-process.
+        """
+        self.user = user
+        self.key_ttl = key_ttl
+        self.cache_size = cache_size
+        self.processes = processes
+        self._public_key = None
+        self._public_key_expiration = 0
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def public_key(self, refresh: bool = False):
+        """
+        Return the cached Stark Bank public key, fetching it when expired.
+
+        Args:
+            - refresh (bool): Fetch the public key even if it is cached.
+
+        Returns:
+            PublicKey: The Stark Bank public key.
+        """
+        with self._lock:
+            if (
+                refresh
+                or self._public_key is None
+                or time.monotonic() >= self._public_key_expiration
+            ):
+                self._public_key = _load_public_key(self._fetch_public_key())
+                self._public_key_expiration = time.monotonic() + self.key_ttl
+            return self._public_key
+
+    def _fetch_public_key(self):
+        """
+        Fetch the current Stark Bank public key in PEM format.
+        """
+        response = rest.get_raw(
+            path='/public-key', query={'limit': 1}, user=self.user
+        )
+        return response.json()['publicKeys'][0]['content']
+
+    def parse(self, content: str, signature: str):
+        """
+        Verify the signature of an event and parse it.
+
+        Args:
+            - content (str): The event content, not parsed.
+            - signature (str): The base-64 signature from the Digital-Signature header.
+
+        Returns:
+            starkbank.Event: The parsed event.
+
+        Raises:
+            - InvalidSignatureError: If the signature does not match the content.
+        """
+        key = self._memo_key(content, signature)
+        event = self._memoized(key)
+        if event is not None:
+            return event
+
+        try:
+            decoded_signature = Signature.fromBase64(signature)
+        except Exception:
+            raise InvalidSignatureError('The provided signature is not valid')
+
+        if not _is_signature_valid(
+            content, decoded_signature, self.public_key()
+        ) and not _is_signature_valid(
+            content, decoded_signature, self.public_key(refresh=True)
+        ):
+            raise InvalidSignatureError(
+                'The provided signature and content do not match the public key'
+            )
+
+        event = self._parse_content(content)
+        self._memoize(key, event)
+        return event
+
+    def parse_batch(self, items):
+        """
+        Verify and parse a batch of events, on the process pool if enabled.
+
+        Args:
+            - items (list[tuple[str, str]]): The content and signature of each event.
+
+        Returns:
+            list: The parsed event or the InvalidSignatureError of each item,
+                in the same order as the items.
+        """
+        results = [None] * len(items)
+        keys = [self._memo_key(content, sig) for content, sig in items]
+        pending = []
+        for index, key in enumerate(keys):
+            results[index] = self._memoized(key)
+            if results[index] is None:
+                pending.append(index)
+
+        if not pending:
+            return results
+
+        verified = self._verify_many(
+            [items[index] for index in pending], self.public_key()
+        )
+        rejected = [i for i, valid in zip(pending, verified) if not valid]
+        if rejected:
+            # The key may have been rotated: retry once with a fresh key
+            reverified = self._verify_many(
+                [items[index] for index in rejected],
+                self.public_key(refresh=True),
+            )
+            rejected = [
+                i for i, valid in zip(rejected, reverified) if not valid
+            ]
+
+        rejected = set(rejected)
+        for index in pending:
+            if index in rejected:
+                results[index] = InvalidSignatureError(
+                    'The provided signature and content do not match the public key'
+                )
+                continue
+
+            try:
+                results[index] = self._parse_content(items[index][0])
+                self._memoize(keys[index], results[index])
+            except Exception as e:
+                results[index] = e
+
+        return results
+
+    def _verify_many(self, items, public_key):
+        """
+        Check the signatures of many items against the given public key.
+        """
+        pem = public_key.toPem()
+        contents = [content for content, _ in items]
+        signatures = [signature for _, signature in items]
+
+        if not self.processes:
+            return list(
+                map(
+                    _verify_signature, contents, signatures, [pem] * len(items)
+                )
+            )
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes)
+
+        chunksize = max(1, len(items) // (self.processes * 4))
+        return list(
+            self._pool.map(
+                _verify_signature,
+                contents,
+                signatures,
+                [pem] * len(items),
+                chunksize=chunksize,
+            )
+        )
+
+    def _parse_content(self, content):
+        """
+        Parse the event of a verified content.
+        """
+        return from_api_json(
+            resource=_EVENT_RESOURCE,
+            json=json.loads(content, strict=False)['event'],
+        )
+
+    def _memo_key(self, content, signature):
+        return hashlib.sha256(content.encode('utf-8')).digest(), signature
+
+    def _memoized(self, key):
+        with self._lock:
+            event = self._events.get(key)
+            if event is not None:
+                self._events.move_to_end(key)
+            return event
+
+    def _memoize(self, key, event):
+        with self._lock:
+            self._events[key] = event
+            self._events.move_to_end(key)
+            while len(self._events) > self.cache_size:
+                self._events.popitem(last=False)
+
+    def close(self):
+        """
+        Stop the verification processes.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -6,3 +6,17 @@ INPUT_DIR = os.path.join(ROOT_DIR, 'input')
 OUTPUT_DIR = os.path.join(ROOT_DIR, 'output')
 PRIVATE_KEY_PATH = os.path.join(INPUT_DIR, 'credentials/private-key.pem')
 PUBLIC_KEY_PATH = os.path.join(INPUT_DIR, 'credentials/public-key.pem')
+INVOICE_GENERATOR_SETTINGS_PATH = os.path.join(
+    INPUT_DIR, 'settings/invoices_generator_setup.json'
+)
+TRANSFER_GENERATOR_SETTINGS_PATH = os.path.join(
+    INPUT_DIR, 'settings/transfer_generator_setup.json'
+)
+DEDUP_STORE_PATH = os.path.join(OUTPUT_DIR, 'state/dedup_store.sqlite3')
+EVENT_CATCH_UP_PATH = os.path.join(OUTPUT_DIR, 'state/event_catch_up.json')
+TRANSFER_OUTBOX_PATH = os.path.join(
+    OUTPUT_DIR, 'state/transfer_outbox.sqlite3'
+)
+TRANSFER_TRACKER_PATH = os.path.join(
+    OUTPUT_DIR, 'state/transfer_tracker.sqlite3'
+)
@@ -0,0 +1,143 @@
+import itertools
+import threading
+from random import Random
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from faker import Faker
+
+
+class SyntheticCorpus:
+    """
+    A precomputed pool of synthetic values sampled with random draws.
+
+    It exposes the subset of the Faker interface used to generate invoice data,
+    so it can replace a Faker instance wherever one is expected.
+
+    Attributes:
+        - cpfs (list[str]): The pool of CPF numbers.
+        - names (list[str]): The pool of person names.
+        - word_pool (list[str]): The pool of words.
+        - currency_codes (list[str]): The pool of currency codes.
+    """
+
+    def __init__(self, fake: 'Faker', size: int = 1000, seed: int = None):
+        """
+        Precompute the pools of values using the given Faker instance.
+
+        Args:
+            - fake (Faker): The Faker instance used to fill the pools.
+            - size (int): Number of values in each pool.
+            - seed (int): Seed for the draws from the pools.
+        """
+        if size < 1:
+            raise ValueError('Invalid corpus size. Use a positive integer.')
+
+        self.cpfs = [fake.cpf() for _ in range(size)]
+        self.names = [fake.name() for _ in range(size)]
+        self.word_pool = fake.words(nb=size)
+        self.currency_codes = sorted(
+            {fake.currency_code() for _ in range(size)}
+        )
+        self._random = Random(seed)
+
+    def cpf(self):
+        return self._random.choice(self.cpfs)
+
+    def name(self):
+        return self._random.choice(self.names)
+
+    def word(self):
+        return self._random.choice(self.word_pool)
+
+    def words(self, nb=3):
+        return self._random.choices(self.word_pool, k=nb)
+
+    def currency_code(self):
+        return self._random.choice(self.currency_codes)
+
+    def random_int(self, min=0, max=9999):
+        return self._random.randint(min, max)
+
+
+class FakerPool:
+    """
+    A class for sharing Faker instances across invoice generations.
+
+    Building a Faker loads all the locale providers, so each worker thread
+    builds its own instance once and reuses it, along with a Random instance
+    for the numbers drawn for the invoices. When a seed is given, both
+    instances of the n-th worker are seeded with `seed + n`, so each worker
+    produces a reproducible and distinct sequence of values.
+
+    Attributes:
+        - locale (str): The Faker locale.
+        - seed (int): The base seed for the worker instances.
+        - corpus_size (int): Size of the precomputed corpus, 0 to disable it.
+    """
+
+    def __init__(
+        self, locale: str = 'pt_BR', seed: int = None, corpus_size: int = 0
+    ):
+        """
+        Initialize the FakerPool without building any Faker instance.
+
+        Args:
+            - locale (str): The Faker locale.
+            - seed (int): The base seed for the worker instances.
+            - corpus_size (int): Size of the precomputed corpus, 0 to disable it.
+        """
+        self.locale = locale
+        self.seed = seed
+        self.corpus_size = corpus_size
+        self._local = threading.local()
+        self._worker_counter = itertools.count()
+
+    def get(self):
+        """
+        Return the data source of the current worker, building it if needed.
+
+        Returns:
+            Faker or SyntheticCorpus: The worker data source.
+        """
+        source = getattr(self._local, 'source', None)
+        if source is None:
+            worker = next(self._worker_counter)
+            source = self._build_source(worker)
+            self._local.source = source
+            self._local.random = Random(self._worker_seed(worker))
+        return source
+
+    def random(self):
+        """
+        Return the Random instance of the current worker, building it if needed.
+
+        Returns:
+            Random: The worker random draws.
+        """
+        self.get()
+        return self._local.random
+
+    def _worker_seed(self, worker):
+        """
+        Return the seed of the given worker number, None for unseeded draws.
+        """
+        return None if self.seed is None else self.seed + worker
+
+    def _build_source(self, worker):
+        """
+        Build the data source for the given worker number.
+        """
+        # Faker takes long to import, so it is only loaded when first needed
+        from faker import Faker
+
+        seed = self._worker_seed(worker)
+
+        fake = Faker(self.locale)
+        if seed is not None:
+            fake.seed_instance(seed)
+
+        if self.corpus_size:
+            return SyntheticCorpus(fake, self.corpus_size, seed)
+
+        return fake
@@ -0,0 +1,316 @@
+import math
+import re
+from abc import ABC, abstractmethod
+from random import Random
+
+SHAPES = ('flat', 'ramp', 'step', 'spike', 'sine', 'replay')
+
+# A trace line is a count, or an 'Issuing N random invoices.' log line
+_TRACE_LINE = re.compile(r'^\s*(\d+)\s*$|Issuing (\d+) random invoices')
+
+
+class LoadProfile(ABC):
+    """
+    A deterministic number of invoices to issue in each cycle.
+
+    The subclasses define the level of each cycle, the shape of the traffic.
+    The quantity of a cycle is its level, optionally moved by up to `jitter`
+    times itself, and rounded. The random draws of a cycle are seeded with
+    the seed and the cycle number, so the quantity of a cycle depends on
+    nothing else: two runs with the same seed issue the same traffic, and a
+    profile rebuilt in the middle of a run resumes the same sequence.
+
+    Attributes:
+        - seed (int): The seed of the random draws, None for unseeded draws.
+        - jitter (float): The maximum relative noise added to each level.
+    """
+
+    def __init__(self, seed: int = None, jitter: float = 0.0):
+        """
+        Initialize the LoadProfile.
+
+        Args:
+            - seed (int): The seed of the random draws, None for unseeded draws.
+            - jitter (float): The maximum relative noise added to each level.
+        """
+        if not 0 <= jitter <= 1:
+            raise ValueError('Invalid jitter. Use a number from 0 to 1.')
+
+        self.seed = seed
+        self.jitter = jitter
+
+    def _random(self, cycle: int):
+        """
+        Return the random draws of a cycle.
+        """
+        if self.seed is None:
+            return Random()
+        return Random(f'{self.seed}:{cycle}')
+
+    @abstractmethod
+    def level(self, cycle: int):
+        """
+        Return the level of a cycle, before the jitter.
+        """
+
+    def quantity(self, cycle: int):
+        """
+        Return the number of invoices to issue in a cycle.
+
+        Args:
+            - cycle (int): The number of the cycle, from 0.
+
+        Returns:
+            int: The non-negative number of invoices.
+        """
+        level = self.level(cycle)
+        if self.jitter:
+            level *= 1 + self._random(cycle).uniform(-self.jitter, self.jitter)
+        return max(0, round(level))
+
+    def quantities(self, cycles: int):
+        """
+        Return the number of invoices of the first cycles, to preview a run.
+        """
+        return [self.quantity(cycle) for cycle in range(cycles)]
+
+
+class FlatProfile(LoadProfile):
+    """
+    A random quantity of each cycle drawn from [minimum, maximum].
+
+    >>> FlatProfile(8, 12, seed=42).quantities(4) == (
+    ...     FlatProfile(8, 12, seed=42).quantities(4)
+    ... )
+    True
+    """
+
+    def __init__(self, minimum: int, maximum: int, **kwargs):
+        super().__init__(**kwargs)
+        if not 0 <= minimum <= maximum:
+            raise ValueError(
+                'Invalid quantity interval. Use 0 <= minimum <= maximum.'
+            )
+
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def level(self, cycle):
+        return self._random(cycle).randint(self.minimum, self.maximum)
+
+
+class RampProfile(LoadProfile):
+    """
+    A level moving linearly from `start` to `end` over `cycles` cycles,
+    then holding `end`.
+
+    >>> RampProfile(0, 100, cycles=4).quantities(6)
+    [0, 25, 50, 75, 100, 100]
+    """
+
+    def __init__(self, start: int, end: int, cycles: int, **kwargs):
+        super().__init__(**kwargs)
+        if cycles < 1:
+            raise ValueError('Invalid cycles. Use a positive integer.')
+
+        self.start = start
+        self.end = end
+        self.cycles = cycles
+
+    def level(self, cycle):
+        progress = min(cycle / self.cycles, 1)
+        return self.start + (self.end - self.start) * progress
+
+
+class StepProfile(LoadProfile):
+    """
+    A level held for a number of cycles, then the next one. The last level
+    is held once the steps end.
+
+    >>> StepProfile([[2, 10], [1, 50]]).quantities(5)
+    [10, 10, 50, 50, 50]
+    """
+
+    def __init__(self, steps, **kwargs):
+        super().__init__(**kwargs)
+        if not steps or any(cycles < 1 for cycles, _ in steps):
+            raise ValueError(
+                'Invalid steps. Use [cycles, quantity] pairs, '
+                'with positive cycles.'
+            )
+
+        self.steps = [tuple(step) for step in steps]
+
+    def level(self, cycle):
+        for cycles, quantity in self.steps:
+            if cycle < cycles:
+                return quantity
+            cycle -= cycles
+        return self.steps[-1][1]
+
+
+class SpikeProfile(LoadProfile):
+    """
+    A `base` level with spikes of `peak` lasting `length` cycles, the first
+    one at cycle `at` and then every `every` cycles, if given.
+
+    >>> SpikeProfile(10, 100, at=1, length=2, every=4).quantities(7)
+    [10, 100, 100, 10, 10, 100, 100]
+    """
+
+    def __init__(
+        self,
+        base: int,
+        peak: int,
+        at: int = 0,
+        length: int = 1,
+        every: int = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if at < 0 or length < 1:
+            raise ValueError(
+                'Invalid spike. Use a non-negative at and a positive length.'
+            )
+
+        if every is not None and every < length:
+            raise ValueError('Invalid every. Use at least the spike length.')
+
+        self.base = base
+        self.peak = peak
+        self.at = at
+        self.length = length
+        self.every = every
+
+    def level(self, cycle):
+        offset = cycle - self.at
+        if offset >= 0 and self.every:
+            offset %= self.every
+        return self.peak if 0 <= offset < self.length else self.base
+
+
+class SineProfile(LoadProfile):
+    """
+    A level oscillating around `mean` by `amplitude`, with a period of
+    `period` cycles, such as the daily cycle of a diurnal traffic. The
+    `phase` is the cycle of the peak.
+
+    >>> SineProfile(50, 50, period=4).quantities(4)
+    [100, 50, 0, 50]
+    """
+
+    def __init__(
+        self,
+        mean: float,
+        amplitude: float,
+        period: int,
+        phase: int = 0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if period < 1:
+            raise ValueError('Invalid period. Use a positive integer.')
+
+        self.mean = mean
+        self.amplitude = amplitude
+        self.period = period
+        self.phase = phase
+
+    def level(self, cycle):
+        angle = 2 * math.pi * (cycle - self.phase) / self.period
+        return self.mean + self.amplitude * math.cos(angle)
+
+
+class ReplayProfile(LoadProfile):
+    """
+    The quantities of a recorded trace, cycle by cycle. Once the trace ends,
+    it starts over if `loop` is set, or no more invoices are issued.
+
+    >>> ReplayProfile([3, 0, 7]).quantities(4)
+    [3, 0, 7, 0]
+    """
+
+    def __init__(self, counts, loop: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        if not counts or any(count < 0 for count in counts):
+            raise ValueError('Invalid trace. Use non-negative counts.')
+
+        self.counts = list(counts)
+        self.loop = loop
+
+    @classmethod
+    def from_trace(cls, path: str, **kwargs):
+        """
+        Build a ReplayProfile from a trace file.
+
+        Each line of the trace holds the count of a cycle. The log file of
+        the invoice service is also a trace: its 'Issuing N random
+        invoices.' lines are replayed and the other lines are skipped.
+
+        Args:
+            - path (str): The path of the trace file.
+        """
+        counts = []
+        with open(path) as trace:
+            for line in trace:
+                match = _TRACE_LINE.search(line)
+                if match:
+                    counts.append(int(match.group(1) or match.group(2)))
+        return cls(counts, **kwargs)
+
+    def level(self, cycle):
+        if self.loop:
+            cycle %= len(self.counts)
+        return self.counts[cycle] if cycle < len(self.counts) else 0
+
+
+def build_profile(settings=None, quantity_interval=(8, 12), seed=None):
+    """
+    Build the load profile described by a 'load_profile' settings object.
+
+    With no settings, the quantities are drawn from the quantity interval,
+    as a flat profile.
+
+    >>> settings = {'shape': 'ramp', 'start': 0, 'end': 10, 'cycles': 2}
+    >>> build_profile(settings).quantities(3)
+    [0, 5, 10]
+
+    Args:
+        - settings (Mapping): The 'shape' and the parameters of its profile,
+          plus the optional 'seed' and 'jitter'.
+        - quantity_interval (tuple[int, int]): The interval of a flat profile.
+        - seed (int): The seed used when the settings have no 'seed'.
+
+    Returns:
+        LoadProfile: The profile of the settings.
+
+    Raises:
+        - ValueError: If the shape or its parameters are invalid.
+    """
+    settings = dict(settings or {})
+    shape = settings.pop('shape', 'flat')
+    settings.setdefault('seed', seed)
+
+    try:
+        if shape == 'flat':
+            settings.setdefault('minimum', quantity_interval[0])
+            settings.setdefault('maximum', quantity_interval[1])
+            return FlatProfile(**settings)
+        if shape == 'ramp':
+            return RampProfile(**settings)
+        if shape == 'step':
+            return StepProfile(**settings)
+        if shape == 'spike':
+            return SpikeProfile(**settings)
+        if shape == 'sine':
+            return SineProfile(**settings)
+        if shape == 'replay':
+            if 'trace' in settings:
+                return ReplayProfile.from_trace(
+                    settings.pop('trace'), **settings
+                )
+            return ReplayProfile(**settings)
+    except TypeError as e:
+        raise ValueError(f'Invalid {shape} profile parameters: {e}')
+
+    raise ValueError(f"Invalid shape. Use {', '.join(SHAPES)}.")
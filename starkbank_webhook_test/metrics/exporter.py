@@ -0,0 +1,176 @@
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from starkbank_webhook_test.metrics.registry import QUANTILES, MetricsRegistry
+
+metrics_logger = logging.getLogger('metrics')
+metrics_logger.setLevel(logging.DEBUG)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Answer the Prometheus scrapes with the registry metrics.
+    """
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        content = self.server.registry.render_prometheus().encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """
+    An HTTP server exposing a MetricsRegistry on '/metrics' for Prometheus.
+
+    Attributes:
+        - registry (MetricsRegistry): The registry exposed.
+        - host (str): The interface the server listens on.
+        - port (int): The port the server listens on, 0 for any free port.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = '0.0.0.0',
+        port: int = 9100,
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        Start serving the metrics in a background thread.
+        """
+        self._server = ThreadingHTTPServer(
+            (self.host, self.port), _MetricsHandler
+        )
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        metrics_logger.info(
+            f'Metrics endpoint listening on {self.host}:{self.port}/metrics'
+        )
+
+    def stop(self):
+        """
+        Stop serving the metrics.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+
+class MetricsDumper:
+    """
+    A background thread logging the registry latency quantiles periodically.
+
+    Attributes:
+        - registry (MetricsRegistry): The registry dumped.
+        - logger (logging.Logger): The logger receiving the dumps.
+        - interval (float): The time in seconds between dumps.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        logger: logging.Logger = metrics_logger,
+        interval: float = 60,
+    ):
+        self.registry = registry
+        self.logger = logger
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def dump(self):
+        """
+        Log one line per operation and outcome with its latency quantiles.
+        """
+        for (operation, outcome), stats in self.registry.snapshot().items():
+            quantiles = ' | '.join(
+                f'p{q * 100:g}: {stats[q] * 1000:.1f}ms' for q in QUANTILES
+            )
+            self.logger.info(
+                f'Latency. Operation: {operation} | Outcome: {outcome} | '
+                f'Count: {stats["count"]} | {quantiles} | '
+                f'Max: {stats["max"] * 1000:.1f}ms'
+            )
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.dump()
+
+    def start(self):
+        """
+        Start dumping the metrics every interval.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the thread and write a last dump.
+        """
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+            self.dump()
+
+
+def start_exporters(
+    registry: MetricsRegistry,
+    settings: dict,
+    logger: logging.Logger = metrics_logger,
+):
+    """
+    Start the metrics exporters enabled in the settings.
+
+    Args:
+        - registry (MetricsRegistry): The registry exported.
+        - settings (dict): The 'port' and 'host' of the MetricsServer and the
+          'dump_interval' of the MetricsDumper, each one optional.
+        - logger (logging.Logger): The logger receiving the dumps.
+
+    Returns:
+        list: The started exporters, to be stopped by the caller.
+    """
+    exporters = []
+    if settings.get('port') is not None:
+        exporters.append(
+            MetricsServer(
+                registry,
+                host=settings.get('host', '0.0.0.0'),
+                port=settings['port'],
+            )
+        )
+    if settings.get('dump_interval'):
+        exporters.append(
+            MetricsDumper(registry, logger, settings['dump_interval'])
+        )
+
+    for exporter in exporters:
+        exporter.start()
+    return exporters
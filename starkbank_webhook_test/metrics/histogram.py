@@ -0,0 +1,155 @@
+import math
+import threading
+
+
+class LatencyHistogram:
+    """
+    A fixed-memory latency histogram with bounded relative error.
+
+    The values are recorded in microseconds in log-linear buckets, as in an
+    HDR histogram: each power of two is split in linear sub-buckets, so every
+    recorded value is kept with `significant_figures` decimal digits of
+    precision, from a microsecond up to `highest` seconds. Recording a value
+    is a couple of integer operations and a list increment, whatever the
+    number of values already recorded.
+
+    Attributes:
+        - highest (float): The highest trackable value in seconds, larger values are clamped.
+        - significant_figures (int): The decimal digits of precision of each value.
+        - count (int): The number of recorded values.
+        - total (float): The sum of the recorded values in seconds.
+        - min (float): The lowest recorded value in seconds.
+        - max (float): The highest recorded value in seconds.
+    """
+
+    def __init__(self, highest: float = 3600, significant_figures: int = 2):
+        """
+        Initialize an empty LatencyHistogram.
+
+        Args:
+            - highest (float): The highest trackable value in seconds.
+            - significant_figures (int): The decimal digits of precision, from 1 to 5.
+        """
+        if not 1 <= significant_figures <= 5:
+            raise ValueError(
+                'Invalid significant_figures. Use an integer from 1 to 5.'
+            )
+
+        self.highest = highest
+        self.significant_figures = significant_figures
+        self._highest_value = int(highest * 1e6)
+        self._sub_bucket_bits = math.ceil(
+            math.log2(2 * 10**significant_figures)
+        )
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._sub_bucket_half = self._sub_bucket_count >> 1
+        self._counts = [0] * (self._index(self._highest_value) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        """
+        Return the bucket index of a value in microseconds.
+        """
+        if value < self._sub_bucket_count:
+            return value
+
+        shift = value.bit_length() - self._sub_bucket_bits
+        return (
+            self._sub_bucket_count
+            + (shift - 1) * self._sub_bucket_half
+            + (value >> shift)
+            - self._sub_bucket_half
+        )
+
+    def _value(self, index):
+        """
+        Return the highest value in microseconds of a bucket index.
+        """
+        if index < self._sub_bucket_count:
+            return index
+
+        offset = index - self._sub_bucket_count
+        shift = offset // self._sub_bucket_half + 1
+        sub_bucket = offset % self._sub_bucket_half + self._sub_bucket_half
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        """
+        Record a latency.
+
+        Args:
+            - seconds (float): The latency in seconds.
+        """
+        value = min(max(int(seconds * 1e6), 0), self._highest_value)
+        index = self._index(value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, percentile: float):
+        """
+        Return the latency below which the given share of the values fall.
+
+        Args:
+            - percentile (float): The percentile, from 0 to 100.
+
+        Returns:
+            float: The latency in seconds, 0 if no value was recorded.
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+
+            rank = max(1, math.ceil(percentile / 100 * self.count))
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    return min(self._value(index) / 1e6, self.max)
+            return self.max
+
+    def merge(self, other):
+        """
+        Add the values of another histogram with the same layout.
+
+        Args:
+            - other (LatencyHistogram): The histogram to add.
+        """
+        if len(other._counts) != len(self._counts):
+            raise ValueError('Cannot merge histograms with different layouts.')
+
+        with other._lock:
+            counts = list(other._counts)
+            count, total = other.count, other.total
+            low, high = other.min, other.max
+
+        with self._lock:
+            for index, value in enumerate(counts):
+                if value:
+                    self._counts[index] += value
+            self.count += count
+            self.total += total
+            if low is not None and (self.min is None or low < self.min):
+                self.min = low
+            if high is not None and (self.max is None or high > self.max):
+                self.max = high
+
+    def reset(self):
+        """
+        Forget every recorded value.
+        """
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+            self.count = 0
+            self.total = 0.0
+            self.min = None
+            self.max = None
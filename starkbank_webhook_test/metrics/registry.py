@@ -0,0 +1,210 @@
+import functools
+import threading
+import time
+from typing import Any, Callable
+
+from starkbank_webhook_test.metrics.histogram import LatencyHistogram
+
+QUANTILES = (0.5, 0.99, 0.999)
+
+
+def classify_outcome(error: BaseException = None):
+    """
+    Return the outcome label of a call from the error it raised, if any.
+
+    The integration wraps the Stark Bank errors, so the chain of causes is
+    searched for the original error.
+
+    Args:
+        - error (BaseException): The error raised by the call, None on success.
+
+    Returns:
+        str: 'success', 'signature_error', 'api_error' or 'error'.
+    """
+    if error is None:
+        return 'success'
+
+    from starkbank.error import InvalidSignatureError, StarkError
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, InvalidSignatureError):
+            return 'signature_error'
+        if isinstance(error, StarkError):
+            return 'api_error'
+        error = error.__cause__ or error.__context__
+    return 'error'
+
+
+class MetricsRegistry:
+    """
+    A registry of latency histograms and counters per operation and outcome.
+
+    Attributes:
+        - highest (float): The highest latency in seconds tracked by the histograms.
+        - significant_figures (int): The precision of the histograms.
+    """
+
+    def __init__(self, highest: float = 3600, significant_figures: int = 2):
+        """
+        Initialize an empty MetricsRegistry.
+
+        Args:
+            - highest (float): The highest latency in seconds tracked by the histograms.
+            - significant_figures (int): The precision of the histograms.
+        """
+        self.highest = highest
+        self.significant_figures = significant_figures
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, operation: str, outcome: str = 'success'):
+        """
+        Return the latency histogram of an operation and outcome.
+
+        Returns:
+            LatencyHistogram: The histogram, created on first use.
+        """
+        key = (operation, outcome)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    key,
+                    LatencyHistogram(self.highest, self.significant_figures),
+                )
+        return histogram
+
+    def observe(self, operation: str, outcome: str, seconds: float):
+        """
+        Record the latency of a call.
+
+        Args:
+            - operation (str): The name of the operation.
+            - outcome (str): The outcome of the call.
+            - seconds (float): The latency in seconds.
+        """
+        self.histogram(operation, outcome).record(seconds)
+
+    def increment(self, name: str, amount: int = 1, **labels):
+        """
+        Add to a counter.
+
+        Args:
+            - name (str): The name of the counter.
+            - amount (int): The amount to add.
+            - labels: The labels of the counter.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self):
+        """
+        Return the current statistics of each operation and outcome.
+
+        Returns:
+            dict: The count, sum, max and quantiles keyed by (operation, outcome).
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+
+        return {
+            key: {
+                'count': histogram.count,
+                'sum': histogram.total,
+                'max': histogram.max or 0.0,
+                **{q: histogram.percentile(q * 100) for q in QUANTILES},
+            }
+            for key, histogram in sorted(histograms.items())
+        }
+
+    def render_prometheus(self, prefix: str = 'starkbank'):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            - prefix (str): The prefix of the metric names.
+
+        Returns:
+            str: The metrics text.
+        """
+        latency = f'{prefix}_operation_latency_seconds'
+        calls = f'{prefix}_operation_calls_total'
+        lines = [
+            f'# HELP {latency} Latency of the integration operations.',
+            f'# TYPE {latency} summary',
+        ]
+        snapshot = self.snapshot()
+        for (operation, outcome), stats in snapshot.items():
+            labels = f'operation="{operation}",outcome="{outcome}"'
+            for quantile in QUANTILES:
+                lines.append(
+                    f'{latency}{{{labels},quantile="{quantile}"}} '
+                    f'{stats[quantile]:.6f}'
+                )
+            lines.append(f'{latency}_sum{{{labels}}} {stats["sum"]:.6f}')
+            lines.append(f'{latency}_count{{{labels}}} {stats["count"]}')
+
+        lines += [
+            f'# HELP {calls} Calls of the integration operations.',
+            f'# TYPE {calls} counter',
+        ]
+        for (operation, outcome), stats in snapshot.items():
+            lines.append(
+                f'{calls}{{operation="{operation}",outcome="{outcome}"}} '
+                f'{stats["count"]}'
+            )
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+        for index, ((name, labels), value) in enumerate(counters):
+            if not index or counters[index - 1][0][0] != name:
+                lines.append(f'# TYPE {prefix}_{name} counter')
+            rendered = ','.join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f'{prefix}_{name}{{{rendered}}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """
+        Forget every histogram and counter.
+        """
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+
+metrics_registry = MetricsRegistry()
+
+
+def timed_with(registry: MetricsRegistry, operation: str = None):
+    """
+    Record the latency and outcome of each call of the decorated function.
+
+    Args:
+        - registry (MetricsRegistry): The registry recording the calls.
+        - operation (str): The name of the operation, defaults to the function name.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        name = operation or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                registry.observe(
+                    name, classify_outcome(e), time.perf_counter() - start
+                )
+                raise
+            registry.observe(name, 'success', time.perf_counter() - start)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,601 @@
+import argparse
+import heapq
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from ellipticcurve import Ecdsa, PrivateKey
+
+mock_api_logger = logging.getLogger('mock_api')
+mock_api_logger.setLevel(logging.DEBUG)
+
+MAX_ITEMS_PER_REQUEST = 100
+REQUIRED_FIELDS = {
+    'invoice': ('amount', 'taxId', 'name'),
+    'transfer': (
+        'amount',
+        'name',
+        'taxId',
+        'bankCode',
+        'branchCode',
+        'accountNumber',
+    ),
+}
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f+00:00')
+
+
+class MockApiError(Exception):
+    """Custom exception for the errors answered by the mock API."""
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class _MockApiHandler(BaseHTTPRequestHandler):
+    """
+    Route the requests of a keep-alive connection to the MockStarkbankServer.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        status, payload, headers = self.server.mock.handle(
+            method, url.path, parse_qs(url.query), body
+        )
+        content = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockStarkbankServer:
+    """
+    A local stand-in for the Stark Bank API.
+
+    It serves the invoice, transfer, event and public-key endpoints used by
+    the integration, so the whole pipeline can be load tested without the
+    sandbox rate limits or the network. Every response can be delayed by a
+    configurable latency, a share of the requests fail with an internal
+    server error and a token bucket answers the excess requests with 429.
+
+    Created invoices are paid after `payment_delay` seconds with probability
+    `payment_rate`. Each payment stores an invoice 'credited' event signed
+    with the server key, which is also pushed to `webhook_url` when given.
+    The server public key is served on '/v2/public-key', so the integration
+    verifies the events as it does with Stark Bank.
+
+    Attributes:
+        - host (str): The interface the server listens on.
+        - port (int): The port the server listens on, 0 for any free port.
+        - latency (float): The minimum delay in seconds of each response.
+        - jitter (float): The maximum random delay in seconds added to the latency.
+        - error_rate (float): The share of requests failing with 500.
+        - rate_limit (float): The accepted requests per second, 0 for no limit.
+        - burst (int): The requests accepted at once before throttling.
+        - payment_rate (float): The share of invoices paid.
+        - payment_delay (float): The delay in seconds before an invoice is paid.
+        - invoice_fee (int): The fee in cents charged on each paid invoice.
+        - webhook_url (str): The URL receiving the signed events, if any.
+        - private_key (PrivateKey): The key signing the events.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0,
+        burst: int = None,
+        payment_rate: float = 1.0,
+        payment_delay: float = 0.0,
+        invoice_fee: int = 0,
+        webhook_url: str = None,
+        seed: int = None,
+    ):
+        """
+        Initialize the MockStarkbankServer with a new signing key.
+
+        Args:
+            - host (str): The interface the server listens on.
+            - port (int): The port the server listens on, 0 for any free port.
+            - latency (float): The minimum delay in seconds of each response.
+            - jitter (float): The maximum random delay in seconds added to the latency.
+            - error_rate (float): The share of requests failing with 500.
+            - rate_limit (float): The accepted requests per second, 0 for no limit.
+            - burst (int): The requests accepted at once, defaults to the rate limit.
+            - payment_rate (float): The share of invoices paid.
+            - payment_delay (float): The delay in seconds before an invoice is paid.
+            - invoice_fee (int): The fee in cents charged on each paid invoice.
+            - webhook_url (str): The URL receiving the signed events, if any.
+            - seed (int): The seed of the latency, error and payment draws.
+        """
+        if not 0 <= error_rate <= 1 or not 0 <= payment_rate <= 1:
+            raise ValueError(
+                'Invalid error_rate or payment_rate. Use a value between 0 and 1.'
+            )
+
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1, int(rate_limit))
+        self.payment_rate = payment_rate
+        self.payment_delay = payment_delay
+        self.invoice_fee = invoice_fee
+        self.webhook_url = webhook_url
+        self.private_key = PrivateKey()
+
+        self.invoices = {}
+        self.transfers = {}
+        self.events = {}
+        self.stats = dict.fromkeys(
+            ('requests', 'throttled', 'failed', 'delivered', 'undelivered'),
+            0,
+        )
+
+        self._random = random.Random(seed)
+        self._ids = itertools.count(5000000000000000)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._tokens_updated = time.monotonic()
+        self._payments = []
+        self._payments_ready = threading.Condition(self._lock)
+        self._server = None
+        self._threads = []
+        self._running = False
+        self._session = requests.Session()
+
+    @property
+    def url(self):
+        """
+        Return the base URL of the server, to be used as a ConnectionPool base_url.
+        """
+        return f'http://{self.host}:{self.port}'
+
+    @property
+    def public_key_pem(self):
+        return self.private_key.publicKey().toPem()
+
+    def start(self):
+        """
+        Start serving the requests and paying the invoices.
+        """
+        self._server = ThreadingHTTPServer(
+            (self.host, self.port), _MockApiHandler
+        )
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self.port = self._server.server_address[1]
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+            threading.Thread(target=self._pay_invoices, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        mock_api_logger.info(f'Mock Stark Bank API listening on {self.url}')
+
+    def stop(self):
+        """
+        Stop serving the requests and drop the pending payments.
+        """
+        with self._payments_ready:
+            self._running = False
+            self._payments_ready.notify_all()
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._session.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stop()
+
+    def sign(self, content: str):
+        """
+        Sign a content with the server key, as Stark Bank signs its events.
+
+        Returns:
+            str: The base-64 signature for the Digital-Signature header.
+        """
+        return Ecdsa.sign(content, self.private_key).toBase64()
+
+    def handle(self, method: str, path: str, query: dict, body: bytes):
+        """
+        Answer a request after applying the latency, throttling and errors.
+
+        Returns:
+            tuple: The status, the JSON payload and the extra headers.
+        """
+        self._delay()
+        with self._lock:
+            self.stats['requests'] += 1
+            if not self._take_token():
+                self.stats['throttled'] += 1
+                return (
+                    HTTPStatus.TOO_MANY_REQUESTS,
+                    self._errors('tooManyRequests', 'Rate limit exceeded'),
+                    {'Retry-After': '1'},
+                )
+            if self._random.random() < self.error_rate:
+                self.stats['failed'] += 1
+                return (
+                    HTTPStatus.INTERNAL_SERVER_ERROR,
+                    self._errors('internalServerError', 'Injected failure'),
+                    {},
+                )
+
+        try:
+            payload = json.loads(body) if body else {}
+            query = {name: values[-1] for name, values in query.items()}
+            return HTTPStatus.OK, self._route(method, path, query, payload), {}
+        except MockApiError as error:
+            return error.status, self._errors(error.code, error.message), {}
+        except ValueError as error:
+            return (
+                HTTPStatus.BAD_REQUEST,
+                self._errors('invalidJson', str(error)),
+                {},
+            )
+
+    def _delay(self):
+        if not self.latency and not self.jitter:
+            return
+
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter)
+        time.sleep(self.latency + jitter)
+
+    def _take_token(self):
+        """
+        Take a token of the request bucket, refilled at the rate limit.
+        """
+        if not self.rate_limit:
+            return True
+
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst,
+            self._tokens + (now - self._tokens_updated) * self.rate_limit,
+        )
+        self._tokens_updated = now
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+    def _errors(self, code, message):
+        return {'errors': [{'code': code, 'message': message}]}
+
+    def _route(self, method, path, query, payload):
+        # The SDK joins some paths with a double slash, as in '/v2//public-key'
+        path = re.sub('/+', '/', path)
+        match = re.fullmatch(r'/v2/([a-z-]+)(?:/(\w+))?', path)
+        if match is None:
+            raise MockApiError(
+                HTTPStatus.NOT_FOUND, 'notFound', f'Unknown path {path}'
+            )
+
+        resource, id = match.groups()
+        if resource == 'public-key' and method == 'GET':
+            return {
+                'cursor': None,
+                'publicKeys': [
+                    {'content': self.public_key_pem, 'created': _now()}
+                ],
+            }
+
+        if resource in ('invoice', 'transfer'):
+            entities = (
+                self.invoices if resource == 'invoice' else self.transfers
+            )
+            if method == 'POST' and id is None:
+                return self._create(resource, payload)
+            if method == 'GET' and id is None:
+                return self._page(resource, entities, query)
+            if method == 'GET':
+                return {resource: self._get(resource, entities, id)}
+
+        if resource == 'event':
+            if method == 'GET' and id is None:
+                return self._page(resource, self.events, query)
+            if method == 'GET':
+                return {'event': self._get(resource, self.events, id)}
+            if method == 'PATCH':
+                with self._lock:
+                    event = self._get(resource, self.events, id)
+                    if 'isDelivered' in payload:
+                        event['isDelivered'] = bool(payload['isDelivered'])
+                return {'event': event}
+            if method == 'DELETE':
+                with self._lock:
+                    event = self._get(resource, self.events, id)
+                    del self.events[id]
+                return {'event': event}
+
+        raise MockApiError(
+            HTTPStatus.METHOD_NOT_ALLOWED,
+            'methodNotAllowed',
+            f'{method} is not allowed on {path}',
+        )
+
+    def _get(self, resource, entities, id):
+        entity = entities.get(id)
+        if entity is None:
+            raise MockApiError(
+                HTTPStatus.BAD_REQUEST,
+                f'invalid{resource.title()}Id',
+                f'{resource} {id} not found',
+            )
+        return entity
+
+    def _create(self, resource, payload):
+        """
+        Validate and store the invoices or transfers of a creation request.
+        """
+        plural = f'{resource}s'
+        items = payload.get(plural)
+        if not isinstance(items, list) or not items:
+            raise MockApiError(
+                HTTPStatus.BAD_REQUEST,
+                f'invalid{resource.title()}',
+                f'Send a non-empty list of {plural}',
+            )
+        if len(items) > MAX_ITEMS_PER_REQUEST:
+            raise MockApiError(
+                HTTPStatus.BAD_REQUEST,
+                'invalidJson',
+                f'Send at most {MAX_ITEMS_PER_REQUEST} {plural} per request',
+            )
+        for index, item in enumerate(items):
+            missing = [f for f in REQUIRED_FIELDS[resource] if f not in item]
+            if missing:
+                raise MockApiError(
+                    HTTPStatus.BAD_REQUEST,
+                    f'invalid{resource.title()}',
+                    f'Element {index}: missing {", ".join(missing)}',
+                )
+
+        created = []
+        with self._lock:
+            if resource == 'transfer':
+                self._check_external_ids(items)
+            for item in items:
+                entity = dict(
+                    item,
+                    id=str(next(self._ids)),
+                    status='created',
+                    fee=0,
+                    transactionIds=[],
+                    created=_now(),
+                    updated=_now(),
+                )
+                if resource == 'invoice':
+                    self.invoices[entity['id']] = entity
+                    if self._random.random() < self.payment_rate:
+                        heapq.heappush(
+                            self._payments,
+                            (
+                                time.monotonic() + self.payment_delay,
+                                entity['id'],
+                            ),
+                        )
+                else:
+                    self.transfers[entity['id']] = entity
+                created.append(entity)
+            self._payments_ready.notify()
+
+        return {
+            'message': f'{plural.title()} successfully created',
+            plural: created,
+        }
+
+    def _check_external_ids(self, transfers):
+        """
+        Reject the transfers whose external ID was already used.
+        """
+        used = {t.get('externalId') for t in self.transfers.values()}
+        for index, transfer in enumerate(transfers):
+            external_id = transfer.get('externalId')
+            if external_id is not None and external_id in used:
+                raise MockApiError(
+                    HTTPStatus.BAD_REQUEST,
+                    'invalidExternalId',
+                    f'Element {index}: externalId {external_id} '
+                    'has already been used',
+                )
+
+    def _page(self, resource, entities, query):
+        """
+        Return a page of entities, from the newest, with an offset cursor.
+        """
+        limit = min(int(query.get('limit', MAX_ITEMS_PER_REQUEST)), 100)
+        offset = int(query.get('cursor') or 0)
+        with self._lock:
+            items = list(reversed(entities.values()))
+
+        if 'ids' in query:
+            ids = set(query['ids'].split(','))
+            items = [item for item in items if item['id'] in ids]
+        if 'tags' in query:
+            tags = set(query['tags'].split(','))
+            items = [
+                item for item in items if tags & set(item.get('tags') or ())
+            ]
+        if 'status' in query:
+            statuses = set(query['status'].split(','))
+            items = [item for item in items if item.get('status') in statuses]
+        if 'isDelivered' in query:
+            delivered = query['isDelivered'].lower() == 'true'
+            items = [
+                item for item in items if item.get('isDelivered') == delivered
+            ]
+
+        page = items[offset : offset + limit]
+        cursor = offset + limit if offset + limit < len(items) else None
+        return {
+            'cursor': str(cursor) if cursor else None,
+            f'{resource}s': page,
+        }
+
+    def _pay_invoices(self):
+        """
+        Pay the scheduled invoices as they become due.
+        """
+        while True:
+            with self._payments_ready:
+                while self._running and (
+                    not self._payments
+                    or self._payments[0][0] > time.monotonic()
+                ):
+                    timeout = (
+                        self._payments[0][0] - time.monotonic()
+                        if self._payments
+                        else None
+                    )
+                    self._payments_ready.wait(timeout)
+
+                if not self._running:
+                    return
+
+                _, invoice_id = heapq.heappop(self._payments)
+                event = self._pay_invoice(invoice_id)
+
+            self._deliver(event)
+
+    def _pay_invoice(self, invoice_id):
+        """
+        Mark an invoice as paid and store its 'credited' event.
+        """
+        invoice = self.invoices[invoice_id]
+        invoice.update(status='paid', fee=self.invoice_fee, updated=_now())
+        event = {
+            'id': str(next(self._ids)),
+            'subscription': 'invoice',
+            'isDelivered': False,
+            'created': _now(),
+            'workspaceId': '1',
+            'log': {
+                'id': str(next(self._ids)),
+                'type': 'credited',
+                'created': _now(),
+                'errors': [],
+                'invoice': dict(invoice),
+            },
+        }
+        self.events[event['id']] = event
+        return event
+
+    def _deliver(self, event):
+        """
+        Push a signed event to the webhook URL, if any.
+        """
+        if not self.webhook_url:
+            return
+
+        content = json.dumps({'event': event})
+        try:
+            response = self._session.post(
+                self.webhook_url,
+                data=content.encode('utf-8'),
+                headers={'Digital-Signature': self.sign(content)},
+                timeout=10,
+            )
+            delivered = response.status_code == HTTPStatus.OK
+        except requests.exceptions.RequestException as req_error:
+            mock_api_logger.warning(f'Event delivery failed: {req_error}')
+            delivered = False
+
+        with self._lock:
+            event['isDelivered'] = delivered
+            self.stats['delivered' if delivered else 'undelivered'] += 1
+
+
+def main(argv=None):
+    """
+    Run a MockStarkbankServer from the command line until interrupted.
+    """
+    parser = argparse.ArgumentParser(description='Local Stark Bank API mock.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0)
+    parser.add_argument('--burst', type=int, default=None)
+    parser.add_argument('--payment-rate', type=float, default=1.0)
+    parser.add_argument('--payment-delay', type=float, default=0.0)
+    parser.add_argument('--invoice-fee', type=int, default=0)
+    parser.add_argument('--webhook-url', default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockStarkbankServer(**vars(args))
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        mock_api_logger.info(
+            f'Mock Stark Bank API stopped. Stats: {server.stats}'
+        )
+
+
+if __name__ == '__main__':
+    main()
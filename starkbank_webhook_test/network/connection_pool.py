@@ -0,0 +1,196 @@
+import threading
+
+SDK_METHODS = ('get', 'post', 'patch', 'put', 'delete')
+STARKBANK_HOSTS = (
+    'https://api.starkbank.com/',
+    'https://sandbox.api.starkbank.com/',
+)
+
+_sdk_lock = threading.Lock()
+_sdk_originals = {}
+
+
+class ConnectionPool:
+    """
+    A class for sharing HTTP connections across the outbound calls.
+
+    It owns a requests Session whose connections are kept alive and reused,
+    so the webhook polling and the Stark Bank SDK calls do not open a new
+    TCP/TLS connection on every request.
+
+    Failed connections are retried with exponential backoff. Responses with
+    a retryable status (429, 502, 503 and 504) are retried only for idempotent
+    methods, so a transfer creation is never sent twice by the pool.
+
+    Attributes:
+        - pool_size (int): The maximum number of connections kept per host.
+        - timeout (float): The default timeout in seconds of each request.
+        - retries (int): The maximum number of retries of each request.
+        - backoff_factor (float): The base of the exponential backoff in seconds.
+        - keep_alive (bool): Reuse the connections across requests.
+        - base_url (str): The URL replacing the Stark Bank API host, if any.
+        - session (requests.Session): The pooled session.
+    """
+
+    RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: float = 15,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        keep_alive: bool = True,
+        base_url: str = None,
+    ):
+        """
+        Initialize the ConnectionPool and its session.
+
+        Args:
+            - pool_size (int): The maximum number of connections kept per host.
+            - timeout (float): The default timeout in seconds of each request.
+            - retries (int): The maximum number of retries of each request.
+            - backoff_factor (float): The base of the exponential backoff in seconds.
+            - keep_alive (bool): Reuse the connections across requests.
+            - base_url (str): The URL replacing the Stark Bank API host, such
+              as a local MockStarkbankServer.
+        """
+        if pool_size < 1:
+            raise ValueError('Invalid pool_size. Use a positive integer.')
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.keep_alive = keep_alive
+        self.base_url = base_url.rstrip('/') + '/' if base_url else None
+        self.session = self._create_session()
+
+    def _create_session(self):
+        """
+        Create a session with pooled and retried connections.
+        """
+        import requests
+
+        adapter = self._create_adapter()
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def _create_adapter(self):
+        """
+        Create the adapter pooling and retrying the connections.
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        return HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+
+    def set_retries(self, retries: int):
+        """
+        Change the maximum number of retries of each request.
+
+        The new adapter only replaces the old one for the next requests, so
+        the requests in flight are not interrupted.
+
+        Args:
+            - retries (int): The maximum number of retries, 0 to disable them.
+        """
+        if retries < 0:
+            raise ValueError('Invalid retries. Use a non-negative integer.')
+
+        self.retries = retries
+        adapter = self._create_adapter()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, **kwargs):
+        """
+        Send a request through the pooled session.
+
+        Args:
+            - method (str): The HTTP method.
+            - url (str): The request URL.
+            - kwargs: The requests arguments, the timeout defaults to the pool timeout.
+
+        Returns:
+            requests.Response: The response of the request.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, self._resolve(url), **kwargs)
+
+    def _resolve(self, url):
+        """
+        Redirect the Stark Bank API URLs to the base URL, if any.
+        """
+        if self.base_url is None:
+            return url
+
+        for host in STARKBANK_HOSTS:
+            if url.startswith(host):
+                return self.base_url + url[len(host) :]
+        return url
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url: str, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def install_sdk(self):
+        """
+        Route the Stark Bank SDK requests through this pool.
+
+        The SDK sends its requests with the module-level functions of requests,
+        which open a new session for every call, so they are replaced by the
+        methods of this pool. The SDK is process-wide, so the last installed
+        pool is the one used.
+        """
+        import starkcore.utils.rest as sdk_rest
+
+        with _sdk_lock:
+            for name in SDK_METHODS:
+                _sdk_originals.setdefault(name, getattr(sdk_rest, name))
+                setattr(sdk_rest, name, getattr(self, name))
+
+    @staticmethod
+    def uninstall_sdk():
+        """
+        Restore the default requests functions used by the Stark Bank SDK.
+        """
+        import starkcore.utils.rest as sdk_rest
+
+        with _sdk_lock:
+            for name, function in _sdk_originals.items():
+                setattr(sdk_rest, name, function)
+            _sdk_originals.clear()
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
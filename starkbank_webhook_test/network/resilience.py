@@ -0,0 +1,388 @@
+import logging
+import threading
+import time
+from collections import deque
+from random import Random
+
+from starkbank_webhook_test.metrics.registry import metrics_registry
+
+resilience_logger = logging.getLogger('resilience')
+resilience_logger.setLevel(logging.DEBUG)
+
+# The kinds of errors worth retrying
+THROTTLED = 'throttled'
+TRANSIENT = 'transient'
+AMBIGUOUS = 'ambiguous'
+PERMANENT = 'permanent'
+
+# The SDK raises UnknownError with the body of the responses whose status is
+# not 200, 400 or 500, and with 'ExceptionName: ...' for the requests that
+# got no response, as status 0
+_UNKNOWN_ERROR_PREFIX = 'Unknown exception encountered: '
+_THROTTLED_BODIES = ('toomanyrequests', 'ratelimitexceeded')
+_NOT_SENT_ERRORS = ('ConnectTimeout', 'NewConnectionError', 'ProxyError')
+
+
+def _classify(error):
+    """
+    Classify a single error, without looking at its causes.
+    """
+    import requests
+    from starkbank.error import (
+        Error,
+        InputErrors,
+        InternalServerError,
+        InvalidSignatureError,
+        UnknownError,
+    )
+
+    if isinstance(error, (InputErrors, InvalidSignatureError, Error)):
+        return PERMANENT
+
+    if isinstance(error, InternalServerError):
+        return TRANSIENT
+
+    if isinstance(error, UnknownError):
+        return _classify_unknown(str(error))
+
+    if isinstance(error, requests.exceptions.HTTPError):
+        status = getattr(error.response, 'status_code', None)
+        if status == 429:
+            return THROTTLED
+        if status is not None and status >= 500:
+            return TRANSIENT
+        return PERMANENT
+
+    # The request was not sent when the connection could not be opened
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return TRANSIENT
+
+    # The request may have been processed when the connection or the
+    # response failed afterwards
+    if isinstance(
+        error,
+        (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+    ):
+        return AMBIGUOUS
+
+    return None
+
+
+def _classify_unknown(message: str):
+    """
+    Classify an UnknownError of the SDK from its message.
+
+    >>> _classify_unknown("Unknown exception encountered: b'Too Many Requests'")
+    'throttled'
+    >>> _classify_unknown('Unknown exception encountered: ReadTimeout: None')
+    'ambiguous'
+    """
+    content = message.removeprefix(_UNKNOWN_ERROR_PREFIX)
+    if not content.startswith(('b"', "b'")):
+        # No response: status 0
+        if any(error in content for error in _NOT_SENT_ERRORS):
+            return TRANSIENT
+        return AMBIGUOUS
+
+    body = content.lower().replace(' ', '')
+    if any(throttled in body for throttled in _THROTTLED_BODIES):
+        return THROTTLED
+    return TRANSIENT
+
+
+def classify_error(error: BaseException):
+    """
+    Return whether an error is worth retrying.
+
+    The integration wraps the Stark Bank errors, so the chain of causes is
+    searched for the original error.
+
+    Args:
+        - error (BaseException): The error raised by the call.
+
+    Returns:
+        str: 'throttled' for 429 responses, 'transient' for server errors
+            and requests not sent, 'ambiguous' for requests that may have
+            been processed without a response, such as timeouts, and
+            'permanent' for the others.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        kind = _classify(error)
+        if kind is not None:
+            return kind
+        error = error.__cause__ or error.__context__
+    return PERMANENT
+
+
+def find_cause(error: BaseException, error_type):
+    """
+    Return the first error of a type in the chain of causes of an error.
+
+    >>> try:
+    ...     try:
+    ...         raise CircuitOpenError('open', retry_after=5)
+    ...     except CircuitOpenError as e:
+    ...         raise RuntimeError('wrapped') from e
+    ... except RuntimeError as e:
+    ...     find_cause(e, CircuitOpenError).retry_after
+    5
+
+    Args:
+        - error (BaseException): The error raised.
+        - error_type (type): The type searched.
+
+    Returns:
+        BaseException: The error found, or None.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, error_type):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+
+class CircuitOpenError(Exception):
+    """Custom exception for calls rejected by an open circuit breaker."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Backoff:
+    """
+    An exponential backoff with full jitter.
+
+    The delay before the retry n is a random value between 0 and
+    min(max_delay, base_delay * 2 ** n), so the clients failing together do
+    not retry together.
+
+    Attributes:
+        - base_delay (float): The delay cap of the first retry in seconds.
+        - max_delay (float): The maximum delay in seconds.
+    """
+
+    def __init__(
+        self, base_delay: float = 0.5, max_delay: float = 30, seed: int = None
+    ):
+        if base_delay <= 0 or max_delay < base_delay:
+            raise ValueError(
+                'Invalid delays. Use 0 < base_delay <= max_delay.'
+            )
+
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = Random(seed)
+
+    def delay(self, attempt: int):
+        """
+        Return the delay in seconds before a retry.
+
+        Args:
+            - attempt (int): The number of attempts already failed, from 1.
+        """
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return self._random.uniform(0, cap)
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker shedding load while the API is failing.
+
+    The outcomes of the last `window` calls are kept. When at least
+    `minimum_calls` of them were made and the failure rate reaches
+    `failure_threshold`, the circuit opens and every call is rejected for
+    `reset_timeout` seconds. Then the circuit is half-open: a single trial
+    call is let through, closing the circuit if it succeeds and opening it
+    again if it fails.
+
+    Only throttled, transient and ambiguous errors are failures: a permanent
+    error means the API is answering.
+
+    Attributes:
+        - failure_threshold (float): The failure rate opening the circuit.
+        - window (int): The number of recent calls considered.
+        - minimum_calls (int): The calls needed before the circuit may open.
+        - reset_timeout (float): How long in seconds the circuit stays open.
+        - state (str): 'closed', 'open' or 'half_open'.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        window: int = 20,
+        minimum_calls: int = 10,
+        reset_timeout: float = 30,
+        name: str = 'starkbank',
+    ):
+        if not 0 < failure_threshold <= 1:
+            raise ValueError(
+                'Invalid failure_threshold. Use a rate between 0 and 1.'
+            )
+
+        if window < 1 or not 1 <= minimum_calls <= window:
+            raise ValueError(
+                'Invalid window. Use 1 <= minimum_calls <= window.'
+            )
+
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.state = 'closed'
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def failure_rate(self):
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    @property
+    def retry_after(self):
+        """
+        Return how long in seconds the circuit stays open, 0 if not open.
+        """
+        with self._lock:
+            if self.state != 'open':
+                return 0.0
+            elapsed = time.monotonic() - self._opened_at
+            return max(0.0, self.reset_timeout - elapsed)
+
+    def _transition(self, state):
+        resilience_logger.warning(
+            f'Circuit breaker {self.name} is {state}. '
+            f'Previous state: {self.state}'
+        )
+        metrics_registry.increment(
+            'circuit_breaker_transitions_total', breaker=self.name, state=state
+        )
+        self.state = state
+
+    def allow(self):
+        """
+        Return whether a call may be made now.
+        """
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition('half_open')
+
+            if self.state == 'half_open':
+                if self._trial:
+                    return False
+                self._trial = True
+            return True
+
+    def record(self, success: bool):
+        """
+        Record the outcome of an allowed call.
+
+        Args:
+            - success (bool): False for throttled and transient errors.
+        """
+        with self._lock:
+            if self.state == 'half_open':
+                self._trial = False
+                if success:
+                    self._outcomes.clear()
+                    self._transition('closed')
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(success)
+            if (
+                self.state == 'closed'
+                and len(self._outcomes) >= self.minimum_calls
+                and self._outcomes.count(False) / len(self._outcomes)
+                >= self.failure_threshold
+            ):
+                self._open()
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._transition('open')
+
+
+class RetryPolicy:
+    """
+    A policy retrying the calls failing with retryable errors.
+
+    Each failed attempt of a retryable kind waits for the backoff and tries
+    again, up to `max_attempts` attempts. The calls go through the circuit
+    breaker, if any, which rejects them with CircuitOpenError while open.
+
+    Attributes:
+        - max_attempts (int): The maximum number of attempts of a call.
+        - backoff (Backoff): The delays between the attempts.
+        - breaker (CircuitBreaker): The circuit breaker, optional.
+        - retry_on (tuple[str]): The kinds of errors retried.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff: Backoff = None,
+        breaker: CircuitBreaker = None,
+        retry_on: tuple = (THROTTLED, TRANSIENT),
+    ):
+        if max_attempts < 1:
+            raise ValueError('Invalid max_attempts. Use a positive integer.')
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff or Backoff()
+        self.breaker = breaker
+        self.retry_on = tuple(retry_on)
+
+    def call(self, function, *args, **kwargs):
+        """
+        Call a function, retrying it on retryable errors.
+
+        Raises:
+            - CircuitOpenError: If the circuit breaker rejects the call.
+            - Exception: The last error of the function.
+        """
+        attempt = 0
+        while True:
+            if self.breaker is not None and not self.breaker.allow():
+                raise CircuitOpenError(
+                    f'Circuit breaker {self.breaker.name} is open.',
+                    retry_after=self.breaker.retry_after,
+                )
+
+            attempt += 1
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                if self.breaker is not None:
+                    self.breaker.record(kind == PERMANENT)
+                if kind not in self.retry_on or attempt >= self.max_attempts:
+                    raise
+
+                delay = self.backoff.delay(attempt)
+                metrics_registry.increment(
+                    'retries_total',
+                    operation=getattr(function, '__name__', 'call'),
+                    kind=kind,
+                )
+                resilience_logger.warning(
+                    f'Retrying in {delay:.3f}s. Attempt: {attempt} | '
+                    f'Error: {kind}'
+                )
+                time.sleep(delay)
+            else:
+                if self.breaker is not None:
+                    self.breaker.record(True)
+                return result
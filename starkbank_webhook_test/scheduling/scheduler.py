@@ -0,0 +1,173 @@
+import time
+from random import Random
+
+
+class Scheduler:
+    """
+    A class for pacing work at a target rate of ticks per second.
+
+    The schedule is absolute: each tick has a theoretical release time computed
+    from the start of the schedule, so the time spent by the caller between two
+    ticks is discounted from the next wait instead of being added to it.
+
+    Modes:
+        - deadline: ticks are released every 1 / rate seconds.
+        - token_bucket: ticks are released at the average rate, allowing
+          bursts of up to `burst` ticks when the caller falls behind.
+        - poisson: ticks are released with exponentially distributed gaps,
+          simulating random arrivals at the average rate.
+
+    Attributes:
+        - rate (float): The target number of ticks per second.
+        - mode (str): The pacing mode.
+        - burst (int): The bucket capacity for the token_bucket mode.
+        - ticks (int): The number of ticks released so far.
+        - lag (float): How many seconds the last tick was behind schedule.
+    """
+
+    MODES = ('deadline', 'token_bucket', 'poisson')
+
+    def __init__(
+        self,
+        rate: float,
+        mode: str = 'deadline',
+        burst: int = 1,
+        seed: int = None,
+    ):
+        """
+        Initialize the Scheduler with the target rate and pacing mode.
+
+        Args:
+            - rate (float): The target number of ticks per second.
+            - mode (str): The pacing mode ('deadline', 'token_bucket' or 'poisson').
+            - burst (int): The bucket capacity for the token_bucket mode.
+            - seed (int): Seed for the random gaps of the poisson mode.
+        """
+        if rate <= 0:
+            raise ValueError('Invalid rate. Use a positive number.')
+
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid mode. Use {', '.join(self.MODES)}.")
+
+        if burst < 1:
+            raise ValueError('Invalid burst. Use a positive integer.')
+
+        self.rate = rate
+        self.mode = mode
+        self.burst = burst
+        self.interval = 1 / rate
+        self._random = Random(seed)
+        self.reset()
+
+    def reset(self):
+        """
+        Restart the schedule from the current time.
+        """
+        self.ticks = 0
+        self.lag = 0.0
+        self._next_tick = None
+
+    def set_rate(self, rate: float):
+        """
+        Change the target rate, keeping the ticks already released.
+
+        Args:
+            - rate (float): The new target number of ticks per second.
+        """
+        if rate <= 0:
+            raise ValueError('Invalid rate. Use a positive number.')
+
+        interval = 1 / rate
+        if self._next_tick is not None and self.mode != 'poisson':
+            self._next_tick += interval - self.interval
+        self.rate = rate
+        self.interval = interval
+
+    def _release_time(self, now):
+        """
+        Return the earliest time at which the next tick may be released.
+        """
+        if self._next_tick is None:
+            return now
+
+        if self.mode == 'token_bucket':
+            return self._next_tick - (self.burst - 1) * self.interval
+
+        return self._next_tick
+
+    def _advance(self, released_at):
+        """
+        Compute the theoretical time of the tick following the released one.
+        """
+        if self.mode == 'poisson':
+            gap = self._random.expovariate(self.rate)
+        else:
+            gap = self.interval
+
+        if self._next_tick is None:
+            self._next_tick = released_at + gap
+        elif self.mode == 'token_bucket':
+            # Unused capacity beyond the bucket size is lost
+            self._next_tick = max(self._next_tick, released_at) + gap
+        else:
+            self._next_tick += gap
+
+    def _release(self, released_at):
+        """
+        Release the next tick at the given time and return its lag.
+        """
+        if self._next_tick is None:
+            self.lag = 0.0
+        else:
+            self.lag = max(0.0, released_at - self._next_tick)
+
+        self._advance(released_at)
+        self.ticks += 1
+        return self.lag
+
+    def delay(self):
+        """
+        Return how many seconds remain until the next tick is due.
+        """
+        now = time.monotonic()
+        return max(0.0, self._release_time(now) - now)
+
+    def try_tick(self):
+        """
+        Release the next tick without blocking, if it is already due.
+
+        Returns:
+            bool: True if a tick was released.
+        """
+        now = time.monotonic()
+        if now < self._release_time(now):
+            return False
+
+        self._release(now)
+        return True
+
+    def wait(self):
+        """
+        Block until the next tick is due.
+
+        Returns:
+            float: How many seconds the tick was released behind schedule.
+        """
+        now = time.monotonic()
+        release_time = self._release_time(now)
+
+        if now < release_time:
+            time.sleep(release_time - now)
+            released_at = release_time
+        else:
+            released_at = now
+
+        return self._release(released_at)
+
+    def __iter__(self):
+        """
+        Yield the tick number forever, waiting for each tick to be due.
+        """
+        while True:
+            self.wait()
+            yield self.ticks
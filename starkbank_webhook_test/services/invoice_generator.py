@@ -1,29 +1,36 @@
-import json
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
 
-from starkbank_webhook_test.constants import INPUT_DIR, OUTPUT_DIR
+from starkbank_webhook_test.async_logging import QueueLogging
+from starkbank_webhook_test.constants import (
+    INVOICE_GENERATOR_SETTINGS_PATH,
+    OUTPUT_DIR,
+)
+from starkbank_webhook_test.metrics.exporter import start_exporters
+from starkbank_webhook_test.metrics.registry import metrics_registry
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.settings import settings_store
 from starkbank_webhook_test.starkbank_integration import (
     StarkbankIntegration,
     StarkbankIntegrationError,
 )
 
 # Constants for file paths
-SETTINGS_FILE_PATH = os.path.join(
-    INPUT_DIR, 'settings/invoices_generator_setup.json'
-)
+SETTINGS_FILE_PATH = INVOICE_GENERATOR_SETTINGS_PATH
 LOG_FILE_PATH = os.path.join(OUTPUT_DIR, 'logs/invoice_generator_service.log')
 
 # Setting up logger and handler for the InvoiceGeneratorService class
 service_logger = logging.getLogger('InvoiceGeneratorService')
 service_logger.setLevel(logging.DEBUG)
 
-handler = TimedRotatingFileHandler(
-    LOG_FILE_PATH, when='midnight', backupCount=7
+# Loggers written to the service log file while the service runs
+LOGGERS = (
+    service_logger.name,
+    'starkbank_integration',
+    'resilience',
+    'metrics',
+    'settings',
 )
-handler.setLevel(logging.DEBUG)
-service_logger.addHandler(handler)
 
 
 # Create a class for handling Invoice Generation
@@ -38,21 +45,22 @@ class InvoiceGeneratorService:
             - private_key_path (str): Path to the private key file.
         """
         try:
-            # Load the json object called 'engine' from the configuration file
-            with open(settings_file_path, 'r') as settings_file:
-                engine_config = json.load(settings_file).get('engine', {})
+            # Load the validated 'engine' object shared by the process
+            engine_settings = settings_store.load(settings_file_path).engine
 
-            # Load the private key from the specified file
-            with open(private_key_path, 'r') as private_key_file:
-                private_key = private_key_file.read()
+            # Load the private key once per process
+            private_key = settings_store.private_key(private_key_path)
 
             # Initialize StarkbankIntegration instance using 'engine' object and private key
             starkbank_integration = StarkbankIntegration(
-                environment=engine_config.get('environment', 'sandbox'),
-                id=engine_config.get('id', ''),
+                environment=engine_settings.environment,
+                id=engine_settings.id,
                 private_key=private_key,
-                auth_type=engine_config.get('auth_type', 'project'),
-                webhook_url=engine_config.get('webhook_url', ''),
+                auth_type=engine_settings.auth_type,
+                webhook_url=engine_settings.webhook_url,
+                connection_pool=ConnectionPool(
+                    **engine_settings.connection_pool
+                ),
             )
             # Create a StarkbankIntegration instance
             return starkbank_integration
@@ -67,8 +75,8 @@ class InvoiceGeneratorService:
             - settings_file_path (str): Path to the configuration file.
             - private_key_path (str): Path to the private key file.
         """
-        with open(settings_file_path, 'r') as settings_file:
-            self.params = json.load(settings_file).get('params', {})
+        self.settings_file_path = settings_file_path
+        self.params = settings_store.load(settings_file_path).params
 
         try:
             self.engine = self.create_engine(
@@ -78,22 +86,48 @@ class InvoiceGeneratorService:
             service_logger.error(f'Engine creation error: {e}')
             raise e
 
+    def _reload_params(self):
+        """
+        Return the current 'params', read again if the settings file changed.
+        """
+        self.params = settings_store.reload(self.settings_file_path).params
+        return self.params
+
     def run(self):
         """
         Run the invoice generation process using StarkbankIntegration instance.
         """
+        # Write the logs from a background thread
+        log_pipeline = QueueLogging(
+            LOG_FILE_PATH, LOGGERS, **self.params.get('logging', {})
+        )
+        log_pipeline.start()
+
+        # Expose the latency of the integration calls
+        exporters = start_exporters(
+            metrics_registry, self.params.get('metrics', {}), service_logger
+        )
         try:
             # Connect to Stark Bank API for authentication
             self.engine.connect()
 
+            # Retry the failed calls and shed load while the API is failing
+            resilience_settings = self.params.get('resilience')
+            if resilience_settings:
+                self.engine.enable_resilience(**resilience_settings)
+
             # Run the invoice generation process
-            self.engine.issue_random_invoices(self.params)
+            self.engine.issue_random_invoices(
+                self.params, reload_params=self._reload_params
+            )
 
         except StarkbankIntegrationError as e:
             # Log any exception that occurs during invoice generation
             service_logger.error(f'Invoice generation error: {e}')
+            raise
         finally:
-            # Close the logger handler to flush any buffered logs
-            for handler in service_logger.handlers:
-                handler.close()
-                service_logger.removeHandler(handler)
+            for exporter in exporters:
+                exporter.stop()
+
+            # Write the queued logs and close the log file
+            log_pipeline.stop()
@@ -1,23 +1,32 @@
-import json
+import asyncio
 import logging
 import os
 import time
-from logging.handlers import TimedRotatingFileHandler
 
-from requests.exceptions import RequestException
-
-from starkbank_webhook_test.constants import INPUT_DIR, OUTPUT_DIR, PRIVATE_KEY_PATH
+from starkbank_webhook_test.async_logging import QueueLogging
+from starkbank_webhook_test.constants import (
+    OUTPUT_DIR,
+    PRIVATE_KEY_PATH,
+    TRANSFER_GENERATOR_SETTINGS_PATH,
+)
+from starkbank_webhook_test.metrics.exporter import start_exporters
+from starkbank_webhook_test.metrics.registry import metrics_registry
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.network.resilience import (
+    CircuitOpenError,
+    find_cause,
+)
+from starkbank_webhook_test.scheduling.scheduler import Scheduler
+from starkbank_webhook_test.settings import settings_store
 from starkbank_webhook_test.starkbank_integration import (
-    Error,
-    InvalidSignatureError,
     StarkbankIntegration,
     StarkbankIntegrationError,
+    WebhookEventError,
 )
+from starkbank_webhook_test.webhook.receiver import WebhookReceiver
 
 # Constants for file paths
-SETTINGS_FILE_PATH = os.path.join(
-    INPUT_DIR, 'settings/transfer_generator_setup.json'
-)
+SETTINGS_FILE_PATH = TRANSFER_GENERATOR_SETTINGS_PATH
 LOG_FILE_PATH = os.path.join(OUTPUT_DIR, 'logs/transfer_generator_service.log')
 
 
@@ -25,11 +34,20 @@ LOG_FILE_PATH = os.path.join(OUTPUT_DIR, 'logs/transfer_generator_service.log')
 service_logger = logging.getLogger('TransferGeneratorService')
 service_logger.setLevel(logging.DEBUG)
 
-handler = TimedRotatingFileHandler(
-    LOG_FILE_PATH, when='midnight', backupCount=7
+# Loggers written to the service log file while the service runs
+LOGGERS = (
+    service_logger.name,
+    'starkbank_integration',
+    'transfer_batcher',
+    'transfer_outbox',
+    'webhook_receiver',
+    'event_catch_up',
+    'event_dispatcher',
+    'transfer_tracker',
+    'resilience',
+    'metrics',
+    'settings',
 )
-handler.setLevel(logging.DEBUG)
-service_logger.addHandler(handler)
 
 
 class TransferGeneratorService:
@@ -43,21 +61,22 @@ class TransferGeneratorService:
             - private_key_path (str): Path to the private key file.
         """
         try:
-            # Load the json object called 'engine' from the configuration file
-            with open(settings_file_path, 'r') as settings_file:
-                engine_config = json.load(settings_file).get('engine', {})
+            # Load the validated 'engine' object shared by the process
+            engine_settings = settings_store.load(settings_file_path).engine
 
-            # Load the private key from the specified file
-            with open(private_key_path, 'r') as private_key_file:
-                private_key = private_key_file.read()
+            # Load the private key once per process
+            private_key = settings_store.private_key(private_key_path)
 
             # Initialize StarkbankIntegration instance using 'engine' object and private key
             starkbank_integration = StarkbankIntegration(
-                environment=engine_config.get('environment', 'sandbox'),
-                id=engine_config.get('id', ''),
+                environment=engine_settings.environment,
+                id=engine_settings.id,
                 private_key=private_key,
-                auth_type=engine_config.get('auth_type', 'project'),
-                webhook_url=engine_config.get('webhook_url', ''),
+                auth_type=engine_settings.auth_type,
+                webhook_url=engine_settings.webhook_url,
+                connection_pool=ConnectionPool(
+                    **engine_settings.connection_pool
+                ),
             )
             # Create a StarkbankIntegration instance
             return starkbank_integration
@@ -72,8 +91,8 @@ class TransferGeneratorService:
             - settings_file_path (str): Path to the configuration file.
             - private_key_path (str): Path to the private key file.
         """
-        with open(settings_file_path, 'r') as settings_file:
-            self.params = json.load(settings_file).get('params', {})
+        self.settings_file_path = settings_file_path
+        self.params = settings_store.load(settings_file_path).params
 
         try:
             self.engine = self.create_engine(
@@ -83,33 +102,162 @@ class TransferGeneratorService:
             service_logger.error(f'Engine creation error: {e}')
             raise e
 
+    def _reload_params(self):
+        """
+        Return the current 'params', read again if the settings file changed.
+        """
+        self.params = settings_store.reload(self.settings_file_path).params
+        return self.params
+
     def run(self):
         """
         Run the transfer generator service using StarkbankIntegration instance.
+
+        When the settings define a 'receiver' object, the webhook callbacks are
+        received by a WebhookReceiver; otherwise the webhook URL is polled.
+
+        Raises:
+            - StarkbankIntegrationError: If the service fails, so the worker
+              exits with an error and is restarted by the supervisor.
         """
+        # Write the logs from a background thread
+        log_pipeline = QueueLogging(
+            LOG_FILE_PATH, LOGGERS, **self.params.get('logging', {})
+        )
+        log_pipeline.start()
+
+        # Expose the latency of the integration calls
+        exporters = start_exporters(
+            metrics_registry, self.params.get('metrics', {}), service_logger
+        )
         try:
             # Connect to Stark Bank API for authentication
             self.engine.connect()
 
-            start_time = time.time()
-            end_time = start_time + self.params['duration_time']
+            # Retry the failed calls and shed load while the API is failing
+            resilience_settings = self.params.get('resilience')
+            if resilience_settings:
+                self.engine.enable_resilience(**resilience_settings)
 
-            while time.time() < end_time:
-                # Listen to webhook events
-                events_response = self.engine.listen_webhook_events()
-                print(events_response.json())
+            # Index the transfer status of each paid invoice
+            transfer_tracking_settings = self.params.get('transfer_tracking')
+            if transfer_tracking_settings:
+                self.engine.enable_transfer_tracking(
+                    **transfer_tracking_settings
+                )
 
-                # Process webhook events
-                self.engine.process_webhook_events(events_response)
+            # Group the transfers of paid invoices in multi-transfer requests
+            transfer_batch_settings = self.params.get('transfer_batch')
+            if transfer_batch_settings:
+                self.engine.enable_transfer_batching(**transfer_batch_settings)
+
+            # Verify the events with a cached public key
+            signature_cache_settings = self.params.get('signature_cache')
+            if signature_cache_settings:
+                self.engine.enable_signature_cache(**signature_cache_settings)
 
-                # Wait for the next batch
-                time.sleep(self.params['repetition_time'])
+            # Record the transfers durably before sending them
+            transfer_outbox_settings = self.params.get('transfer_outbox')
+            if transfer_outbox_settings:
+                self.engine.enable_transfer_outbox(**transfer_outbox_settings)
+
+            # Skip the events and paid invoices already processed
+            deduplication_settings = self.params.get('deduplication')
+            if deduplication_settings:
+                self.engine.enable_event_deduplication(
+                    **deduplication_settings
+                )
+
+            # Handle each subscription on its own worker pool
+            dispatcher_settings = self.params.get('dispatcher')
+            if dispatcher_settings:
+                self.engine.enable_event_workers(**dispatcher_settings)
+
+            # Process the events missed while the service was down
+            catch_up_settings = self.params.get('catch_up')
+            if catch_up_settings:
+                self.engine.catch_up_events(**catch_up_settings)
+
+            receiver_settings = self.params.get('receiver')
+            if receiver_settings:
+                self._receive_webhook_events(receiver_settings)
+            else:
+                self._poll_webhook_events()
 
         except StarkbankIntegrationError as e:
             # Log any exception that occurs during webhook listening
             service_logger.error(f'Transfer Handler error: {e}')
+            raise
         finally:
-            # Close the logger handler to flush any buffered logs
-            for handler in service_logger.handlers:
-                handler.close()
-                service_logger.removeHandler(handler)
+            # Handle the queued events before sending the last transfers
+            self.engine.disable_event_workers()
+
+            # Send the transfers still waiting for their batch
+            self.engine.disable_transfer_batching()
+            self.engine.disable_transfer_outbox()
+            self.engine.disable_transfer_tracking()
+            self.engine.disable_signature_cache()
+            self.engine.disable_event_deduplication()
+
+            for exporter in exporters:
+                exporter.stop()
+
+            # Write the queued logs and close the log file
+            log_pipeline.stop()
+
+    def _receive_webhook_events(self, receiver_settings):
+        """
+        Receive the webhook callbacks pushed by Stark Bank for the service duration.
+
+        Args:
+            - receiver_settings (dict): The WebhookReceiver parameters.
+        """
+        receiver = WebhookReceiver(self.engine, **receiver_settings)
+        asyncio.run(receiver.serve(self.params['duration_time']))
+
+    def _poll_webhook_events(self):
+        """
+        Poll the webhook URL for events for the service duration.
+        """
+        start_time = time.time()
+        end_time = start_time + self.params['duration_time']
+        poll_scheduler = Scheduler(
+            rate=1 / self.params['repetition_time'],
+            mode=self.params.get('pacing', 'deadline'),
+        )
+
+        while time.time() < end_time:
+            # Wait for the next batch, discounting the last poll time
+            lag = poll_scheduler.wait()
+            if lag:
+                service_logger.warning(
+                    f'Webhook polling is {lag:.3f}s behind schedule.'
+                )
+
+            # Apply a new polling interval from the settings file
+            poll_rate = 1 / self._reload_params()['repetition_time']
+            if poll_scheduler.rate != poll_rate:
+                poll_scheduler.set_rate(poll_rate)
+
+            try:
+                # Listen to webhook events
+                events_response = self.engine.listen_webhook_events()
+
+                # Process webhook events
+                self.engine.process_webhook_events(events_response)
+            except StarkbankIntegrationError as e:
+                circuit_open = find_cause(e, CircuitOpenError)
+                if circuit_open is None:
+                    if not isinstance(e, WebhookEventError):
+                        raise
+
+                    # The other events were processed, so keep polling
+                    service_logger.error(f'Webhook event error: {e}')
+                    continue
+
+                # Wait for the circuit to let a trial call through
+                delay = min(circuit_open.retry_after, end_time - time.time())
+                service_logger.warning(
+                    f'Webhook polling paused for {max(delay, 0):.1f}s: {e}'
+                )
+                time.sleep(max(delay, 0))
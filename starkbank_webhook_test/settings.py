@@ -0,0 +1,312 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+
+settings_logger = logging.getLogger('settings')
+settings_logger.setLevel(logging.DEBUG)
+
+ENVIRONMENTS = ('sandbox', 'production')
+AUTH_TYPES = ('project', 'organization')
+PACING_MODES = ('deadline', 'token_bucket', 'poisson')
+OBJECT_PARAMS = (
+    'load_profile',
+    'transfer_batch',
+    'transfer_outbox',
+    'transfer_tracking',
+    'signature_cache',
+    'deduplication',
+    'catch_up',
+    'dispatcher',
+    'receiver',
+    'metrics',
+    'resilience',
+    'logging',
+)
+
+
+class SettingsError(ValueError):
+    """Custom exception for invalid settings files."""
+
+    pass
+
+
+def freeze(value):
+    """
+    Return a read-only copy of a JSON value.
+
+    The objects become read-only mappings and the arrays become tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _empty():
+    return MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class EngineSettings:
+    """
+    The settings of the StarkbankIntegration of a service.
+
+    Attributes:
+        - environment (str): The environment ('sandbox' or 'production').
+        - id (str): The user ID (Project ID or Organization ID).
+        - auth_type (str): The type of authentication ('project' or 'organization').
+        - webhook_url (str): The URL for the webhook.
+        - connection_pool (Mapping): The ConnectionPool parameters.
+    """
+
+    environment: str = 'sandbox'
+    id: str = ''
+    auth_type: str = 'project'
+    webhook_url: str = ''
+    connection_pool: Mapping = field(default_factory=_empty)
+
+    @classmethod
+    def from_json(cls, engine):
+        """
+        Validate the 'engine' object of a settings file.
+
+        Raises:
+            - SettingsError: If a value is missing its expected type or choice.
+        """
+        if not isinstance(engine, dict):
+            raise SettingsError("Invalid 'engine'. Use an object.")
+
+        unknown = set(engine) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise SettingsError(
+                f"Unknown 'engine' settings: {', '.join(sorted(unknown))}."
+            )
+
+        settings = cls(**freeze(engine))
+        for name in ('environment', 'id', 'auth_type', 'webhook_url'):
+            if not isinstance(getattr(settings, name), str):
+                raise SettingsError(f"Invalid 'engine.{name}'. Use a string.")
+
+        if settings.environment.lower() not in ENVIRONMENTS:
+            raise SettingsError(
+                f"Invalid 'engine.environment'. Use {', '.join(ENVIRONMENTS)}."
+            )
+        if settings.auth_type.lower() not in AUTH_TYPES:
+            raise SettingsError(
+                f"Invalid 'engine.auth_type'. Use {', '.join(AUTH_TYPES)}."
+            )
+        if not isinstance(settings.connection_pool, Mapping):
+            raise SettingsError(
+                "Invalid 'engine.connection_pool'. Use an object."
+            )
+        return settings
+
+
+def validate_params(params):
+    """
+    Validate the 'params' shared by the services.
+
+    Raises:
+        - SettingsError: If a known parameter has an invalid value.
+    """
+    if not isinstance(params, Mapping):
+        raise SettingsError("Invalid 'params'. Use an object.")
+
+    if 'quantity_interval' in params:
+        interval = params['quantity_interval']
+        if (
+            not isinstance(interval, tuple)
+            or len(interval) != 2
+            or not all(isinstance(n, int) and n >= 0 for n in interval)
+            or interval[0] > interval[1]
+        ):
+            raise SettingsError(
+                "Invalid 'params.quantity_interval'. "
+                'Use [minimum, maximum] non-negative integers.'
+            )
+
+    for name in ('repetition_time', 'duration_time'):
+        value = params.get(name, 1)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise SettingsError(f"Invalid 'params.{name}'. Use a number.")
+        if value <= 0:
+            raise SettingsError(
+                f"Invalid 'params.{name}'. Use a positive number."
+            )
+
+    batch_size = params.get('batch_size', 0)
+    if not isinstance(batch_size, int) or batch_size < 0:
+        raise SettingsError(
+            "Invalid 'params.batch_size'. Use a non-negative integer."
+        )
+
+    if params.get('pacing', 'deadline') not in PACING_MODES:
+        raise SettingsError(
+            f"Invalid 'params.pacing'. Use {', '.join(PACING_MODES)}."
+        )
+
+    for name in OBJECT_PARAMS:
+        if name in params and not isinstance(params[name], Mapping):
+            raise SettingsError(f"Invalid 'params.{name}'. Use an object.")
+
+
+@dataclass(frozen=True)
+class ServiceSettings:
+    """
+    The validated and read-only content of a service settings file.
+
+    Attributes:
+        - path (str): The absolute path of the settings file.
+        - engine (EngineSettings): The settings of the integration.
+        - params (Mapping): The read-only service parameters.
+        - workers (int): The number of processes of the service.
+        - modified (int): The modification time of the file in nanoseconds.
+    """
+
+    path: str
+    engine: EngineSettings
+    params: Mapping
+    workers: int
+    modified: int
+
+    @classmethod
+    def from_file(cls, path: str):
+        """
+        Read and validate a settings file.
+
+        Args:
+            - path (str): Path to the settings file.
+
+        Returns:
+            ServiceSettings: The parsed settings.
+
+        Raises:
+            - SettingsError: If the file is not valid JSON or has invalid settings.
+        """
+        path = os.path.abspath(path)
+        modified = os.stat(path).st_mtime_ns
+        try:
+            with open(path, 'r') as settings_file:
+                content = json.load(settings_file)
+        except ValueError as e:
+            raise SettingsError(f'Invalid JSON in {path}: {e}')
+
+        if not isinstance(content, dict):
+            raise SettingsError(f'Invalid settings in {path}. Use an object.')
+
+        try:
+            engine = EngineSettings.from_json(content.get('engine', {}))
+            params = freeze(content.get('params', {}))
+            validate_params(params)
+        except SettingsError as e:
+            raise SettingsError(f'{e} File: {path}')
+
+        workers = content.get('workers', 1)
+        if (
+            isinstance(workers, bool)
+            or not isinstance(workers, int)
+            or workers < 0
+        ):
+            raise SettingsError(
+                f'Invalid workers in {path}. Use a non-negative integer.'
+            )
+
+        return cls(path, engine, params, workers, modified)
+
+
+class SettingsStore:
+    """
+    A process-wide cache of the settings files and private keys.
+
+    Each settings file is read and validated once, and every service of the
+    process shares the same read-only ServiceSettings. `reload` checks the
+    modification time of the file and parses it again only when it changed,
+    so it is cheap enough to be called before each cycle of a service. An
+    invalid edit is logged and the previous settings are kept.
+    """
+
+    def __init__(self):
+        self._settings = {}
+        self._private_keys = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str):
+        """
+        Return the settings of a file, reading it on first use.
+
+        Args:
+            - path (str): Path to the settings file.
+
+        Returns:
+            ServiceSettings: The shared settings.
+
+        Raises:
+            - SettingsError: If the file has invalid settings.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            settings = self._settings.get(path)
+            if settings is None:
+                settings = ServiceSettings.from_file(path)
+                self._settings[path] = settings
+            return settings
+
+    def reload(self, path: str):
+        """
+        Return the settings of a file, reading it again if it changed.
+
+        Args:
+            - path (str): Path to the settings file.
+
+        Returns:
+            ServiceSettings: The current settings, the previous ones if the
+                changed file is invalid.
+        """
+        current = self.load(path)
+        try:
+            if os.stat(current.path).st_mtime_ns == current.modified:
+                return current
+            settings = ServiceSettings.from_file(current.path)
+        except (OSError, SettingsError) as e:
+            settings_logger.error(f'Settings not reloaded: {e}')
+            return current
+
+        with self._lock:
+            self._settings[current.path] = settings
+        settings_logger.info(f'Settings reloaded. File: {current.path}')
+        return settings
+
+    def private_key(self, path: str):
+        """
+        Return the content of a private key file, reading it on first use.
+
+        Args:
+            - path (str): Path to the private key file.
+
+        Returns:
+            str: The private key content.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            private_key = self._private_keys.get(path)
+            if private_key is None:
+                with open(path, 'r') as private_key_file:
+                    private_key = private_key_file.read()
+                self._private_keys[path] = private_key
+            return private_key
+
+    def clear(self):
+        """
+        Forget the cached settings and private keys.
+        """
+        with self._lock:
+            self._settings = {}
+            self._private_keys = {}
+
+
+settings_store = SettingsStore()
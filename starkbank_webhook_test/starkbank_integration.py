@@ -1,22 +1,130 @@
 import logging
 import time
+import uuid
+from concurrent.futures import Future
 from datetime import datetime, timedelta
-from random import randint, sample, uniform
+from functools import partial, wraps
 from urllib.parse import urlparse
 
-import requests
-import starkbank
-import starkbank.transfer as sb_transfer
-from faker import Faker
-from kami_logging import benchmark_with, logging_with
-from starkbank import Invoice, Transfer
-from starkbank.error import Error, InvalidSignatureError
-
-from starkbank_webhook_test.auth.authenticator import AuthenticationError, Authenticator
+from starkbank_webhook_test.auth.authenticator import (
+    AuthenticationError,
+    Authenticator,
+)
+from starkbank_webhook_test.constants import (
+    DEDUP_STORE_PATH,
+    EVENT_CATCH_UP_PATH,
+    TRANSFER_OUTBOX_PATH,
+    TRANSFER_TRACKER_PATH,
+)
+from starkbank_webhook_test.generators.invoice_data import FakerPool
+from starkbank_webhook_test.generators.load_profile import build_profile
+from starkbank_webhook_test.metrics.registry import (
+    metrics_registry,
+    timed_with,
+)
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.network.resilience import (
+    AMBIGUOUS,
+    THROTTLED,
+    TRANSIENT,
+    Backoff,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+)
+from starkbank_webhook_test.scheduling.scheduler import Scheduler
+from starkbank_webhook_test.transfers.batcher import TransferBatcher
+from starkbank_webhook_test.transfers.outbox import TransferOutbox
+from starkbank_webhook_test.transfers.tracker import TransferTracker
+from starkbank_webhook_test.webhook.batch import (
+    BatchFormatError,
+    iter_windows,
+)
+from starkbank_webhook_test.webhook.catch_up import (
+    EVENT_PAGE_LIMIT,
+    EventCatchUp,
+)
+from starkbank_webhook_test.webhook.dedup_store import DedupStore
+from starkbank_webhook_test.webhook.dispatcher import (
+    EventDispatcher,
+    completed,
+)
 
 intregation_logger = logging.getLogger('starkbank_integration')
 intregation_logger.setLevel(logging.DEBUG)
 
+# Maximum number of invoices accepted by a single invoice.create request
+INVOICE_BATCH_LIMIT = 100
+
+# Delay cap in seconds of the first retry of a failed invoice chunk
+INVOICE_RETRY_DELAY = 0.5
+
+# Number of batched webhook events verified together before being dispatched
+EVENT_BATCH_WINDOW = 256
+
+# Size in bytes of the chunks read from a batched webhook response
+EVENT_BATCH_CHUNK_SIZE = 65536
+
+# The invoice rule keys accepted by the API
+INVOICE_RULE_KEYS = ('allowedTaxIds',)
+
+# The Stark Bank SDK, requests and kami_logging are imported where they are
+# used, so importing this module does not load them
+
+
+def logging_with(logger: logging.Logger):
+    """
+    Decorator logging the calls of a method with kami_logging.
+
+    kami_logging is imported on the first call, since importing it also
+    configures the root logger.
+
+    Args:
+        - logger (logging.Logger): The logger of the calls.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            from kami_logging import logging_with as kami_logging_with
+
+            return kami_logging_with(logger)(method)(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def retried_with(operation: str):
+    """
+    Decorator retrying a method with the retry policy of its operation.
+
+    The method is called once when the integration has no policy for the
+    operation. A call rejected by an open circuit breaker raises a
+    StarkbankIntegrationError caused by the CircuitOpenError.
+
+    Args:
+        - operation (str): The key of the policy in `retry_policies`.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            policy = self.retry_policies.get(operation)
+            if policy is None:
+                return method(self, *args, **kwargs)
+
+            try:
+                return policy.call(method, self, *args, **kwargs)
+            except CircuitOpenError as e:
+                raise StarkbankIntegrationError(
+                    f'Request not sent: {e}'
+                ) from e
+
+        return wrapper
+
+    return decorator
+
 
 class StarkbankIntegration:
     """
@@ -26,6 +134,13 @@ class StarkbankIntegration:
         - authenticator (Authenticator): The Authenticator instance for authentication.
         - user (starkbank.Project or starkbank.Organization): The authenticated Stark Bank user.
         - webhook (Webhook): The Webhook instance for handling callback events.
+        - connection_pool (ConnectionPool): The pooled connections for the outbound calls.
+        - faker_pool (FakerPool): The shared source of synthetic invoice data.
+        - transfer_batcher (TransferBatcher): Groups transfers when batching is enabled.
+        - transfer_tracker (TransferTracker): Indexes the transfer statuses when tracking is enabled.
+        - signature_verifier (SignatureVerifier): Verifies events when caching is enabled.
+        - dedup_store (DedupStore): Skips processed events when deduplication is enabled.
+        - event_dispatcher (EventDispatcher): Routes the events to their handlers.
     """
 
     def __init__(
@@ -35,6 +150,7 @@ class StarkbankIntegration:
         private_key: str,
         auth_type: str,
         webhook_url: str,
+        connection_pool: ConnectionPool = None,
     ):
         """
         Initialize the StarkbankIntegration with the required data.
@@ -45,6 +161,7 @@ class StarkbankIntegration:
             - private_key (str): The private key content for ECDSA authentication.
             - auth_type (str): The type of authentication ('project' or 'organization').
             - webhook_url (str): The URL for the webhook.
+            - connection_pool (ConnectionPool): The pool for the outbound calls.
         """
         try:
             self.authenticator = Authenticator(
@@ -58,6 +175,28 @@ class StarkbankIntegration:
             raise StarkbankIntegrationError(f'Authentication failed: {ae}')
 
         self.user = None
+        self.connection_pool = connection_pool or ConnectionPool()
+        self.faker_pool = FakerPool()
+        self.transfer_batcher = None
+        self.transfer_outbox = None
+        self.transfer_tracker = None
+        self.signature_verifier = None
+        self.dedup_store = None
+        self.retry_policies = {}
+        self._pool_retries = None
+        self.event_dispatcher = EventDispatcher()
+        self._register_event_handlers()
+
+    def _register_event_handlers(self):
+        """
+        Register the handlers of the webhook subscriptions.
+        """
+        register = self.event_dispatcher.register
+        register('invoice', self._process_invoice_credit, ['credited'])
+        register('invoice', self._log_event)
+        register('transfer', self._process_transfer_event)
+        register('boleto', self._log_event)
+        register('deposit', self._log_event)
 
     def _validate_webhook_url(self, webhook_url: str):
         """
@@ -76,7 +215,7 @@ class StarkbankIntegration:
             )
 
     @logging_with(intregation_logger)
-    @benchmark_with(intregation_logger)
+    @timed_with(metrics_registry)
     def connect(self):
         """
         Connect to Stark Bank API using the authenticator and set the user attribute.
@@ -86,6 +225,7 @@ class StarkbankIntegration:
         """
         try:
             self.user = self.authenticator.authenticate()
+            self.connection_pool.install_sdk()
         except AuthenticationError as ae:
             raise StarkbankIntegrationError(f'Authentication failed: {ae}')
 
@@ -104,46 +244,126 @@ class StarkbankIntegration:
         duration_time = params.get('duration_time', 24)
         return quantity_interval, repetition_time, duration_time
 
+    def _load_profile(self, params):
+        """
+        Build the load profile of the parameters.
+
+        Args:
+            params (dict): Input parameters.
+
+        Returns:
+            LoadProfile: The number of invoices of each cycle.
+        """
+        try:
+            return build_profile(
+                params.get('load_profile'),
+                quantity_interval=params.get('quantity_interval', (8, 12)),
+                seed=params.get('seed'),
+            )
+        except (ValueError, OSError) as e:
+            raise StarkbankIntegrationError(f'Invalid load profile: {e}')
+
     @logging_with(intregation_logger)
-    @benchmark_with(intregation_logger)
-    def issue_random_invoices(self, params):
+    @timed_with(metrics_registry)
+    def issue_random_invoices(self, params, reload_params=None):
         """
         Generate a random number of invoices within the specified quantity interval,
         with a repetition time interval, and for a total duration.
 
+        The number of invoices of each cycle is given by the load profile of
+        the parameters, or drawn from the quantity interval when there is
+        none. With a seed, the numbers of a run are reproduced exactly.
+
+        When `reload_params` is given, it is called before each cycle and the
+        returned quantity_interval, load_profile, repetition_time, batch_size
+        and pacing are used from that cycle on, so they can be tuned while the
+        service runs. The duration_time is only read once.
+
         Args:
+            reload_params (callable): Optional, returns the current parameters.
             params (dict): Dictionary containing the parameters.
                 Example:
                 {
                     'quantity_interval': (8, 12),
                     'repetition_time': 180,  # in minutes
                     'duration_time': 24,  # in hours
+                    'batch_size': 100,  # optional, enables batched mode
+                    'pacing': 'deadline',  # or 'token_bucket', 'poisson'
+                    'seed': 42,  # optional, seeds the invoice data and the load profile
+                    'load_profile': {'shape': 'ramp', ...},  # optional
+                    'corpus_size': 1000,  # optional, precomputed data pool
                 }
         """
-        quantity_interval, repetition_time, duration_time = self._parse_params(
-            params
-        )
+        _, repetition_time, duration_time = self._parse_params(params)
 
         start_time = datetime.utcnow()
         end_time = start_time + timedelta(hours=duration_time)
 
+        batch_size = params.get('batch_size', 0)
+        pacing = params.get('pacing', 'deadline')
+        self.faker_pool = FakerPool(
+            seed=params.get('seed'),
+            corpus_size=params.get('corpus_size', 0),
+        )
+        load_profile = self._load_profile(params)
+        intregation_logger.info(
+            f'Load profile: {type(load_profile).__name__} | '
+            f'Seed: {load_profile.seed}'
+        )
+        cycle_scheduler = Scheduler(rate=1 / repetition_time)
+        cycle = 0
+
         while datetime.utcnow() < end_time:
-            num_invoices = randint(*quantity_interval)
+            cycle_scheduler.wait()
+            if reload_params:
+                previous_params, params = params, reload_params()
+                if params is not previous_params:
+                    try:
+                        load_profile = self._load_profile(params)
+                    except StarkbankIntegrationError as sie:
+                        intregation_logger.error(
+                            f'Load profile not reloaded: {sie}'
+                        )
+                _, cycle_time, _ = self._parse_params(params)
+                batch_size = params.get('batch_size', 0)
+                pacing = params.get('pacing', 'deadline')
+                if cycle_time != repetition_time:
+                    repetition_time = cycle_time
+                    cycle_scheduler.set_rate(1 / repetition_time)
+
+            num_invoices = load_profile.quantity(cycle)
+            cycle += 1
             intregation_logger.info(f'Issuing {num_invoices} random invoices.')
-            self._issue_invoices(num_invoices, repetition_time)
-            time.sleep(repetition_time)
+            if batch_size:
+                self.issue_invoices_in_batches(num_invoices, batch_size)
+            else:
+                self._issue_invoices(num_invoices, repetition_time, pacing)
 
-    def _issue_invoices(self, num_invoices, repetition_time):
+    def _issue_invoices(
+        self, num_invoices, repetition_time, pacing='deadline'
+    ):
         """
         Issue the specified number of random invoices at regular intervals.
 
+        The invoices are paced by a Scheduler, so the time spent on each API
+        call is discounted from the wait before the next invoice.
+
         Args:
             num_invoices (int): Number of invoices to issue.
             repetition_time (int): Repetition time interval in minutes.
+            pacing (str): The Scheduler mode used to space the invoices.
         """
-        time_interval = repetition_time / num_invoices
+        if not num_invoices:
+            return
+
+        scheduler = Scheduler(rate=num_invoices / repetition_time, mode=pacing)
 
         for _ in range(num_invoices):
+            lag = scheduler.wait()
+            if lag > scheduler.interval:
+                intregation_logger.warning(
+                    f'Invoice issuing is {lag:.3f}s behind schedule.'
+                )
             try:
                 invoice = self._issue_single_invoice()
                 intregation_logger.info(
@@ -151,7 +371,128 @@ class StarkbankIntegration:
                 )
             except StarkbankIntegrationError as sie:
                 intregation_logger.error(f'Invoice issue Error:{sie}')
-            time.sleep(time_interval)
+
+    def issue_invoices_in_batches(
+        self,
+        num_invoices,
+        batch_size=INVOICE_BATCH_LIMIT,
+        max_retries=3,
+        retry_delay=INVOICE_RETRY_DELAY,
+    ):
+        """
+        Issue the specified number of random invoices sending them in chunks.
+
+        Each chunk holds up to `batch_size` invoices (capped by the API limit)
+        and is sent in a single request. A failed chunk is retried up to
+        `max_retries` times with a jittered exponential backoff; chunks that
+        already succeeded are never re-sent.
+
+        Args:
+            num_invoices (int): Number of invoices to issue.
+            batch_size (int): Number of invoices per request.
+            max_retries (int): Number of retries for a failed chunk.
+            retry_delay (float): The delay cap in seconds of the first retry.
+
+        Returns:
+            list[InvoiceBatchResult]: The result of each chunk, in order.
+        """
+        batch_size = max(1, min(batch_size, INVOICE_BATCH_LIMIT))
+        invoices = []
+        for _ in range(num_invoices):
+            try:
+                invoices.append(
+                    self._build_invoice(self._generate_random_invoice_data())
+                )
+            except StarkbankIntegrationError as sie:
+                intregation_logger.error(f'Invoice build Error:{sie}')
+
+        results = []
+        for index, start in enumerate(range(0, len(invoices), batch_size)):
+            chunk = invoices[start : start + batch_size]
+            result = self._issue_invoice_chunk(
+                index, chunk, max_retries, retry_delay
+            )
+            results.append(result)
+
+            if result.succeeded:
+                intregation_logger.info(
+                    f'Invoice chunk {index} issued. '
+                    f'Invoices: {len(result.invoices)} | '
+                    f'Attempts: {result.attempts}'
+                )
+            else:
+                intregation_logger.error(
+                    f'Invoice chunk {index} Error:{result.error}'
+                )
+
+        return results
+
+    def _issue_invoice_chunk(
+        self, index, invoices, max_retries, retry_delay=INVOICE_RETRY_DELAY
+    ):
+        """
+        Send a chunk of invoices in a single request, retrying on failure.
+
+        The invoices of the chunk are tagged with a unique chunk tag. A
+        request that timed out may still have created them, so before each
+        retry the invoices are looked up by this tag, and the chunk is only
+        sent again if none was found.
+
+        Args:
+            index (int): Position of the chunk in the batch.
+            invoices (list[Invoice]): The invoices to be created.
+            max_retries (int): Number of retries for a failed request.
+            retry_delay (float): The delay cap in seconds of the first retry.
+
+        Returns:
+            InvoiceBatchResult: The result of the chunk.
+        """
+        import starkbank
+
+        result = InvoiceBatchResult(index, len(invoices))
+        backoff = Backoff(base_delay=retry_delay, max_delay=30 * retry_delay)
+        chunk_tag = f'chunk-{uuid.uuid4().hex}'
+        for invoice in invoices:
+            invoice.tags = list(invoice.tags or []) + [chunk_tag]
+
+        while result.attempts <= max_retries:
+            if result.attempts:
+                time.sleep(backoff.delay(result.attempts))
+            result.attempts += 1
+            try:
+                if result.attempts > 1:
+                    # The failed request may have created the invoices
+                    created = self._find_invoices([chunk_tag])
+                    if created:
+                        result.invoices = created
+                        result.error = None
+                        break
+
+                result.invoices = starkbank.invoice.create(
+                    invoices, user=self.user
+                )
+                result.error = None
+                break
+            except Exception as e:
+                result.error = StarkbankIntegrationError(
+                    f'Error issuing invoice chunk {index}: {e}'
+                )
+
+        return result
+
+    def _find_invoices(self, tags):
+        """
+        Query the invoices created with some tags.
+
+        Args:
+            tags (list[str]): The tags of the invoices.
+
+        Returns:
+            list[Invoice]: The invoices found.
+        """
+        import starkbank
+
+        return list(starkbank.invoice.query(tags=tags, user=self.user))
 
     def _generate_random_invoice_data(
         self,
@@ -165,7 +506,8 @@ class StarkbankIntegration:
         Generate random data for an invoice.
         """
         try:
-            fake = Faker('pt_BR')
+            fake = self.faker_pool.get()
+            random = self.faker_pool.random()
             required_fields = ['amount', 'taxId', 'name']
             optional_fields = [
                 'due',
@@ -179,17 +521,26 @@ class StarkbankIntegration:
             ]
 
             data = {
-                field: self._generate_required_field(field, fake, amount_range)
+                field: self._generate_required_field(
+                    field, fake, random, amount_range
+                )
                 for field in required_fields
             }
 
-            additional_fields = sample(
-                optional_fields, k=randint(0, len(optional_fields))
+            additional_fields = random.sample(
+                optional_fields, k=random.randint(0, len(optional_fields))
             )
-            for field in additional_fields:
+            if 'discounts' in additional_fields:
+                # The discounts are due before the invoice due date
+                additional_fields.append('due')
+            for field in sorted(
+                set(additional_fields), key=optional_fields.index
+            ):
                 data[field] = self._generate_additional_field(
                     field,
                     fake,
+                    random,
+                    data.get('due'),
                     discounts_count_range,
                     descriptions_count_range,
                     tags_count_range,
@@ -203,12 +554,12 @@ class StarkbankIntegration:
                 f'Error generating random invoice data: {e}'
             )
 
-    def _generate_required_field(self, field, fake, amount_range):
+    def _generate_required_field(self, field, fake, random, amount_range):
         """
         Generate a random value for a specific field.
         """
         if field == 'amount':
-            return randint(*amount_range)
+            return random.randint(*amount_range)
         elif field == 'taxId':
             return fake.cpf()
         elif field == 'name':
@@ -220,6 +571,8 @@ class StarkbankIntegration:
         self,
         field,
         fake,
+        random,
+        due,
         discounts_count_range,
         descriptions_count_range,
         tags_count_range,
@@ -227,69 +580,77 @@ class StarkbankIntegration:
     ):
         """
         Generate a random value for an additional field.
+
+        The discounts are generated after the invoice `due` date, which
+        they must precede.
         """
         if field == 'due':
-            return datetime.utcnow() + timedelta(hours=randint(1, 24))
+            return datetime.utcnow() + timedelta(hours=random.randint(1, 24))
         elif field == 'fine':
-            return round(uniform(0.1, 4.0), 2)
+            return round(random.uniform(0.1, 4.0), 2)
         elif field == 'interest':
-            return round(uniform(0.1, 2.0), 2)
+            return round(random.uniform(0.1, 2.0), 2)
         elif field == 'expiration':
-            return round(timedelta(hours=randint(1, 72)).total_seconds())
+            return round(
+                timedelta(hours=random.randint(1, 72)).total_seconds()
+            )
         elif field == 'discounts':
-            return self._generate_discounts(fake, discounts_count_range)
+            return self._generate_discounts(random, discounts_count_range, due)
         elif field == 'descriptions':
-            return self._generate_descriptions(fake, descriptions_count_range)
+            return self._generate_descriptions(
+                fake, random, descriptions_count_range
+            )
         elif field == 'tags':
-            return [fake.word() for _ in range(randint(*tags_count_range))]
+            return fake.words(nb=random.randint(*tags_count_range))
         elif field == 'rules':
-            return self._generate_rules(fake, rules_count_range)
+            return self._generate_rules(fake, random, rules_count_range)
 
         return None
 
-    def _generate_discounts(self, fake, discounts_count_range):
+    def _generate_discounts(self, random, discounts_count_range, due):
         """
-        Generate random discounts data.
+        Generate random discounts data, due between now and the invoice due date.
         """
+        now = datetime.utcnow()
         discounts = []
-        for _ in range(randint(*discounts_count_range)):
+        for _ in range(random.randint(*discounts_count_range)):
             discount = {
-                'percentage': round(uniform(1.0, 20.0), 2),
-                'due': datetime.utcnow() + timedelta(hours=randint(1, 72)),
+                'percentage': round(random.uniform(1.0, 20.0), 2),
+                'due': now + (due - now) * random.uniform(0.1, 0.9),
             }
             discounts.append(discount)
         return discounts
 
-    def _generate_descriptions(self, fake, descriptions_count_range):
+    def _generate_descriptions(self, fake, random, descriptions_count_range):
         """
         Generate random descriptions data.
         """
         descriptions = []
-        for _ in range(randint(*descriptions_count_range)):
+        for _ in range(random.randint(*descriptions_count_range)):
             description = {
                 'key': fake.word(),
                 'value': fake.currency_code()
-                + str(round(uniform(1.0, 100.0), 2)),
+                + str(round(random.uniform(1.0, 100.0), 2)),
             }
             descriptions.append(description)
         return descriptions
 
-    def _generate_rules(self, fake, rules_count_range):
+    def _generate_rules(self, fake, random, rules_count_range):
         """
-        Generate random rules data.
+        Generate random rules data, with distinct keys accepted by the API.
         """
+        import starkbank
+
+        count = min(random.randint(*rules_count_range), len(INVOICE_RULE_KEYS))
         rules = []
-        for _ in range(randint(*rules_count_range)):
-            rule_key = fake.word()
-            rule_value = (
-                [fake.cpf() for _ in range(randint(1, 5))]
-                if rule_key == 'allowedTaxIds'
-                else fake.random_int(1, 10)
-            )
-            rule = sb_transfer.Rule(key=rule_key, value=rule_value)
+        for rule_key in random.sample(INVOICE_RULE_KEYS, k=count):
+            rule_value = [fake.cpf() for _ in range(random.randint(1, 5))]
+            rule = starkbank.invoice.Rule(key=rule_key, value=rule_value)
             rules.append(rule)
         return rules
 
+    @timed_with(metrics_registry)
+    @retried_with('invoices')
     def _issue_single_invoice(
         self,
         amount_range=(1000, 50000),
@@ -301,6 +662,8 @@ class StarkbankIntegration:
         """
         Issue a single random invoice.
         """
+        import starkbank
+
         try:
             invoice_data = self._generate_random_invoice_data(
                 amount_range,
@@ -310,15 +673,36 @@ class StarkbankIntegration:
                 rules_count_range,
             )
 
+            return starkbank.invoice.create(
+                [self._build_invoice(invoice_data)], user=self.user
+            )
+        except Exception as e:
+            raise StarkbankIntegrationError(
+                f'Error issuing a single random invoice: {e}'
+            )
+
+    def _build_invoice(self, invoice_data):
+        """
+        Build an Invoice object from the generated invoice data.
+
+        Args:
+            invoice_data (dict): Data generated for the invoice.
+
+        Returns:
+            Invoice: The invoice ready to be sent to the API.
+        """
+        import starkbank
+
+        try:
             optional_fields = [
-                'due'
-                'fine'
-                'interest'
-                'expiration'
-                'discounts'
-                'descriptions'
-                'tags'
-                'rules'
+                'due',
+                'fine',
+                'interest',
+                'expiration',
+                'discounts',
+                'descriptions',
+                'tags',
+                'rules',
             ]
             optional_data = {
                 key: invoice_data.get(key)
@@ -326,46 +710,263 @@ class StarkbankIntegration:
                 if invoice_data.get(key)
             }
 
-            return starkbank.invoice.create(
-                [
-                    Invoice(
-                        amount=invoice_data.get('amount'),
-                        tax_id=invoice_data.get('taxId'),
-                        name=invoice_data.get('name'),
-                        **optional_data,
-                    )
-                ]
+            return starkbank.Invoice(
+                amount=invoice_data.get('amount'),
+                tax_id=invoice_data.get('taxId'),
+                name=invoice_data.get('name'),
+                **optional_data,
             )
         except Exception as e:
+            raise StarkbankIntegrationError(f'Error building invoice: {e}')
+
+    def _build_transfer(self, amount_to_transfer, external_id=None):
+        """
+        Build a Transfer object of the specified amount to the Stark Bank account.
+
+        Args:
+            amount_to_transfer (int): The amount to transfer.
+            external_id (str): Optional, the unique ID preventing the API
+                from creating the transfer twice. It is also used as a tag,
+                so the transfer can be queried by it.
+
+        Returns:
+            Transfer: The transfer ready to be sent to the API.
+        """
+        import starkbank
+
+        return starkbank.Transfer(
+            external_id=external_id,
+            tags=[external_id] if external_id else None,
+            amount=amount_to_transfer,
+            bank_code='20018183',
+            branch_code='0001',
+            account_number='6341320293482496',
+            account_type='payment',
+            tax_id='20.018.183/0001-80',
+            name='Stark Bank S.A.',
+        )
+
+    def _log_transfer(self, transfer):
+        """
+        Log a transfer created by the API and record it in the transfer tracker.
+        """
+        intregation_logger.info(
+            f'Transfer initiated. Transfer ID: {transfer.id} | Amount: {transfer.amount} | Recipient: {transfer.name}'
+        )
+        self._track_transfer(transfer)
+
+    def _track_transfer(self, transfer):
+        """
+        Record the status of a transfer of a paid invoice, if tracking is enabled.
+
+        The invoice is found from the `invoice-<invoice id>` external ID of
+        the transfer. The other transfers are not tracked.
+        """
+        tracker = self.transfer_tracker
+        external_id = getattr(transfer, 'external_id', None) or ''
+        if tracker is None or not external_id.startswith('invoice-'):
+            return
+
+        tracker.record(
+            external_id[len('invoice-') :],
+            transfer.id,
+            getattr(transfer, 'status', None) or 'created',
+        )
+
+    def enable_transfer_tracking(
+        self, path=TRANSFER_TRACKER_PATH, interval=300, page_size=100
+    ):
+        """
+        Index the transfer of each paid invoice and keep its status up to date.
+
+        The statuses are updated from the transfer events, and the transfers
+        whose events were missed are reconciled every interval.
+
+        Args:
+            path (str): The path of the tracker database.
+            interval (float): How often in seconds the transfers are
+                reconciled, None to reconcile them only on demand.
+            page_size (int): The number of transfer IDs per reconciliation query.
+        """
+        self.disable_transfer_tracking()
+        self.transfer_tracker = TransferTracker(
+            self._page_transfers,
+            path=path,
+            interval=interval,
+            page_size=page_size,
+        )
+
+    def disable_transfer_tracking(self):
+        """
+        Stop the transfer reconciliation and close the tracker.
+        """
+        if self.transfer_tracker is not None:
+            self.transfer_tracker.close()
+            self.transfer_tracker = None
+
+    @retried_with('events')
+    def _page_transfers(self, **kwargs):
+        """
+        Return a page of transfers and the cursor of the next page.
+        """
+        import starkbank
+
+        return starkbank.transfer.page(user=self.user, **kwargs)
+
+    def transfer_status(self, invoice_id):
+        """
+        Return the transfer of a paid invoice.
+
+        Args:
+            invoice_id (str): The ID of the invoice.
+
+        Returns:
+            tuple[str, str]: The transfer ID and status, or None if the
+                invoice has no tracked transfer.
+
+        Raises:
+            StarkbankIntegrationError: If the transfer tracking is disabled.
+        """
+        if self.transfer_tracker is None:
             raise StarkbankIntegrationError(
-                f'Error issuing a single random invoice: {e}'
+                'Transfer tracking is disabled. Use enable_transfer_tracking.'
+            )
+        return self.transfer_tracker.lookup(str(invoice_id))
+
+    def enable_transfer_batching(self, max_items=100, max_wait=0.2):
+        """
+        Send the transfers of paid invoices in multi-transfer requests.
+
+        Args:
+            max_items (int): The maximum number of transfers per request.
+            max_wait (float): The maximum time in seconds a transfer waits.
+        """
+        import starkbank
+
+        self.disable_transfer_batching()
+        self.transfer_batcher = TransferBatcher(
+            partial(starkbank.transfer.create, user=self.user),
+            max_items=max_items,
+            max_wait=max_wait,
+        )
+
+    def disable_transfer_batching(self):
+        """
+        Send the pending batched transfers and create the next ones one by one.
+        """
+        if self.transfer_batcher is not None:
+            self.transfer_batcher.close()
+            self.transfer_batcher = None
+
+    def enable_transfer_outbox(
+        self,
+        path=TRANSFER_OUTBOX_PATH,
+        batch_size=100,
+        interval=1.0,
+        max_attempts=5,
+    ):
+        """
+        Record the transfers of paid invoices in a durable outbox before sending them.
+
+        Args:
+            path (str): The path of the outbox database.
+            batch_size (int): The maximum number of transfers per request.
+            interval (float): How often in seconds the outbox is drained.
+            max_attempts (int): How many times a transfer is sent before failing.
+        """
+        import starkbank
+
+        self.disable_transfer_outbox()
+        self.transfer_outbox = TransferOutbox(
+            self._build_transfer,
+            partial(starkbank.transfer.create, user=self.user),
+            find_transfers=self._find_transfers,
+            on_sent=self._log_transfer,
+            path=path,
+            batch_size=batch_size,
+            interval=interval,
+            max_attempts=max_attempts,
+        )
+
+    def disable_transfer_outbox(self):
+        """
+        Send the due transfers of the outbox and close it.
+
+        The transfers still pending are sent when the outbox is enabled again.
+        """
+        if self.transfer_outbox is not None:
+            self.transfer_outbox.close()
+            self.transfer_outbox = None
+
+    def _find_transfers(self, external_ids):
+        """
+        Query the transfers created with some external IDs.
+
+        Args:
+            external_ids (list[str]): The external IDs of the transfers.
+
+        Returns:
+            list[Transfer]: The transfers found.
+        """
+        import starkbank
+
+        external_ids = set(external_ids)
+        return [
+            transfer
+            for transfer in starkbank.transfer.query(
+                tags=list(external_ids), user=self.user
             )
+            if transfer.external_id in external_ids
+        ]
+
+    def _submit_transfer(self, amount_to_transfer, external_id=None):
+        """
+        Add a transfer to the next batch of the transfer batcher.
 
-    def _create_transfer(self, amount_to_transfer):
+        Args:
+            amount_to_transfer (int): The amount to transfer.
+            external_id (str): Optional, the unique ID of the transfer.
+
+        Returns:
+            Future: Resolved with the created transfer or its request error.
+        """
+        future = self.transfer_batcher.submit(
+            self._build_transfer(amount_to_transfer, external_id)
+        )
+        future.add_done_callback(self._log_batched_transfer)
+        return future
+
+    def _log_batched_transfer(self, future):
+        """
+        Log the result of a batched transfer.
+        """
+        error = future.exception()
+        if error is None:
+            self._log_transfer(future.result())
+        else:
+            intregation_logger.error(f'Transfer Error:{error}')
+
+    @timed_with(metrics_registry)
+    @retried_with('transfers')
+    def _create_transfer(self, amount_to_transfer, external_id=None):
         """
         Create a single transfer with the specified amount.
 
         Args:
             amount_to_transfer (int): The amount to transfer.
+            external_id (str): Optional, the unique ID of the transfer.
 
         Returns:
             bool: True if the transfer is successful, False otherwise.
         """
+        import starkbank
+        from starkbank.error import Error, InvalidSignatureError
+
         try:
-            transfer = Transfer(
-                amount=amount_to_transfer,
-                bank_code='20018183',
-                branch_code='0001',
-                account_number='6341320293482496',
-                account_type='payment',
-                tax_id='20.018.183/0001-80',
-                name='Stark Bank S.A.',
-            )
+            transfer = self._build_transfer(amount_to_transfer, external_id)
 
-            transfers = sb_transfer.create([transfer])
-            intregation_logger.info(
-                f'Transfer initiated. Transfer ID: {transfers[0].id} | Amount: {transfers[0].amount} | Recipient: {transfers[0].name}'
-            )
+            transfers = starkbank.transfer.create([transfer], user=self.user)
+            self._log_transfer(transfers[0])
             return True
 
         except InvalidSignatureError as sig_error:
@@ -388,6 +989,8 @@ class StarkbankIntegration:
         Args:
             event (starkbank.Event): The event related to the Invoice credit.
         """
+        from starkbank.error import Error
+
         try:
             invoice_log = event.log.invoice
 
@@ -395,8 +998,39 @@ class StarkbankIntegration:
                 intregation_logger.info(
                     f'Paid Invoice. Invoice ID: {invoice_log.id}'
                 )
+                invoice_key = f'invoice:{invoice_log.id}'
+                if not self._claim(invoice_key):
+                    intregation_logger.info(
+                        f'Invoice already transferred. Invoice ID: {invoice_log.id}'
+                    )
+                    return
+
                 amount_to_transfer = invoice_log.amount - invoice_log.fee
-                self._create_transfer(amount_to_transfer)
+                external_id = f'invoice-{invoice_log.id}'
+                try:
+                    if self.transfer_outbox is not None:
+                        self.transfer_outbox.add(
+                            external_id, amount_to_transfer
+                        )
+                        intregation_logger.info(
+                            f'Transfer queued. Invoice ID: {invoice_log.id}'
+                        )
+                    elif self.transfer_batcher is not None:
+                        future = self._submit_transfer(
+                            amount_to_transfer, external_id
+                        )
+                        future.add_done_callback(
+                            partial(self._settle, invoice_key)
+                        )
+                        # The event is settled with its batched transfer
+                        return future
+                    else:
+                        self._create_transfer(amount_to_transfer, external_id)
+                except Exception:
+                    self._release(invoice_key)
+                    raise
+
+                self._complete(invoice_key)
 
         except Error as sb_error:
             raise StarkbankIntegrationError(
@@ -409,20 +1043,30 @@ class StarkbankIntegration:
             )
 
     @logging_with(intregation_logger)
-    @benchmark_with(intregation_logger)
+    @timed_with(metrics_registry)
+    @retried_with('webhook')
     def listen_webhook_events(self):
         """
         Public method to listen to the webhook events.
 
+        The response is streamed, so a batch of events is parsed as it
+        arrives. It is closed by `process_webhook_events`.
+
         Returns:
             Response: The response containing the webhook events.
 
         Raises:
             StarkbankIntegrationError: If an error occurs during webhook listening.
         """
+        import requests
+
         try:
-            response = requests.get(self.webhook)
-            response.raise_for_status()
+            response = self.connection_pool.get(self.webhook, stream=True)
+            try:
+                response.raise_for_status()
+            except Exception:
+                response.close()
+                raise
 
             return response
 
@@ -436,45 +1080,592 @@ class StarkbankIntegration:
                 f'Error when try to listen webhook: {e}'
             )
 
+    def enable_signature_cache(
+        self, key_ttl=3600, cache_size=10000, processes=0
+    ):
+        """
+        Verify the events with a cached public key and memoized results.
+
+        Args:
+            key_ttl (float): How long in seconds the public key is cached.
+            cache_size (int): The maximum number of memoized events.
+            processes (int): The number of verification processes.
+        """
+        from starkbank_webhook_test.auth.signature_verifier import (
+            SignatureVerifier,
+        )
+
+        self.disable_signature_cache()
+        self.signature_verifier = SignatureVerifier(
+            user=self.user,
+            key_ttl=key_ttl,
+            cache_size=cache_size,
+            processes=processes,
+        )
+
+    def disable_signature_cache(self):
+        """
+        Stop the signature verifier and verify the next events with the SDK.
+        """
+        if self.signature_verifier is not None:
+            self.signature_verifier.close()
+            self.signature_verifier = None
+
+    def parse_event(self, content, signature):
+        """
+        Verify the signature of an event and parse it.
+
+        Args:
+            content (str): The event content, not parsed.
+            signature (str): The signature from the Digital-Signature header.
+
+        Returns:
+            starkbank.Event: The parsed event.
+        """
+        import starkbank
+
+        if self.signature_verifier is not None:
+            return self.signature_verifier.parse(content, signature)
+
+        return starkbank.event.parse(
+            content=content, signature=signature, user=self.user
+        )
+
+    def _log_event(self, event):
+        """
+        Log an event that needs no processing.
+
+        Args:
+            event (starkbank.Event): The event received from the webhook.
+        """
+        intregation_logger.info(
+            f'Event received. Subscription: {event.subscription} | '
+            f'Type: {event.log.type} | Event ID: {event.id}'
+        )
+
+    def _process_transfer_event(self, event):
+        """
+        Record the status of a transfer.
+
+        The status is the one of the transfer in the log, not the log type,
+        which names the change that created the log.
+
+        Args:
+            event (starkbank.Event): The event of the transfer log.
+        """
+        transfer = event.log.transfer
+        metrics_registry.increment(
+            'transfer_events_total', status=transfer.status
+        )
+        if self.transfer_tracker is not None:
+            if not self.transfer_tracker.update(transfer.id, transfer.status):
+                # Transfers created before the tracking was enabled
+                self._track_transfer(transfer)
+
+        if event.log.type == 'failed':
+            intregation_logger.warning(
+                f'Transfer failed. Transfer ID: {transfer.id} | '
+                f'Errors: {event.log.errors}'
+            )
+        elif event.log.type == 'success':
+            intregation_logger.info(
+                f'Transfer succeeded. Transfer ID: {transfer.id}'
+            )
+        else:
+            self._log_event(event)
+
+    def enable_event_workers(self, workers=None, default_workers=1):
+        """
+        Run the event handlers on a worker pool per subscription.
+
+        A slow handler of a subscription, such as the transfer statuses,
+        then never delays the events of the others, such as the invoice
+        credits.
+
+        Args:
+            workers (dict): The number of workers of each subscription pool.
+            default_workers (int): The workers of the other subscription pools.
+        """
+        self.event_dispatcher.start(
+            workers=workers, default_workers=default_workers
+        )
+
+    def disable_event_workers(self):
+        """
+        Wait for the queued events and run the next handlers in the calling thread.
+        """
+        self.event_dispatcher.close()
+
+    def dispatch_event(self, event):
+        """
+        Hand a parsed and verified event to the handler of its subscription.
+
+        The handler is chosen by the subscription and log type of the event.
+        It runs in the calling thread, raising its errors, unless the event
+        workers are enabled.
+
+        Args:
+            event (starkbank.Event): The event received from the webhook.
+
+        Returns:
+            Future: The result of the handler.
+        """
+        handler = self.event_dispatcher.resolve(event)
+        if handler is None:
+            intregation_logger.debug(
+                f'No handler for the event. Subscription: '
+                f'{event.subscription} | Event ID: {event.id}'
+            )
+            metrics_registry.increment(
+                'webhook_events_total',
+                subscription=event.subscription,
+                outcome='unhandled',
+            )
+            return completed()
+
+        event_key = f'event:{event.id}'
+        if not self._claim(event_key):
+            intregation_logger.info(
+                f'Event already processed. Event ID: {event.id}'
+            )
+            return completed()
+
+        try:
+            return self.event_dispatcher.submit(
+                handler,
+                event,
+                on_error=partial(self._event_failed, event_key),
+                on_success=partial(self._event_done, event_key),
+            )
+        except RuntimeError:
+            # The worker pools were closed while submitting the event
+            self._release(event_key)
+            raise
+
+    def _event_done(self, key, event, result):
+        """
+        Mark the key of an event as processed once its handler succeeded.
+
+        A handler returning a Future deferred its work, such as a batched
+        transfer, so the key is settled when the Future is done.
+        """
+        if isinstance(result, Future):
+            result.add_done_callback(partial(self._settle, key))
+        else:
+            self._complete(key)
+
+    def _event_failed(self, key, event, error):
+        """
+        Release the key of an event whose handler failed.
+        """
+        # Let a redelivery of the event be processed again
+        self._release(key)
+        metrics_registry.increment(
+            'webhook_events_total',
+            subscription=event.subscription,
+            outcome='failed',
+        )
+        if self.event_dispatcher.concurrent:
+            # Nobody waits for the handlers on the event workers
+            intregation_logger.error(
+                f'Event handler error. Event ID: {event.id} | Error: {error}'
+            )
+
+    def enable_resilience(
+        self,
+        max_attempts=4,
+        base_delay=0.5,
+        max_delay=30,
+        failure_threshold=0.5,
+        window=20,
+        minimum_calls=10,
+        reset_timeout=30,
+    ):
+        """
+        Retry the failed calls with a jittered backoff behind circuit breakers.
+
+        The invoices, transfers and events share the circuit breaker of the
+        Stark Bank API, while the webhook polling has its own. Invoices are
+        retried on throttled and transient errors, and the idempotent event,
+        transfer query and webhook requests also on ambiguous ones, such as
+        timeouts. Transfers are only retried on throttled errors, as any
+        other failure may hide a transfer already created.
+
+        The policies own the retries, so the retries of the connection pool
+        are disabled until `disable_resilience`, instead of multiplying the
+        attempts of each call.
+
+        Args:
+            max_attempts (int): The maximum number of attempts of a call.
+            base_delay (float): The delay cap of the first retry in seconds.
+            max_delay (float): The maximum delay between attempts in seconds.
+            failure_threshold (float): The failure rate opening a circuit.
+            window (int): The number of recent calls of a circuit.
+            minimum_calls (int): The calls needed before a circuit may open.
+            reset_timeout (float): How long in seconds a circuit stays open.
+        """
+        backoff = Backoff(base_delay=base_delay, max_delay=max_delay)
+        breakers = {
+            name: CircuitBreaker(
+                failure_threshold=failure_threshold,
+                window=window,
+                minimum_calls=minimum_calls,
+                reset_timeout=reset_timeout,
+                name=name,
+            )
+            for name in ('starkbank', 'webhook')
+        }
+        idempotent = (THROTTLED, TRANSIENT, AMBIGUOUS)
+        self.retry_policies = {
+            'invoices': RetryPolicy(
+                max_attempts, backoff, breakers['starkbank']
+            ),
+            'transfers': RetryPolicy(
+                max_attempts,
+                backoff,
+                breakers['starkbank'],
+                retry_on=(THROTTLED,),
+            ),
+            'events': RetryPolicy(
+                max_attempts, backoff, breakers['starkbank'], idempotent
+            ),
+            'webhook': RetryPolicy(
+                max_attempts, backoff, breakers['webhook'], idempotent
+            ),
+        }
+        if self._pool_retries is None:
+            self._pool_retries = self.connection_pool.retries
+            self.connection_pool.set_retries(0)
+
+    def disable_resilience(self):
+        """
+        Call the API once per request, without retries or circuit breakers.
+
+        The retries of the connection pool are restored.
+        """
+        self.retry_policies = {}
+        if self._pool_retries is not None:
+            self.connection_pool.set_retries(self._pool_retries)
+            self._pool_retries = None
+
+    @retried_with('events')
+    def _page_events(self, **kwargs):
+        """
+        Return a page of events and the cursor of the next page.
+        """
+        import starkbank
+
+        return starkbank.event.page(user=self.user, **kwargs)
+
+    @retried_with('events')
+    def _mark_event_delivered(self, event_id):
+        """
+        Mark an event as delivered, so it is not walked again.
+        """
+        import starkbank
+
+        return starkbank.event.update(
+            event_id, is_delivered=True, user=self.user
+        )
+
+    @logging_with(intregation_logger)
+    @timed_with(metrics_registry)
+    def catch_up_events(
+        self,
+        path=EVENT_CATCH_UP_PATH,
+        limit=EVENT_PAGE_LIMIT,
+        workers=8,
+        lookback_days=1,
+    ):
+        """
+        Process the events missed while the service was not listening.
+
+        The events are walked with `event.page` from the saved cursor, the
+        undelivered ones are dispatched as webhook events and marked as
+        delivered in bulk. Refer to the EventCatchUp documentation.
+
+        Args:
+            path (str): The path of the catch-up state file.
+            limit (int): The number of events per page.
+            workers (int): The number of parallel delivery updates.
+            lookback_days (int): How far back the first walk goes, in days.
+
+        Returns:
+            dict: The number of events dispatched, skipped and failed.
+
+        Raises:
+            StarkbankIntegrationError: If the events could not be walked.
+        """
+        from starkbank.error import Error
+
+        try:
+            catch_up = EventCatchUp(
+                self._page_events,
+                self._mark_event_delivered,
+                self.dispatch_event,
+                path=path,
+                limit=limit,
+                workers=workers,
+                lookback_days=lookback_days,
+            )
+            return catch_up.run()
+
+        except Error as sb_error:
+            raise StarkbankIntegrationError(
+                f'StarkBank error catching up on events: {sb_error}'
+            )
+
+        except Exception as e:
+            raise StarkbankIntegrationError(
+                f'Error catching up on events: {e}'
+            )
+
+    def enable_event_deduplication(
+        self, path=DEDUP_STORE_PATH, claim_timeout=600
+    ):
+        """
+        Skip the events and paid invoices already processed.
+
+        Args:
+            path (str): The path of the deduplication database.
+            claim_timeout (float): How long in seconds a claimed key is held
+                before a redelivery may claim it again.
+        """
+        self.disable_event_deduplication()
+        self.dedup_store = DedupStore(path=path, claim_timeout=claim_timeout)
+
+    def disable_event_deduplication(self):
+        """
+        Close the deduplication database and process every event received.
+        """
+        if self.dedup_store is not None:
+            self.dedup_store.close()
+            self.dedup_store = None
+
+    def _claim(self, key):
+        """
+        Claim a key in the deduplication store, if enabled.
+
+        Returns:
+            bool: False if the key was already processed.
+        """
+        if self.dedup_store is None:
+            return True
+        return self.dedup_store.claim(key)
+
+    def _release(self, key):
+        """
+        Release a key in the deduplication store, if enabled.
+        """
+        if self.dedup_store is not None:
+            self.dedup_store.release(key)
+
+    def _complete(self, key):
+        """
+        Mark a key as processed in the deduplication store, if enabled.
+        """
+        if self.dedup_store is not None:
+            self.dedup_store.complete(key)
+
+    def _settle(self, key, future):
+        """
+        Mark a key as processed when its Future succeeds, or release it.
+        """
+        if future.exception() is None:
+            self._complete(key)
+        else:
+            self._release(key)
+
+    def _parse_events(self, items):
+        """
+        Verify and parse a window of batched events.
+
+        The events are verified in parallel on the processes of the signature
+        verifier, when enabled, and one at a time by the SDK otherwise.
+
+        Args:
+            items (list[tuple[str, str]]): The content and signature of each event.
+
+        Returns:
+            list: The parsed event or the error of each item, in order.
+        """
+        if self.signature_verifier is not None:
+            return self.signature_verifier.parse_batch(items)
+
+        results = []
+        for content, signature in items:
+            try:
+                results.append(self.parse_event(content, signature))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _response_chunks(self, events_response):
+        """
+        Return the body of a webhook response as an iterable of byte chunks.
+        """
+        return events_response.iter_content(chunk_size=EVENT_BATCH_CHUNK_SIZE)
+
+    def _process_event_batch(self, events_response):
+        """
+        Process a batch of signed events, as a JSON array or NDJSON.
+
+        The batch is stream-parsed in windows of EVENT_BATCH_WINDOW events.
+        The events of a window are verified together, then dispatched in
+        the order they were received. An invalid or failed event does not
+        stop the batch: the others are still dispatched.
+
+        Args:
+            events_response (Response): The response containing the batch.
+
+        Returns:
+            int: The number of events dispatched.
+
+        Raises:
+            StarkbankIntegrationError: If any event of the batch failed.
+        """
+        dispatched = rejected = failed = 0
+        chunks = self._response_chunks(events_response)
+        try:
+            for window in iter_windows(chunks, EVENT_BATCH_WINDOW):
+                futures = []
+                for event in self._parse_events(window):
+                    if isinstance(event, Exception):
+                        rejected += 1
+                        intregation_logger.error(
+                            f'Batched webhook event rejected: {event}'
+                        )
+                        continue
+
+                    try:
+                        futures.append(self.dispatch_event(event))
+                    except Exception as e:
+                        failed += 1
+                        intregation_logger.error(
+                            f'Batched webhook event error. '
+                            f'Event ID: {event.id} | Error: {e}'
+                        )
+
+                # The handler errors on the event workers are logged once done
+                for future in futures:
+                    if future.exception() is None:
+                        dispatched += 1
+                    else:
+                        failed += 1
+        except BatchFormatError as bfe:
+            # The events before the malformed item were already dispatched
+            raise WebhookEventError(
+                f'Invalid webhook batch after {dispatched + rejected + failed} '
+                f'events: {bfe}'
+            )
+
+        for outcome, count in (
+            ('dispatched', dispatched),
+            ('rejected', rejected),
+            ('failed', failed),
+        ):
+            if count:
+                metrics_registry.increment(
+                    'webhook_batch_events_total', count, outcome=outcome
+                )
+
+        intregation_logger.info(
+            f'Webhook batch processed. Dispatched: {dispatched} | '
+            f'Rejected: {rejected} | Failed: {failed}'
+        )
+        if rejected or failed:
+            raise WebhookEventError(
+                f'Webhook batch errors. Rejected: {rejected} | '
+                f'Failed: {failed}'
+            )
+        return dispatched
+
     @logging_with(intregation_logger)
-    @benchmark_with(intregation_logger)
+    @timed_with(metrics_registry)
     def process_webhook_events(self, events_response):
         """
         Process the webhook events received in the response.
 
+        A response with a `Digital-Signature` header holds a single event.
+        A response without it holds a batch of signed events, as a JSON array
+        or NDJSON of objects with the event `content` and its `signature`.
+        The response is closed once processed.
+
         Args:
             events_response (Response): The response containing the events.
 
+        Returns:
+            int: The number of events dispatched.
+
         Raises:
+            WebhookEventError: If an event is invalid or its handler failed.
             StarkbankIntegrationError: If an error occurs during event processing.
         """
         try:
-            response_data = events_response.data.decode('utf-8')
-            signature = events_response.headers['Digital-Signature']
-            event = starkbank.event.parse(
-                content=response_data, signature=signature
-            )
+            return self._process_events(events_response)
+        finally:
+            events_response.close()
+
+    def _process_events(self, events_response):
+        """
+        Process the single event or the batch of events of a response.
+        """
+        from starkbank.error import Error, InvalidSignatureError
+
+        try:
+            if 'Digital-Signature' in events_response.headers:
+                response_data = events_response.content.decode('utf-8')
+                signature = events_response.headers['Digital-Signature']
+                event = self.parse_event(response_data, signature)
 
-            if event.subscription == 'invoice':
-                self._process_invoice_credit(event)
+                self.dispatch_event(event)
+                return 1
 
         except InvalidSignatureError as sig_error:
-            raise StarkbankIntegrationError(
-                f'Invalid signature error: {sig_error}'
-            )
+            raise WebhookEventError(f'Invalid signature error: {sig_error}')
 
         except Error as sb_error:
-            raise StarkbankIntegrationError(
+            raise WebhookEventError(
                 f'StarkBank error processing webhook events: {sb_error}'
             )
 
         except Exception as e:
-            raise StarkbankIntegrationError(
-                f'Error processing webhook events {e}'
-            )
+            raise WebhookEventError(f'Error processing webhook events {e}')
+
+        return self._process_event_batch(events_response)
+
+
+class InvoiceBatchResult:
+    """
+    The result of sending a chunk of invoices in a single request.
+
+    Attributes:
+        - index (int): Position of the chunk in the batch.
+        - size (int): Number of invoices in the chunk.
+        - invoices (list[Invoice]): The invoices created by the API.
+        - attempts (int): Number of requests sent for the chunk.
+        - error (StarkbankIntegrationError): The last error, if any.
+    """
+
+    def __init__(self, index: int, size: int):
+        self.index = index
+        self.size = size
+        self.invoices = []
+        self.attempts = 0
+        self.error = None
+
+    @property
+    def succeeded(self):
+        return self.error is None and self.attempts > 0
 
 
 class StarkbankIntegrationError(Exception):
     """Custom exception for StarkbankIntegration errors."""
 
     pass
+
+
+class WebhookEventError(StarkbankIntegrationError):
+    """Custom exception for the webhook events that could not be processed."""
+
+    pass
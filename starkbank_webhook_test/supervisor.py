@@ -0,0 +1,243 @@
+import logging
+import signal
+import time
+from multiprocessing import Process
+
+from starkbank_webhook_test.settings import ServiceSettings
+
+supervisor_logger = logging.getLogger('service_supervisor')
+supervisor_logger.setLevel(logging.DEBUG)
+
+
+def _run_worker(target):
+    """
+    Run a service in a worker process, exiting cleanly on SIGTERM.
+
+    The worker inherits the signal handlers of the supervisor, so they are
+    replaced to let the `finally` blocks of the service flush its logs.
+    """
+
+    def exit_on_signal(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, exit_on_signal)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    target()
+
+
+class ServiceWorker:
+    """
+    A supervised process running one instance of a service.
+
+    Attributes:
+        - service (str): The name of the service.
+        - index (int): The position of the worker within its service.
+        - target (callable): The function running the service.
+        - process (Process): The current process of the worker.
+        - restarts (int): How many times the worker was restarted since it
+          last ran for the stability window.
+        - started_at (float): When the current process was started.
+        - next_start (float): When the worker may be started again.
+        - finished (bool): True once the worker exited and will not restart.
+    """
+
+    def __init__(self, service: str, index: int, target):
+        self.service = service
+        self.index = index
+        self.target = target
+        self.process = None
+        self.restarts = 0
+        self.started_at = 0.0
+        self.next_start = 0.0
+        self.finished = False
+
+    @property
+    def name(self):
+        return f'{self.service}-{self.index}'
+
+    def start(self):
+        self.process = Process(
+            target=_run_worker, args=(self.target,), name=self.name
+        )
+        self.process.start()
+        self.started_at = time.monotonic()
+
+
+class ServiceSupervisor:
+    """
+    A class for running several processes of each service.
+
+    Each worker runs in its own process, so the CPU-bound work of one service
+    does not slow the others down. Workers that exit with an error are
+    restarted with an exponential backoff, while workers that finish cleanly
+    are not. A worker that ran for the stability window before crashing is
+    restarted after the initial delay again. SIGTERM and SIGINT stop every
+    worker before the supervisor exits.
+
+    Attributes:
+        - restart_delay (float): The initial delay in seconds before a restart.
+        - max_restart_delay (float): The maximum delay in seconds before a restart.
+        - stable_after (float): How long in seconds a worker must run before
+          its restarts are forgotten.
+        - shutdown_timeout (float): How long to wait for a worker to stop.
+        - workers (list[ServiceWorker]): The supervised workers.
+    """
+
+    def __init__(
+        self,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+        stable_after: float = 300.0,
+        shutdown_timeout: float = 10.0,
+        poll_interval: float = 0.5,
+    ):
+        """
+        Initialize the ServiceSupervisor without any service.
+
+        Args:
+            - restart_delay (float): The initial delay in seconds before a restart.
+            - max_restart_delay (float): The maximum delay in seconds before a restart.
+            - stable_after (float): How long in seconds a worker must run
+              before its restarts are forgotten.
+            - shutdown_timeout (float): How long to wait for a worker to stop.
+            - poll_interval (float): How often in seconds the workers are checked.
+        """
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.shutdown_timeout = shutdown_timeout
+        self.poll_interval = poll_interval
+        self.workers = []
+        self._stopping = False
+
+    @staticmethod
+    def load_workers(settings_file_path: str):
+        """
+        Read the number of workers of a service from its settings file.
+
+        Args:
+            - settings_file_path (str): Path to the configuration file.
+
+        Returns:
+            int: The value of the 'workers' setting, 1 when it is missing.
+
+        Raises:
+            - SettingsError: If the settings file is invalid.
+        """
+        return ServiceSettings.from_file(settings_file_path).workers
+
+    def add_service(self, service: str, target, workers: int = 1):
+        """
+        Add the workers of a service.
+
+        Args:
+            - service (str): The name of the service.
+            - target (callable): The function running the service, it must be
+              importable by the worker processes.
+            - workers (int): The number of processes of the service.
+        """
+        for index in range(workers):
+            self.workers.append(ServiceWorker(service, index, target))
+
+    def start(self):
+        """
+        Start every worker.
+        """
+        self._stopping = False
+        for worker in self.workers:
+            worker.start()
+            supervisor_logger.info(
+                f'Worker started. Worker: {worker.name} | PID: {worker.process.pid}'
+            )
+
+    def check(self):
+        """
+        Restart the crashed workers and flag the finished ones.
+
+        Returns:
+            bool: True while any worker is still running or pending a restart.
+        """
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.finished or worker.process is None:
+                continue
+
+            if worker.process.is_alive():
+                continue
+
+            exitcode = worker.process.exitcode
+            if exitcode == 0 or self._stopping:
+                worker.finished = True
+                supervisor_logger.info(
+                    f'Worker finished. Worker: {worker.name}'
+                )
+                continue
+
+            if not worker.next_start:
+                if now - worker.started_at >= self.stable_after:
+                    # The worker was healthy, so its crash starts a new backoff
+                    worker.restarts = 0
+                delay = min(
+                    self.restart_delay * 2**worker.restarts,
+                    self.max_restart_delay,
+                )
+                worker.next_start = now + delay
+                supervisor_logger.error(
+                    f'Worker crashed. Worker: {worker.name} | '
+                    f'Exit code: {exitcode} | Restart in: {delay:.1f}s'
+                )
+
+            if now >= worker.next_start:
+                worker.restarts += 1
+                worker.next_start = 0.0
+                worker.start()
+                supervisor_logger.info(
+                    f'Worker restarted. Worker: {worker.name} | PID: {worker.process.pid}'
+                )
+
+        return not all(worker.finished for worker in self.workers)
+
+    def stop(self):
+        """
+        Terminate every worker and wait for them to exit.
+        """
+        self._stopping = True
+        running = [
+            worker
+            for worker in self.workers
+            if worker.process is not None and worker.process.is_alive()
+        ]
+        for worker in running:
+            worker.process.terminate()
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        for worker in running:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                supervisor_logger.warning(
+                    f'Worker did not stop, killing it. Worker: {worker.name}'
+                )
+                worker.process.kill()
+                worker.process.join()
+            worker.finished = True
+
+    def _handle_signal(self, signum, frame):
+        supervisor_logger.info(f'Signal received, stopping. Signal: {signum}')
+        self._stopping = True
+
+    def run(self):
+        """
+        Run the workers until they all finish or a stop signal is received.
+        """
+        previous_handlers = {
+            signum: signal.signal(signum, self._handle_signal)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            self.start()
+            while not self._stopping and self.check():
+                time.sleep(self.poll_interval)
+        finally:
+            self.stop()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
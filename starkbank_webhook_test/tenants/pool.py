@@ -0,0 +1,520 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Mapping
+
+from starkbank_webhook_test.constants import ROOT_DIR
+from starkbank_webhook_test.generators.load_profile import build_profile
+from starkbank_webhook_test.metrics.registry import metrics_registry
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.scheduling.scheduler import Scheduler
+from starkbank_webhook_test.settings import (
+    EngineSettings,
+    SettingsError,
+    freeze,
+    settings_store,
+    validate_params,
+)
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+
+pool_logger = logging.getLogger('integration_pool')
+pool_logger.setLevel(logging.DEBUG)
+
+
+def _empty():
+    return freeze({})
+
+
+@dataclass(frozen=True)
+class TenantConfig:
+    """
+    The settings of one Stark Bank project served by an IntegrationPool.
+
+    Attributes:
+        - name (str): The unique name of the tenant.
+        - engine (EngineSettings): The credentials and webhook URL.
+        - private_key_path (str): Path to the private key file.
+        - params (Mapping): The invoice and webhook parameters.
+        - rate_limit (float): The maximum number of tasks started per second.
+        - burst (int): The number of tasks that may start at once.
+        - max_in_flight (int): The maximum number of tasks running at once.
+    """
+
+    name: str
+    engine: EngineSettings
+    private_key_path: str
+    params: Mapping = field(default_factory=_empty)
+    rate_limit: float = 5.0
+    burst: int = 1
+    max_in_flight: int = 1
+
+    @classmethod
+    def from_json(cls, tenant):
+        """
+        Validate a tenant object of the tenants settings file.
+
+        Relative private key paths are resolved from the repository root.
+
+        Raises:
+            - SettingsError: If a value is missing or invalid.
+        """
+        if not isinstance(tenant, dict):
+            raise SettingsError('Invalid tenant. Use an object.')
+
+        name = tenant.get('name')
+        if not isinstance(name, str) or not name:
+            raise SettingsError("Invalid tenant 'name'. Use a string.")
+
+        private_key_path = tenant.get('private_key_path')
+        if not isinstance(private_key_path, str) or not private_key_path:
+            raise SettingsError(
+                f"Invalid 'private_key_path' of tenant {name}. Use a path."
+            )
+
+        try:
+            engine = EngineSettings.from_json(tenant.get('engine', {}))
+            params = freeze(tenant.get('params', {}))
+            validate_params(params)
+        except SettingsError as e:
+            raise SettingsError(f'{e} Tenant: {name}')
+
+        config = cls(
+            name=name,
+            engine=engine,
+            private_key_path=os.path.join(ROOT_DIR, private_key_path),
+            params=params,
+            rate_limit=tenant.get('rate_limit', 5.0),
+            burst=tenant.get('burst', 1),
+            max_in_flight=tenant.get('max_in_flight', 1),
+        )
+        if config.rate_limit <= 0:
+            raise SettingsError(
+                f"Invalid 'rate_limit' of tenant {name}. Use a positive number."
+            )
+        webhook_interval = config.webhook_interval
+        if (
+            isinstance(webhook_interval, bool)
+            or not isinstance(webhook_interval, (int, float))
+            or webhook_interval < 0
+        ):
+            raise SettingsError(
+                f"Invalid 'webhook_interval' of tenant {name}. "
+                'Use a non-negative number.'
+            )
+        for attribute in ('burst', 'max_in_flight'):
+            value = getattr(config, attribute)
+            if not isinstance(value, int) or value < 1:
+                raise SettingsError(
+                    f"Invalid '{attribute}' of tenant {name}. "
+                    'Use a positive integer.'
+                )
+        return config
+
+    @property
+    def invoice_interval(self):
+        return self.params.get('repetition_time', 180)
+
+    @property
+    def webhook_interval(self):
+        return self.params.get('webhook_interval', self.invoice_interval)
+
+
+class _Tenant:
+    """
+    The runtime state of a tenant within the pool.
+    """
+
+    def __init__(self, config: TenantConfig, integration, seed=None):
+        self.config = config
+        self.integration = integration
+        try:
+            self.load_profile = build_profile(
+                config.params.get('load_profile'),
+                quantity_interval=config.params.get(
+                    'quantity_interval', (8, 12)
+                ),
+                seed=config.params.get('seed', seed),
+            )
+        except (ValueError, OSError) as e:
+            raise SettingsError(
+                f'Invalid load profile of tenant {config.name}: {e}'
+            )
+        self.cycle = 0
+        self.limiter = Scheduler(
+            rate=config.rate_limit, mode='token_bucket', burst=config.burst
+        )
+        self.tasks = deque()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+
+def _handle_webhook_events(integration):
+    """
+    Fetch the webhook events of a tenant and process them.
+    """
+    return integration.process_webhook_events(
+        integration.listen_webhook_events()
+    )
+
+
+def _issue_invoices(integration, num_invoices, batch_size):
+    """
+    Issue a chunk of random invoices for a tenant.
+    """
+    return integration.issue_invoices_in_batches(num_invoices, batch_size)
+
+
+class IntegrationPool:
+    """
+    A pool serving the integrations of many Stark Bank projects from one process.
+
+    Every tenant has its own StarkbankIntegration, while the HTTP connections
+    and the worker threads are shared. The tasks of each tenant wait in their
+    own queue, and a dispatcher thread starts them in round-robin order, one
+    task per tenant per round, so a tenant with a large backlog cannot delay
+    the others. Each tenant is limited by a token bucket of `rate_limit`
+    tasks per second and by `max_in_flight` concurrent tasks.
+
+    Attributes:
+        - workers (int): The number of worker threads shared by the tenants.
+        - connection_pool (ConnectionPool): The pool shared by the tenants.
+    """
+
+    def __init__(
+        self,
+        tenants: list,
+        workers: int = 8,
+        connection_pool: ConnectionPool = None,
+        seed: int = None,
+    ):
+        """
+        Initialize the IntegrationPool and the integration of each tenant.
+
+        Args:
+            - tenants (list[TenantConfig]): The tenants served by the pool.
+            - workers (int): The number of worker threads.
+            - connection_pool (ConnectionPool): The pool for the outbound calls.
+            - seed (int): Seed of the load profiles without their own seed.
+
+        Raises:
+            - SettingsError: If the load profile of a tenant is invalid.
+        """
+        if workers < 1:
+            raise ValueError('Invalid workers. Use a positive integer.')
+
+        names = [tenant.name for tenant in tenants]
+        if len(set(names)) != len(names):
+            raise ValueError('Invalid tenants. Use unique names.')
+
+        self.workers = workers
+        self.connection_pool = connection_pool or ConnectionPool(
+            pool_size=workers
+        )
+        self._tenants = {}
+        for config in tenants:
+            integration = StarkbankIntegration(
+                environment=config.engine.environment,
+                id=config.engine.id,
+                private_key=settings_store.private_key(
+                    config.private_key_path
+                ),
+                auth_type=config.engine.auth_type,
+                webhook_url=config.engine.webhook_url,
+                connection_pool=self.connection_pool,
+            )
+            self._tenants[config.name] = _Tenant(config, integration, seed)
+
+        self._order = deque(self._tenants.values())
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._executor = None
+        self._dispatcher = None
+        self._stopping = threading.Event()
+
+    @classmethod
+    def from_file(cls, settings_file_path: str):
+        """
+        Create an IntegrationPool from a tenants settings file.
+
+        Args:
+            - settings_file_path (str): Path to the tenants settings file.
+
+        Raises:
+            - SettingsError: If the file has invalid settings.
+        """
+        with open(settings_file_path, 'r') as settings_file:
+            settings = json.load(settings_file)
+
+        tenants = settings.get('tenants')
+        if not isinstance(tenants, list) or not tenants:
+            raise SettingsError(
+                f"Invalid 'tenants' in {settings_file_path}. "
+                'Use a list of objects.'
+            )
+
+        return cls(
+            [TenantConfig.from_json(tenant) for tenant in tenants],
+            workers=settings.get('workers', 8),
+            connection_pool=ConnectionPool(
+                **settings.get('connection_pool', {})
+            ),
+            seed=settings.get('seed'),
+        )
+
+    @property
+    def tenants(self):
+        return list(self._tenants)
+
+    @property
+    def running(self):
+        return self._dispatcher is not None
+
+    def integration(self, tenant: str):
+        """
+        Return the StarkbankIntegration of a tenant.
+        """
+        return self._tenant(tenant).integration
+
+    def _tenant(self, name):
+        try:
+            return self._tenants[name]
+        except KeyError:
+            raise ValueError(f'Unknown tenant: {name}.')
+
+    def connect(self):
+        """
+        Authenticate every tenant.
+
+        Raises:
+            - StarkbankIntegrationError: If a tenant fails to authenticate.
+        """
+        for tenant in self._tenants.values():
+            tenant.integration.connect()
+
+    def start(self):
+        """
+        Start the worker threads and the dispatcher.
+        """
+        if self.running:
+            return
+
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='integration_pool'
+        )
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop, name='integration_pool', daemon=True
+        )
+        self._dispatcher.start()
+
+    def stop(self):
+        """
+        Cancel the queued tasks and wait for the running ones.
+        """
+        if not self.running:
+            return
+
+        self._stopping.set()
+        with self._condition:
+            for tenant in self._tenants.values():
+                while tenant.tasks:
+                    tenant.tasks.popleft()[0].cancel()
+            self._condition.notify_all()
+
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        self._dispatcher = None
+        self._executor = None
+
+    def submit(self, tenant: str, operation, *args):
+        """
+        Queue a task for a tenant.
+
+        Args:
+            - tenant (str): The name of the tenant.
+            - operation (callable): Called with the integration of the tenant
+              and the remaining arguments.
+
+        Returns:
+            Future: Resolved with the result or the error of the operation.
+        """
+        state = self._tenant(tenant)
+        future = Future()
+        with self._condition:
+            state.tasks.append((future, operation, args))
+            self._condition.notify_all()
+        return future
+
+    def stats(self):
+        """
+        Return the queued, running, completed and failed tasks of each tenant.
+        """
+        with self._condition:
+            return {
+                name: {
+                    'queued': len(tenant.tasks),
+                    'in_flight': tenant.in_flight,
+                    'completed': tenant.completed,
+                    'failed': tenant.failed,
+                }
+                for name, tenant in self._tenants.items()
+            }
+
+    def _dispatch_loop(self):
+        with self._condition:
+            while not self._stopping.is_set():
+                self._condition.wait(self._dispatch())
+
+    def _dispatch(self):
+        """
+        Start the ready tasks, one per tenant per round.
+
+        Returns:
+            float: How long until a rate-limited task is ready, or None.
+        """
+        delay = None
+        dispatched = True
+        while dispatched and self._in_flight < self.workers:
+            dispatched = False
+            for _ in range(len(self._order)):
+                if self._in_flight >= self.workers:
+                    break
+
+                tenant = self._order[0]
+                self._order.rotate(-1)
+                if (
+                    not tenant.tasks
+                    or tenant.in_flight >= tenant.config.max_in_flight
+                ):
+                    continue
+
+                if not tenant.limiter.try_tick():
+                    ready = tenant.limiter.delay()
+                    delay = ready if delay is None else min(delay, ready)
+                    continue
+
+                tenant.in_flight += 1
+                self._in_flight += 1
+                self._executor.submit(
+                    self._run_task, tenant, tenant.tasks.popleft()
+                )
+                dispatched = True
+        return delay
+
+    def _run_task(self, tenant, task):
+        """
+        Run a task and release its slot before resolving its future.
+        """
+        future, operation, args = task
+        outcome, result, error = 'cancelled', None, None
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = operation(tenant.integration, *args)
+                    outcome = 'success'
+                except Exception as e:
+                    outcome, error = 'error', e
+                    pool_logger.error(
+                        f'Task error. Tenant: {tenant.config.name}. Error: {e}'
+                    )
+        finally:
+            metrics_registry.increment(
+                'tenant_tasks_total',
+                tenant=tenant.config.name,
+                outcome=outcome,
+            )
+            with self._condition:
+                tenant.in_flight -= 1
+                self._in_flight -= 1
+                if outcome == 'success':
+                    tenant.completed += 1
+                elif outcome == 'error':
+                    tenant.failed += 1
+                self._condition.notify_all()
+
+        if outcome == 'success':
+            future.set_result(result)
+        elif outcome == 'error':
+            future.set_exception(error)
+
+    def _schedule(self, tenant, kind):
+        """
+        Queue the tasks of a cycle of a tenant.
+
+        The invoices of a cycle are split in chunks of `batch_size` invoices,
+        one task per chunk, or one task per invoice without a batch_size.
+        """
+        if kind == 'webhook':
+            self.submit(tenant.config.name, _handle_webhook_events)
+            return
+
+        num_invoices = tenant.load_profile.quantity(tenant.cycle)
+        tenant.cycle += 1
+        batch_size = tenant.config.params.get('batch_size', 0) or 1
+        pool_logger.info(
+            f'Issuing {num_invoices} random invoices. '
+            f'Tenant: {tenant.config.name}'
+        )
+        for start in range(0, num_invoices, batch_size):
+            self.submit(
+                tenant.config.name,
+                _issue_invoices,
+                min(batch_size, num_invoices - start),
+                batch_size,
+            )
+
+    def run(self, duration: float):
+        """
+        Issue invoices and handle the webhook events of every tenant.
+
+        Each tenant issues the number of invoices given by its load profile,
+        or drawn from its quantity_interval, every repetition_time seconds,
+        and handles its webhook events every webhook_interval seconds, or
+        never when it is 0.
+
+        Args:
+            - duration (float): How long to run, in seconds.
+        """
+        self.connect()
+        self.start()
+        try:
+            now = time.monotonic()
+            end_time = now + duration
+            timers = []
+            for index, tenant in enumerate(self._tenants.values()):
+                timers.append((now, index, 'invoices', tenant))
+                if tenant.config.webhook_interval:
+                    timers.append((now, index, 'webhook', tenant))
+            heapq.heapify(timers)
+
+            while timers and timers[0][0] < end_time:
+                due, index, kind, tenant = timers[0]
+                if self._stopping.wait(max(0.0, due - time.monotonic())):
+                    break
+
+                if kind == 'webhook':
+                    interval = tenant.config.webhook_interval
+                else:
+                    interval = tenant.config.invoice_interval
+                heapq.heapreplace(
+                    timers, (due + interval, index, kind, tenant)
+                )
+                self._schedule(tenant, kind)
+
+            self._stopping.wait(max(0.0, end_time - time.monotonic()))
+        finally:
+            self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stop()
@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+batcher_logger = logging.getLogger('transfer_batcher')
+batcher_logger.setLevel(logging.DEBUG)
+
+
+class TransferBatcher:
+    """
+    A class for grouping transfers into multi-transfer requests.
+
+    Submitted transfers are collected by a background thread and flushed as a
+    single request when the batch reaches `max_items` transfers or when the
+    oldest transfer has waited `max_wait` seconds, whichever comes first.
+
+    Each submission returns a Future resolved with the created transfer or
+    with the error of its request. When the API rejects a batch with input
+    errors, its transfers are re-sent one by one, so a single invalid transfer
+    does not fail the whole batch.
+
+    Attributes:
+        - create_transfers (callable): Sends a list of transfers in one request.
+        - max_items (int): The maximum number of transfers per request.
+        - max_wait (float): The maximum time in seconds a transfer waits.
+    """
+
+    def __init__(
+        self, create_transfers, max_items: int = 100, max_wait: float = 0.2
+    ):
+        """
+        Initialize the TransferBatcher and start its flushing thread.
+
+        Args:
+            - create_transfers (callable): Sends a list of transfers in one request.
+            - max_items (int): The maximum number of transfers per request.
+            - max_wait (float): The maximum time in seconds a transfer waits.
+        """
+        if max_items < 1:
+            raise ValueError('Invalid max_items. Use a positive integer.')
+
+        if max_wait < 0:
+            raise ValueError('Invalid max_wait. Use a non-negative number.')
+
+        self.create_transfers = create_transfers
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self._pending = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name='transfer_batcher', daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def pending(self):
+        """
+        Return the number of transfers waiting to be sent.
+        """
+        with self._condition:
+            return len(self._pending)
+
+    def submit(self, transfer):
+        """
+        Add a transfer to the next batch.
+
+        Args:
+            - transfer (starkbank.Transfer): The transfer to be created.
+
+        Returns:
+            Future: Resolved with the created transfer or its request error.
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('TransferBatcher is closed.')
+            self._pending.append((transfer, future, time.monotonic()))
+            self._condition.notify()
+        return future
+
+    def close(self):
+        """
+        Send the pending transfers and stop the flushing thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _next_batch(self):
+        """
+        Wait until a batch is due and remove it from the pending transfers.
+
+        Returns:
+            list: The batch items, or None when closed with nothing pending.
+        """
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+
+            if not self._pending:
+                return None
+
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_items and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = self._pending[: self.max_items]
+            del self._pending[: self.max_items]
+            return batch
+
+    def _run(self):
+        """
+        Flush the batches until the batcher is closed.
+        """
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._send(batch)
+
+    def _send(self, batch):
+        """
+        Send a batch in a single request and resolve the futures of its items.
+        """
+        from starkbank.error import InputErrors
+
+        try:
+            created = self.create_transfers(
+                [transfer for transfer, _, _ in batch]
+            )
+            for (_, future, _), transfer in zip(batch, created):
+                future.set_result(transfer)
+            batcher_logger.debug(f'Transfer batch sent. Size: {len(batch)}')
+
+        except InputErrors as input_errors:
+            if len(batch) == 1:
+                batch[0][1].set_exception(input_errors)
+                return
+
+            batcher_logger.warning(
+                f'Transfer batch rejected, sending one by one: {input_errors}'
+            )
+            for item in batch:
+                self._send([item])
+
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
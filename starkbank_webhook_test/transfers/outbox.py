@@ -0,0 +1,459 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from starkbank_webhook_test.metrics.registry import metrics_registry
+
+outbox_logger = logging.getLogger('transfer_outbox')
+outbox_logger.setLevel(logging.DEBUG)
+
+STATUSES = ('pending', 'sending', 'sent', 'failed')
+
+# The error code of a transfer whose external ID was already used. The
+# external IDs of the outbox are well formed, so it means a duplicate.
+DUPLICATE_ERROR_CODE = 'invalidExternalId'
+
+
+class TransferOutbox:
+    """
+    A durable queue of the transfers to be created.
+
+    Each transfer is committed to a SQLite table in WAL mode before it is
+    sent, so a crash between receiving a paid invoice and creating its
+    transfer does not lose the payout. A background thread drains the
+    pending transfers in multi-transfer requests of up to `batch_size`.
+
+    Every transfer has a unique external ID, which is also sent to the API,
+    so adding the same transfer twice is a no-op and a transfer re-sent after
+    a crash is rejected by Stark Bank instead of paid twice. The transfers
+    left 'sending' by a crash are reconciled when the outbox is opened: the
+    ones found by `find_transfers` are marked as sent and the others are
+    sent again.
+
+    A failed request is retried with an exponential backoff, up to
+    `max_attempts` times. The request may have been processed before it
+    failed, so the transfers are looked up with `find_transfers` before they
+    are sent again, and a transfer rejected because its external ID was
+    already used is marked as sent. A transfer rejected by the API with
+    other input errors is marked as failed and kept in the table for
+    inspection.
+
+    Attributes:
+        - path (str): The SQLite database path, ':memory:' for a volatile outbox.
+        - batch_size (int): The maximum number of transfers per request.
+        - interval (float): How often in seconds the outbox is drained.
+        - max_attempts (int): How many times a transfer is sent before failing.
+    """
+
+    def __init__(
+        self,
+        build_transfer,
+        create_transfers,
+        find_transfers=None,
+        on_sent=None,
+        path: str = ':memory:',
+        batch_size: int = 100,
+        interval: float = 1.0,
+        max_attempts: int = 5,
+    ):
+        """
+        Initialize the TransferOutbox, reconcile it and start its sender thread.
+
+        Args:
+            - build_transfer (callable): Builds a starkbank.Transfer from an
+              amount and an external ID.
+            - create_transfers (callable): Sends a list of transfers in one request.
+            - find_transfers (callable): Returns the created transfers among a
+              list of external IDs, used to reconcile after a crash.
+            - on_sent (callable): Called with each created transfer.
+            - path (str): The SQLite database path, ':memory:' for a volatile outbox.
+            - batch_size (int): The maximum number of transfers per request.
+            - interval (float): How often in seconds the outbox is drained.
+            - max_attempts (int): How many times a transfer is sent before failing.
+        """
+        if batch_size < 1:
+            raise ValueError('Invalid batch_size. Use a positive integer.')
+
+        if interval <= 0:
+            raise ValueError('Invalid interval. Use a positive number.')
+
+        if max_attempts < 1:
+            raise ValueError('Invalid max_attempts. Use a positive integer.')
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.build_transfer = build_transfer
+        self.create_transfers = create_transfers
+        self.find_transfers = find_transfers
+        self.on_sent = on_sent
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._closed = False
+        self._added = False
+        self._reconciled = False
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS transfers ('
+            'external_id TEXT PRIMARY KEY, '
+            'amount INTEGER NOT NULL, '
+            'status TEXT NOT NULL, '
+            'attempts INTEGER NOT NULL DEFAULT 0, '
+            'next_attempt_at REAL NOT NULL, '
+            'transfer_id TEXT, '
+            'error TEXT, '
+            'created_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS transfers_status '
+            'ON transfers (status, next_attempt_at)'
+        )
+
+        self._try_reconcile()
+        self._thread = threading.Thread(
+            target=self._run, name='transfer_outbox', daemon=True
+        )
+        self._thread.start()
+
+    def add(self, external_id: str, amount: int):
+        """
+        Record a transfer to be sent.
+
+        Args:
+            - external_id (str): The unique ID of the transfer.
+            - amount (int): The amount to transfer.
+
+        Returns:
+            bool: True if the transfer was added, False if it already was.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                'INSERT OR IGNORE INTO transfers '
+                '(external_id, amount, status, next_attempt_at, created_at) '
+                "VALUES (?, ?, 'pending', ?, ?)",
+                (external_id, amount, now, now),
+            )
+        with self._wake:
+            self._added = True
+            self._wake.notify()
+        return cursor.rowcount == 1
+
+    @property
+    def depth(self):
+        """
+        Return the number of transfers not sent yet.
+        """
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM transfers '
+                "WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0]
+
+    def stats(self):
+        """
+        Return the number of transfers of each status.
+        """
+        with self._lock:
+            counts = dict(
+                self._connection.execute(
+                    'SELECT status, COUNT(*) FROM transfers GROUP BY status'
+                ).fetchall()
+            )
+        return {status: counts.get(status, 0) for status in STATUSES}
+
+    def status(self, external_id: str):
+        """
+        Return the status and the transfer ID of a transfer, or None.
+        """
+        with self._lock:
+            return self._connection.execute(
+                'SELECT status, transfer_id FROM transfers '
+                'WHERE external_id = ?',
+                (external_id,),
+            ).fetchone()
+
+    def reconcile(self):
+        """
+        Resolve the transfers left 'sending' by a crash.
+
+        The transfers found by `find_transfers` are marked as sent and the
+        others are sent again.
+        """
+        with self._lock:
+            external_ids = [
+                row[0]
+                for row in self._connection.execute(
+                    "SELECT external_id FROM transfers WHERE status = 'sending'"
+                )
+            ]
+        if not external_ids:
+            return
+
+        found = {}
+        if self.find_transfers is not None:
+            for index in range(0, len(external_ids), self.batch_size):
+                chunk = external_ids[index : index + self.batch_size]
+                for transfer in self.find_transfers(chunk):
+                    found[transfer.external_id] = transfer.id
+
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            for external_id in external_ids:
+                if external_id in found:
+                    self._connection.execute(
+                        "UPDATE transfers SET status = 'sent', transfer_id = ? "
+                        'WHERE external_id = ?',
+                        (found[external_id], external_id),
+                    )
+                else:
+                    self._connection.execute(
+                        "UPDATE transfers SET status = 'pending', error = NULL "
+                        'WHERE external_id = ?',
+                        (external_id,),
+                    )
+            self._connection.execute('COMMIT')
+
+        outbox_logger.info(
+            f'Transfer outbox reconciled. Sent: {len(found)} | '
+            f'Pending: {len(external_ids) - len(found)}'
+        )
+
+    def _try_reconcile(self):
+        """
+        Reconcile the outbox, retrying on the next drain if the API fails.
+        """
+        try:
+            self.reconcile()
+            self._reconciled = True
+        except Exception as e:
+            outbox_logger.error(f'Transfer outbox reconciliation error: {e}')
+
+    def _claim_batch(self):
+        """
+        Mark the next due pending transfers as 'sending' and return them.
+        """
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            rows = self._connection.execute(
+                'SELECT external_id, amount, attempts, error IS NOT NULL '
+                'FROM transfers '
+                "WHERE status = 'pending' AND next_attempt_at <= ? "
+                'ORDER BY created_at LIMIT ?',
+                (time.time(), self.batch_size),
+            ).fetchall()
+            self._connection.executemany(
+                "UPDATE transfers SET status = 'sending', "
+                'attempts = attempts + 1 WHERE external_id = ?',
+                [(row[0],) for row in rows],
+            )
+            self._connection.execute('COMMIT')
+        return rows
+
+    def _mark_sent(self, rows, transfers):
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE transfers SET status = 'sent', transfer_id = ?, "
+                'error = NULL WHERE external_id = ?',
+                [
+                    (transfer.id, row[0])
+                    for row, transfer in zip(rows, transfers)
+                ],
+            )
+        metrics_registry.increment(
+            'transfer_outbox_total', len(rows), outcome='sent'
+        )
+        if self.on_sent is not None:
+            for transfer in transfers:
+                self.on_sent(transfer)
+
+    def _mark_duplicate(self, row, error):
+        """
+        Mark a row rejected for its already used external ID as sent.
+        """
+        with self._lock:
+            self._connection.execute(
+                "UPDATE transfers SET status = 'sent', error = NULL "
+                'WHERE external_id = ?',
+                (row[0],),
+            )
+        metrics_registry.increment(
+            'transfer_outbox_total', outcome='duplicate'
+        )
+        outbox_logger.warning(
+            f'Transfer already created. External ID: {row[0]} | '
+            f'Error: {error}'
+        )
+
+    def _mark_failed(self, rows, error, retry):
+        """
+        Schedule the rows for a retry, or fail them after the last attempt.
+        """
+        now = time.time()
+        updates = []
+        for external_id, _, attempts, _ in rows:
+            attempts += 1
+            if retry and attempts < self.max_attempts:
+                status = 'pending'
+                next_attempt_at = now + self.interval * 2 ** (attempts - 1)
+            else:
+                status = 'failed'
+                next_attempt_at = now
+            updates.append((status, next_attempt_at, str(error), external_id))
+            metrics_registry.increment(
+                'transfer_outbox_total',
+                outcome='retried' if status == 'pending' else 'failed',
+            )
+
+        with self._lock:
+            self._connection.executemany(
+                'UPDATE transfers SET status = ?, next_attempt_at = ?, '
+                'error = ? WHERE external_id = ?',
+                updates,
+            )
+        outbox_logger.error(
+            f'Transfer outbox error. Transfers: {len(rows)} | Error: {error}'
+        )
+
+    def _send(self, rows):
+        """
+        Send the rows in a single request and record the outcome.
+        """
+        from starkbank.error import InputErrors
+
+        rows = self._skip_created(rows)
+        if not rows:
+            return
+
+        try:
+            transfers = self.create_transfers(
+                [
+                    self.build_transfer(amount, external_id)
+                    for external_id, amount, _, _ in rows
+                ]
+            )
+        except InputErrors as input_errors:
+            if len(rows) == 1:
+                if _is_duplicate(input_errors):
+                    self._mark_duplicate(rows[0], input_errors)
+                else:
+                    self._mark_failed(rows, input_errors, retry=False)
+                return
+
+            outbox_logger.warning(
+                f'Transfer batch rejected, sending one by one: {input_errors}'
+            )
+            for row in rows:
+                self._send([row])
+            return
+        except Exception as e:
+            self._mark_failed(rows, e, retry=True)
+            return
+
+        self._mark_sent(rows, transfers)
+
+    def _skip_created(self, rows):
+        """
+        Mark the retried rows already created by a failed request as sent.
+
+        A request failing without a response may have been processed, so the
+        rows whose last request failed are looked up with `find_transfers`.
+
+        Returns:
+            list: The rows still to be sent.
+        """
+        retried = [row[0] for row in rows if row[3]]
+        if not retried or self.find_transfers is None:
+            return rows
+
+        try:
+            found = {
+                transfer.external_id: transfer
+                for transfer in self.find_transfers(retried)
+            }
+        except Exception as e:
+            self._mark_failed([row for row in rows if row[3]], e, retry=True)
+            return [row for row in rows if not row[3]]
+
+        created = [row for row in rows if row[0] in found]
+        if created:
+            self._mark_sent(created, [found[row[0]] for row in created])
+        return [row for row in rows if row[0] not in found]
+
+    def drain(self):
+        """
+        Send every pending transfer already due.
+
+        Returns:
+            int: The number of transfers sent or failed.
+        """
+        processed = 0
+        while True:
+            rows = self._claim_batch()
+            if not rows:
+                break
+            self._send(rows)
+            processed += len(rows)
+
+        if processed:
+            outbox_logger.debug(
+                f'Transfer outbox drained. Processed: {processed} | '
+                f'Depth: {self.depth}'
+            )
+        return processed
+
+    def _run(self):
+        """
+        Drain the outbox every interval, or when a transfer is added.
+        """
+        while True:
+            with self._wake:
+                if not self._closed and not self._added:
+                    self._wake.wait(self.interval)
+                self._added = False
+                closed = self._closed
+
+            if not self._reconciled:
+                self._try_reconcile()
+
+            try:
+                self.drain()
+            except Exception as e:
+                outbox_logger.error(f'Transfer outbox drain error: {e}')
+
+            if closed:
+                return
+
+    def close(self):
+        """
+        Send the pending transfers, stop the sender thread and close the database.
+
+        The transfers not sent, such as the ones waiting for a retry, stay in
+        the database and are sent when the outbox is opened again.
+        """
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+        self._thread.join()
+        with self._lock:
+            self._connection.close()
+
+
+def _is_duplicate(input_errors):
+    """
+    Return whether the API rejected a transfer for its used external ID.
+    """
+    return any(
+        error.code == DUPLICATE_ERROR_CODE for error in input_errors.errors
+    )
@@ -0,0 +1,311 @@
+import logging
+import sqlite3
+import threading
+import time
+
+from starkbank_webhook_test.metrics.registry import metrics_registry
+
+tracker_logger = logging.getLogger('transfer_tracker')
+tracker_logger.setLevel(logging.DEBUG)
+
+# Maximum number of transfer IDs of a single transfer.page request
+TRANSFER_PAGE_LIMIT = 100
+
+# The statuses a transfer goes through, the final ones last
+STATUS_RANKS = {
+    'created': 0,
+    'processing': 1,
+    'success': 2,
+    'failed': 2,
+    'canceled': 2,
+}
+FINAL_STATUSES = ('success', 'failed', 'canceled')
+
+
+class TransferTracker:
+    """
+    An index of the transfer of each paid invoice and its status.
+
+    The index maps each invoice ID to its transfer ID and status, and each
+    transfer ID back to its invoice, in memory, so `lookup` answers "was this
+    invoice paid out?" without a query. Every change is also written to a
+    SQLite table in WAL mode, from which the index is loaded when the tracker
+    is opened.
+
+    The statuses are updated from the transfer webhook events. A status never
+    moves back, so an event delivered late, such as a 'processing' event
+    after the 'success' one, is ignored. The transfers whose events were
+    missed are caught by `reconcile`, which queries the transfers not final
+    yet in pages of up to 100 IDs and updates them in bulk. When an interval
+    is given, a background thread reconciles them periodically.
+
+    Attributes:
+        - path (str): The SQLite database path, ':memory:' for a volatile index.
+        - interval (float): How often in seconds the transfers are reconciled,
+          None to reconcile them only on demand.
+        - page_size (int): The number of transfer IDs per reconciliation query.
+    """
+
+    def __init__(
+        self,
+        page_transfers=None,
+        path: str = ':memory:',
+        interval: float = None,
+        page_size: int = TRANSFER_PAGE_LIMIT,
+    ):
+        """
+        Initialize the TransferTracker and load its index.
+
+        Args:
+            - page_transfers (callable): Returns a page of transfers and the
+              next cursor from some transfer IDs, as `starkbank.transfer.page`.
+            - path (str): The SQLite database path, ':memory:' for a volatile index.
+            - interval (float): How often in seconds the transfers are
+              reconciled, None to reconcile them only on demand.
+            - page_size (int): The number of transfer IDs per reconciliation query.
+        """
+        if not 1 <= page_size <= TRANSFER_PAGE_LIMIT:
+            raise ValueError(
+                'Invalid page_size. Use an integer from 1 to '
+                f'{TRANSFER_PAGE_LIMIT}.'
+            )
+
+        if interval is not None and interval <= 0:
+            raise ValueError('Invalid interval. Use a positive number.')
+
+        if interval is not None and page_transfers is None:
+            raise ValueError('Invalid page_transfers. Use a callable.')
+
+        self.page_transfers = page_transfers
+        self.path = path
+        self.interval = interval
+        self.page_size = page_size
+        self._invoices = {}
+        self._transfers = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._closed = False
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS transfers ('
+            'invoice_id TEXT PRIMARY KEY, '
+            'transfer_id TEXT NOT NULL UNIQUE, '
+            'status TEXT NOT NULL, '
+            'updated_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self._load()
+
+        self._thread = None
+        if interval is not None:
+            self._thread = threading.Thread(
+                target=self._run, name='transfer_tracker', daemon=True
+            )
+            self._thread.start()
+
+    def _load(self):
+        """
+        Load the index from the database.
+        """
+        rows = self._connection.execute(
+            'SELECT invoice_id, transfer_id, status FROM transfers'
+        )
+        for invoice_id, transfer_id, status in rows:
+            self._invoices[invoice_id] = (transfer_id, status)
+            self._transfers[transfer_id] = invoice_id
+        tracker_logger.debug(
+            f'Transfer index loaded. Transfers: {len(self._invoices)}'
+        )
+
+    def record(self, invoice_id: str, transfer_id: str, status='created'):
+        """
+        Record the transfer of an invoice.
+
+        Args:
+            - invoice_id (str): The ID of the paid invoice.
+            - transfer_id (str): The ID of its transfer.
+            - status (str): The status of the transfer.
+
+        Returns:
+            bool: False if the status moved back and was ignored.
+        """
+        with self._lock:
+            current = self._invoices.get(invoice_id)
+            if current is not None and current[0] == transfer_id:
+                if not _advances(current[1], status):
+                    return False
+            elif current is not None:
+                self._transfers.pop(current[0], None)
+
+            self._connection.execute(
+                'INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?)',
+                (invoice_id, transfer_id, status, time.time()),
+            )
+            self._invoices[invoice_id] = (transfer_id, status)
+            self._transfers[transfer_id] = invoice_id
+            return True
+
+    def update(self, transfer_id: str, status: str):
+        """
+        Update the status of a recorded transfer.
+
+        Args:
+            - transfer_id (str): The ID of the transfer.
+            - status (str): The new status of the transfer.
+
+        Returns:
+            bool: False if the transfer is unknown or its status moved back.
+        """
+        return self.update_many([(transfer_id, status)]) == 1
+
+    def update_many(self, statuses):
+        """
+        Update the statuses of the recorded transfers in a single transaction.
+
+        Args:
+            - statuses (Iterable[tuple[str, str]]): The ID and new status of
+              each transfer.
+
+        Returns:
+            int: The number of transfers updated.
+        """
+        now = time.time()
+        with self._lock:
+            rows = []
+            for transfer_id, status in statuses:
+                invoice_id = self._transfers.get(transfer_id)
+                if invoice_id is None:
+                    continue
+                if not _advances(self._invoices[invoice_id][1], status):
+                    continue
+                self._invoices[invoice_id] = (transfer_id, status)
+                rows.append((status, now, invoice_id))
+
+            if rows:
+                self._connection.executemany(
+                    'UPDATE transfers SET status = ?, updated_at = ? '
+                    'WHERE invoice_id = ?',
+                    rows,
+                )
+            return len(rows)
+
+    def lookup(self, invoice_id: str):
+        """
+        Return the transfer of an invoice.
+
+        Args:
+            - invoice_id (str): The ID of the paid invoice.
+
+        Returns:
+            tuple[str, str]: The transfer ID and status, or None if the
+                invoice has no recorded transfer.
+        """
+        return self._invoices.get(invoice_id)
+
+    def invoice(self, transfer_id: str):
+        """
+        Return the ID of the invoice paid out by a transfer, or None.
+        """
+        return self._transfers.get(transfer_id)
+
+    def paid_out(self, invoice_id: str):
+        """
+        Return whether the transfer of an invoice succeeded.
+        """
+        transfer = self._invoices.get(invoice_id)
+        return transfer is not None and transfer[1] == 'success'
+
+    def pending(self):
+        """
+        Return the IDs of the transfers whose status is not final yet.
+        """
+        with self._lock:
+            return [
+                transfer_id
+                for transfer_id, status in self._invoices.values()
+                if status not in FINAL_STATUSES
+            ]
+
+    def stats(self):
+        """
+        Return the number of transfers of each status.
+        """
+        counts = {}
+        with self._lock:
+            for _, status in self._invoices.values():
+                counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def __len__(self):
+        return len(self._invoices)
+
+    def reconcile(self):
+        """
+        Query the transfers not final yet and update their statuses.
+
+        Returns:
+            int: The number of transfers updated.
+        """
+        pending = self.pending()
+        updated = 0
+        for start in range(0, len(pending), self.page_size):
+            ids = pending[start : start + self.page_size]
+            cursor = None
+            while True:
+                transfers, cursor = self.page_transfers(
+                    ids=ids, cursor=cursor, limit=self.page_size
+                )
+                updated += self.update_many(
+                    (transfer.id, transfer.status) for transfer in transfers
+                )
+                if cursor is None:
+                    break
+
+        if updated:
+            metrics_registry.increment('transfer_reconciled_total', updated)
+        tracker_logger.info(
+            f'Transfers reconciled. Pending: {len(pending)} | '
+            f'Updated: {updated}'
+        )
+        return updated
+
+    def _run(self):
+        """
+        Reconcile the transfers every interval until closed.
+        """
+        while True:
+            with self._wake:
+                if not self._closed:
+                    self._wake.wait(self.interval)
+                if self._closed:
+                    return
+
+            try:
+                self.reconcile()
+            except Exception as e:
+                tracker_logger.error(f'Transfer reconciliation error: {e}')
+
+    def close(self):
+        """
+        Stop the reconciliation thread and close the database.
+        """
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            self._connection.close()
+
+
+def _advances(current: str, status: str):
+    """
+    Return whether a status may replace the current one.
+
+    >>> _advances('created', 'success'), _advances('success', 'processing')
+    (True, False)
+    """
+    return STATUS_RANKS.get(status, 0) >= STATUS_RANKS.get(current, 0)
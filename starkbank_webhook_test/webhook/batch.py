@@ -0,0 +1,160 @@
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_whitespace = ' \t\r\n'
+
+
+class BatchFormatError(ValueError):
+    """Custom exception for malformed webhook event batches."""
+
+    pass
+
+
+def _signed_event(value):
+    """
+    Validate a batch item and return its content and signature.
+    """
+    if not isinstance(value, dict):
+        raise BatchFormatError('Invalid batch item. Use a JSON object.')
+
+    content = value.get('content')
+    signature = value.get('signature')
+    if not isinstance(content, str) or not isinstance(signature, str):
+        raise BatchFormatError(
+            'Invalid batch item. Use string content and signature.'
+        )
+    return content, signature
+
+
+def _skip(buffer, position, characters=_whitespace):
+    while position < len(buffer) and buffer[position] in characters:
+        position += 1
+    return position
+
+
+def iter_signed_events(chunks):
+    """
+    Stream-parse a batch of signed events.
+
+    The batch is either a JSON array or NDJSON, told apart by its first
+    character. Each item is an object holding the event `content`, as the
+    exact string that was signed, and its `signature`. The items are yielded
+    as soon as they are complete, so the whole batch is never held in memory.
+
+    >>> list(iter_signed_events([b'{"content": "{}", "signature": "s"}\\n']))
+    [('{}', 's')]
+
+    Args:
+        - chunks (Iterable[bytes]): The body of the response, in chunks.
+
+    Yields:
+        tuple[str, str]: The content and signature of each event, in order.
+
+    Raises:
+        - BatchFormatError: If the batch is malformed.
+    """
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    position = 0
+    array = None
+    expect_item = True
+    items = 0
+    closed = False
+    chunks = iter(chunks)
+    final = False
+
+    while not final:
+        chunk = next(chunks, None)
+        if chunk is None:
+            final = True
+            buffer += utf8.decode(b'', final=True)
+        elif isinstance(chunk, str):
+            buffer += chunk
+        else:
+            buffer += utf8.decode(chunk)
+
+        while True:
+            position = _skip(buffer, position)
+            if position == len(buffer):
+                break
+
+            if closed:
+                raise BatchFormatError('Unexpected data after the batch.')
+
+            if array is None:
+                array = buffer[position] == '['
+                if array:
+                    position += 1
+                    continue
+
+            if array and buffer[position] == ']':
+                if expect_item and items:
+                    raise BatchFormatError('Trailing comma in the batch.')
+                closed = True
+                position += 1
+                continue
+
+            if array and not expect_item:
+                if buffer[position] != ',':
+                    raise BatchFormatError('Missing comma in the batch.')
+                expect_item = True
+                position += 1
+                continue
+
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if final:
+                    raise BatchFormatError(f'Invalid batch item: {e}')
+                # The item is not complete yet
+                break
+
+            position = end
+            expect_item = False
+            items += 1
+            yield _signed_event(value)
+
+        # Drop the parsed part of the buffer
+        buffer = buffer[position:]
+        position = 0
+
+    if array and not closed:
+        raise BatchFormatError('Unterminated batch array.')
+
+
+def iter_windows(chunks, size: int):
+    """
+    Stream-parse a batch of signed events in lists of up to `size` events.
+
+    When the batch is malformed, the events read before the malformed item
+    are yielded before the error is raised, so they can still be processed.
+
+    >>> body = b'{"content": "{}", "signature": "s"}\\n' * 3
+    >>> [len(window) for window in iter_windows([body], 2)]
+    [2, 1]
+
+    Args:
+        - chunks (Iterable[bytes]): The body of the response, in chunks.
+        - size (int): The maximum number of events per window.
+
+    Yields:
+        list[tuple[str, str]]: The content and signature of the events.
+
+    Raises:
+        - BatchFormatError: If the batch is malformed.
+    """
+    window = []
+    try:
+        for item in iter_signed_events(chunks):
+            window.append(item)
+            if len(window) == size:
+                yield window
+                window = []
+    except BatchFormatError as bfe:
+        if window:
+            yield window
+        raise bfe
+
+    if window:
+        yield window
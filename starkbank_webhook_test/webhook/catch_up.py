@@ -0,0 +1,263 @@
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from starkbank_webhook_test.metrics.registry import metrics_registry
+
+catch_up_logger = logging.getLogger('event_catch_up')
+catch_up_logger.setLevel(logging.DEBUG)
+
+# Maximum number of events returned by a single event.page request
+EVENT_PAGE_LIMIT = 100
+
+
+class EventCatchUp:
+    """
+    A walk over the Stark Bank events missed while the service was down.
+
+    The events created since the saved watermark date are read page by page
+    with `event.page`, which returns the newest events first. The pages are
+    walked in that order, so only one is held in memory, and the
+    undelivered events of each page are handed to the same dispatch path as
+    the webhook events, oldest first within the page. They are then marked
+    as delivered in bulk, with the updates sent in parallel. The events
+    already delivered were processed through the webhook and are skipped.
+
+    The state is a small JSON file written after each page: the page cursor,
+    so a walk interrupted by a crash resumes from its last page, and the
+    watermark date, moved to the day the walk started once a walk ends with
+    no failed events.
+
+    Attributes:
+        - path (str): The path of the JSON state file.
+        - limit (int): The number of events per page.
+        - workers (int): The number of parallel delivery updates.
+        - lookback_days (int): How far back the first walk goes, in days.
+    """
+
+    def __init__(
+        self,
+        page_events,
+        update_event,
+        dispatch,
+        path: str,
+        limit: int = EVENT_PAGE_LIMIT,
+        workers: int = 8,
+        lookback_days: int = 1,
+    ):
+        """
+        Initialize the EventCatchUp without reading any event.
+
+        Args:
+            - page_events (callable): Returns a page of events and the next
+              cursor, as `starkbank.event.page`.
+            - update_event (callable): Marks an event as delivered from its ID.
+            - dispatch (callable): Processes a parsed event, returning a Future.
+            - path (str): The path of the JSON state file.
+            - limit (int): The number of events per page.
+            - workers (int): The number of parallel delivery updates.
+            - lookback_days (int): How far back the first walk goes, in days.
+        """
+        if not 1 <= limit <= EVENT_PAGE_LIMIT:
+            raise ValueError(
+                f'Invalid limit. Use an integer from 1 to {EVENT_PAGE_LIMIT}.'
+            )
+
+        if workers < 1:
+            raise ValueError('Invalid workers. Use a positive integer.')
+
+        if lookback_days < 0:
+            raise ValueError(
+                'Invalid lookback_days. Use a non-negative integer.'
+            )
+
+        self.page_events = page_events
+        self.update_event = update_event
+        self.dispatch = dispatch
+        self.path = path
+        self.limit = limit
+        self.workers = workers
+        self.lookback_days = lookback_days
+
+    def load_state(self):
+        """
+        Return the saved state, or the state of a first walk.
+
+        Returns:
+            dict: The 'after' watermark date, then the page 'cursor', the
+                'started' date and the 'failed' events of the walk in
+                progress, if any.
+        """
+        try:
+            with open(self.path) as state_file:
+                return json.load(state_file)
+        except FileNotFoundError:
+            after = _today() - timedelta(days=self.lookback_days)
+            return {
+                'after': after.isoformat(),
+                'cursor': None,
+                'started': None,
+                'failed': 0,
+            }
+
+    def save_state(self, state: dict):
+        """
+        Write the state atomically, so a crash never leaves it half written.
+
+        Each write goes through its own temporary file, so the workers
+        sharing a state path never replace each other's file.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            'w',
+            dir=directory,
+            prefix=f'{os.path.basename(self.path)}.',
+            suffix='.tmp',
+            delete=False,
+        ) as state_file:
+            try:
+                json.dump(state, state_file)
+                state_file.flush()
+                os.fsync(state_file.fileno())
+            except BaseException:
+                state_file.close()
+                os.remove(state_file.name)
+                raise
+        os.replace(state_file.name, self.path)
+
+    def pages(self, state: dict):
+        """
+        Stream the pages of events from the saved cursor.
+
+        The state is updated with the cursor of the next page before each
+        page is yielded, and saved by the caller once the page is processed.
+
+        Yields:
+            list[starkbank.Event]: The events of each page, newest first.
+        """
+        cursor = state['cursor']
+        while True:
+            events, cursor = self.page_events(
+                cursor=cursor, limit=self.limit, after=state['after']
+            )
+            state['cursor'] = cursor
+            yield events
+            if cursor is None:
+                return
+
+    def _mark_delivered(self, executor, events):
+        """
+        Mark the events as delivered in parallel.
+
+        Returns:
+            int: The number of events that could not be updated.
+        """
+        failed = 0
+        futures = [
+            executor.submit(self.update_event, event.id) for event in events
+        ]
+        for event, future in zip(events, futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                catch_up_logger.error(
+                    f'Event delivery update error. Event ID: {event.id} | '
+                    f'Error: {e}'
+                )
+        return failed
+
+    def _process_page(self, executor, events):
+        """
+        Dispatch the undelivered events of a page and mark them as delivered.
+
+        Returns:
+            dict: The number of events dispatched, skipped and failed.
+        """
+        counts = {'dispatched': 0, 'skipped': 0, 'failed': 0}
+        dispatched = []
+        for event in reversed(events):
+            if event.is_delivered:
+                counts['skipped'] += 1
+                continue
+
+            try:
+                dispatched.append((event, self.dispatch(event)))
+            except Exception as e:
+                counts['failed'] += 1
+                catch_up_logger.error(
+                    f'Missed event error. Event ID: {event.id} | Error: {e}'
+                )
+
+        processed = []
+        for event, future in dispatched:
+            error = future.exception()
+            if error is not None:
+                counts['failed'] += 1
+                catch_up_logger.error(
+                    f'Missed event error. Event ID: {event.id} | Error: {error}'
+                )
+                continue
+
+            counts['dispatched'] += 1
+            processed.append(event)
+
+        # An event left undelivered is dispatched again by the next walk
+        not_updated = self._mark_delivered(executor, processed)
+        counts['failed'] += not_updated
+
+        for outcome, count in counts.items():
+            if count:
+                metrics_registry.increment(
+                    'event_catch_up_total', count, outcome=outcome
+                )
+        return counts
+
+    def run(self):
+        """
+        Walk the events missed since the watermark, resuming an interrupted walk.
+
+        Returns:
+            dict: The number of events dispatched, skipped and failed.
+        """
+        state = self.load_state()
+        if state['started'] is None:
+            state['started'] = _today().isoformat()
+            state['failed'] = 0
+
+        catch_up_logger.info(
+            f"Catching up on the events after {state['after']}. "
+            f"Cursor: {state['cursor']}"
+        )
+
+        totals = {'dispatched': 0, 'skipped': 0, 'failed': 0}
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='event_catch_up'
+        ) as executor:
+            for events in self.pages(state):
+                counts = self._process_page(executor, events)
+                for outcome, count in counts.items():
+                    totals[outcome] += count
+                state['failed'] += counts['failed']
+                self.save_state(state)
+
+        # Keep the watermark when events failed, so they are walked again
+        if not state['failed']:
+            state['after'] = state['started']
+        state['started'] = None
+        state['failed'] = 0
+        self.save_state(state)
+
+        catch_up_logger.info(
+            f"Event catch-up done. Dispatched: {totals['dispatched']} | "
+            f"Skipped: {totals['skipped']} | Failed: {totals['failed']}"
+        )
+        return totals
+
+
+def _today():
+    return datetime.now(timezone.utc).date()
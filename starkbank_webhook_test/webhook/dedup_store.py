@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+import time
+
+CLAIMED = 'claimed'
+PROCESSED = 'processed'
+
+
+class DedupStore:
+    """
+    A persistent index of the webhook keys being processed or already processed.
+
+    The keys are stored in a SQLite table in WAL mode, so they survive restarts
+    and can be shared by several consumer processes. Every lookup reads the
+    table, so a key released by another consumer is seen at once.
+
+    A key is first claimed, then marked as processed once its work succeeded,
+    or released when it failed. Claiming a key is atomic across processes:
+    when several consumers receive the same event, exactly one of them claims
+    it. A claim older than `claim_timeout` was left by a consumer that
+    crashed before finishing its work, so it may be claimed again.
+
+    Attributes:
+        - path (str): The SQLite database path, ':memory:' for a volatile store.
+        - claim_timeout (float): How long in seconds a claim is held before it
+          may be claimed again.
+    """
+
+    def __init__(self, path: str = ':memory:', claim_timeout: float = 600):
+        """
+        Initialize the DedupStore, creating the database if needed.
+
+        Args:
+            - path (str): The SQLite database path, ':memory:' for a volatile store.
+            - claim_timeout (float): How long in seconds a claim is held
+              before it may be claimed again.
+        """
+        if claim_timeout <= 0:
+            raise ValueError('Invalid claim_timeout. Use a positive number.')
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.claim_timeout = claim_timeout
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS dedup_keys ('
+            'key TEXT PRIMARY KEY, '
+            'status TEXT NOT NULL, '
+            'updated_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+
+    def seen(self, key: str):
+        """
+        Check if a key was already processed.
+
+        Args:
+            - key (str): The key to check.
+
+        Returns:
+            bool: True if the key was already processed.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT 1 FROM dedup_keys WHERE key = ? AND status = ?',
+                (key, PROCESSED),
+            ).fetchone()
+            return row is not None
+
+    def claim(self, key: str):
+        """
+        Claim a key if no one has processed it or is processing it.
+
+        Args:
+            - key (str): The key to claim.
+
+        Returns:
+            bool: True if the key was claimed, False if it was already
+                processed or is claimed by another consumer.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                'INSERT INTO dedup_keys VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET updated_at = excluded.updated_at '
+                'WHERE status = ? AND updated_at < ?',
+                (key, CLAIMED, now, CLAIMED, now - self.claim_timeout),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, key: str):
+        """
+        Mark a claimed key as processed, so it is never claimed again.
+
+        Args:
+            - key (str): The key to mark.
+        """
+        with self._lock:
+            self._connection.execute(
+                'UPDATE dedup_keys SET status = ?, updated_at = ? WHERE key = ?',
+                (PROCESSED, time.time(), key),
+            )
+
+    def release(self, key: str):
+        """
+        Forget a claimed key, so it can be processed again.
+
+        Args:
+            - key (str): The key to release.
+        """
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM dedup_keys WHERE key = ?', (key,)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM dedup_keys'
+            ).fetchone()[0]
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
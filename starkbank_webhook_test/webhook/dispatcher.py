@@ -0,0 +1,183 @@
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+dispatcher_logger = logging.getLogger('event_dispatcher')
+dispatcher_logger.setLevel(logging.DEBUG)
+
+
+def _run(handler, event, on_error=None, on_success=None):
+    """
+    Run a handler, driving it to completion if it is a coroutine function.
+    """
+    try:
+        if inspect.iscoroutinefunction(handler):
+            result = asyncio.run(handler(event))
+        else:
+            result = handler(event)
+    except Exception as e:
+        if on_error is not None:
+            on_error(event, e)
+        raise
+
+    if on_success is not None:
+        on_success(event, result)
+    return result
+
+
+def completed(result=None):
+    """
+    Return a Future already resolved with the result.
+    """
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class EventDispatcher:
+    """
+    A registry routing the webhook events to their handlers.
+
+    The handlers are registered by subscription and log type, such as
+    ('invoice', 'credited') or ('transfer', 'failed'). A handler registered
+    with no log type handles the other log types of its subscription. Both
+    plain functions and coroutine functions are accepted.
+
+    By default the handlers run in the calling thread. Once started, each
+    subscription gets its own worker pool, so a slow handler of a
+    subscription never delays the events of the others. Each pool takes its
+    events in order, so the events of a subscription with a single worker
+    are also handled in order.
+
+    Attributes:
+        - workers (dict): The number of workers of each subscription pool.
+        - default_workers (int): The workers of the other subscription pools.
+    """
+
+    def __init__(self):
+        """
+        Initialize the EventDispatcher with no handlers, in the calling thread.
+        """
+        self.workers = {}
+        self.default_workers = 1
+        self._handlers = {}
+        self._pools = None
+        self._lock = threading.Lock()
+
+    def register(self, subscription: str, handler, log_types=None):
+        """
+        Register the handler of a subscription, replacing the previous one.
+
+        Args:
+            - subscription (str): The subscription, such as 'invoice'.
+            - handler (callable): Called with the event, may be a coroutine function.
+            - log_types (Iterable[str]): The log types handled, None for any.
+        """
+        for log_type in log_types or (None,):
+            self._handlers[(subscription, log_type)] = handler
+
+    def unregister(self, subscription: str, log_types=None):
+        """
+        Remove the handlers of a subscription and log types.
+        """
+        for log_type in log_types or (None,):
+            self._handlers.pop((subscription, log_type), None)
+
+    @property
+    def subscriptions(self):
+        """
+        Return the subscriptions with a handler.
+        """
+        return sorted({subscription for subscription, _ in self._handlers})
+
+    def resolve(self, event):
+        """
+        Return the handler of an event, or None if it has no handler.
+        """
+        log_type = getattr(getattr(event, 'log', None), 'type', None)
+        return self._handlers.get(
+            (event.subscription, log_type)
+        ) or self._handlers.get((event.subscription, None))
+
+    @property
+    def concurrent(self):
+        """
+        Return whether the handlers run on the worker pools.
+        """
+        return self._pools is not None
+
+    def start(self, workers: dict = None, default_workers: int = 1):
+        """
+        Run the handlers on a worker pool per subscription.
+
+        Args:
+            - workers (dict): The number of workers of each subscription pool.
+            - default_workers (int): The workers of the other subscription pools.
+        """
+        workers = dict(workers or {})
+        if default_workers < 1 or any(count < 1 for count in workers.values()):
+            raise ValueError('Invalid workers. Use positive integers.')
+
+        self.close()
+        with self._lock:
+            self.workers = workers
+            self.default_workers = default_workers
+            self._pools = {}
+
+    def _pool(self, subscription):
+        """
+        Return the worker pool of a subscription, or None when not started.
+        """
+        with self._lock:
+            if self._pools is None:
+                return None
+
+            pool = self._pools.get(subscription)
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=self.workers.get(
+                        subscription, self.default_workers
+                    ),
+                    thread_name_prefix=f'events_{subscription}',
+                )
+                self._pools[subscription] = pool
+            return pool
+
+    def submit(self, handler, event, on_error=None, on_success=None):
+        """
+        Handle an event with a resolved handler.
+
+        In the calling thread, the handler errors are raised. On the worker
+        pools, they resolve the returned Future.
+
+        Args:
+            - handler (callable): The handler of the event.
+            - event (starkbank.Event): The event to handle.
+            - on_error (callable): Called with the event and the error of a
+              failed handler, before the error is raised.
+            - on_success (callable): Called with the event and the result of
+              a handler that succeeded.
+
+        Returns:
+            Future: The result of the handler.
+        """
+        pool = self._pool(event.subscription)
+        if pool is None:
+            return completed(_run(handler, event, on_error, on_success))
+
+        return pool.submit(_run, handler, event, on_error, on_success)
+
+    def close(self):
+        """
+        Wait for the queued events and run the next handlers in the calling thread.
+        """
+        with self._lock:
+            pools, self._pools = self._pools, None
+
+        for subscription, pool in (pools or {}).items():
+            pool.shutdown(wait=True)
+            dispatcher_logger.debug(
+                f'Event worker pool closed. Subscription: {subscription}'
+            )
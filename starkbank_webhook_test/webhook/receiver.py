@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import socket
+from concurrent.futures import Future
+from http import HTTPStatus
+
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegrationError,
+)
+
+receiver_logger = logging.getLogger('webhook_receiver')
+receiver_logger.setLevel(logging.DEBUG)
+
+
+class WebhookReceiver:
+    """
+    An asyncio HTTP server receiving the Stark Bank webhook callbacks.
+
+    Each POST callback has its `Digital-Signature` verified and the parsed
+    event is put on an in-process queue, which is drained by worker tasks that
+    hand the events to the integration. The callback is answered once its
+    event is handled, so Stark Bank only marks as delivered the events whose
+    transfers were created or recorded in the transfer outbox. A failed event
+    is answered with an error and delivered again later. The callbacks of a
+    connection wait for their events, but the connections are served
+    concurrently.
+
+    Several receiver processes, such as the workers of a ServiceSupervisor,
+    may listen on the same port, where the platform supports SO_REUSEPORT.
+
+    Attributes:
+        - integration (StarkbankIntegration): The integration handling the events.
+        - host (str): The interface the server listens on.
+        - port (int): The port the server listens on.
+        - path (str): The path accepting the callbacks.
+        - workers (int): The number of worker tasks handling the events.
+        - queue (asyncio.Queue): The queue of verified events.
+    """
+
+    def __init__(
+        self,
+        integration,
+        host: str = '0.0.0.0',
+        port: int = 8000,
+        path: str = '/',
+        workers: int = 4,
+        queue_size: int = 10000,
+        max_body_size: int = 1024 * 1024,
+        reuse_port: bool = True,
+    ):
+        """
+        Initialize the WebhookReceiver with the integration handling the events.
+
+        Args:
+            - integration (StarkbankIntegration): The integration handling the events.
+            - host (str): The interface the server listens on.
+            - port (int): The port the server listens on.
+            - path (str): The path accepting the callbacks.
+            - workers (int): The number of worker tasks handling the events.
+            - queue_size (int): The maximum number of events waiting to be handled.
+            - max_body_size (int): The maximum accepted callback size in bytes.
+            - reuse_port (bool): Allow several processes to listen on the same port.
+        """
+        if workers < 1:
+            raise ValueError('Invalid workers. Use a positive integer.')
+
+        self.integration = integration
+        self.host = host
+        self.port = port
+        self.path = path
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_body_size = max_body_size
+        self.reuse_port = reuse_port
+        self.queue = None
+        self._server = None
+        self._worker_tasks = []
+
+    @property
+    def pending(self):
+        """
+        Return the number of events waiting to be handled.
+        """
+        return self.queue.qsize() if self.queue else 0
+
+    async def start(self):
+        """
+        Start listening for callbacks and start the worker tasks.
+        """
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        reuse_port = self.reuse_port and hasattr(socket, 'SO_REUSEPORT')
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            self.host,
+            self.port,
+            reuse_port=reuse_port or None,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        receiver_logger.info(
+            f'Webhook receiver listening on {self.host}:{self.port}'
+        )
+
+    async def stop(self):
+        """
+        Stop accepting callbacks, handle the queued events and stop the workers.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        if self.queue is not None:
+            await self.queue.join()
+
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def serve(self, duration: float = None):
+        """
+        Run the receiver for the given duration in seconds, or forever.
+
+        Args:
+            - duration (float): How long to serve, None to serve forever.
+        """
+        await self.start()
+        try:
+            if duration is None:
+                await asyncio.Event().wait()
+            else:
+                await asyncio.sleep(duration)
+        finally:
+            await self.stop()
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Serve the requests of a keep-alive connection.
+        """
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                status = await self._handle_request(
+                    method, path, headers, body
+                )
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, keep_alive)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError:
+            self._write_response(writer, HTTPStatus.BAD_REQUEST, False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """
+        Read a single HTTP request from the connection.
+
+        Returns:
+            tuple: The method, path, headers and body, or None if the
+                connection was closed.
+        """
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        content_length = int(headers.get('content-length', 0))
+        if content_length > self.max_body_size:
+            raise ValueError('Request body too large')
+
+        body = await reader.readexactly(content_length)
+        return method, path.split('?', 1)[0], headers, body
+
+    async def _handle_request(self, method, path, headers, body):
+        """
+        Verify a callback, queue its event and wait until it is handled.
+
+        Returns:
+            HTTPStatus: The status of the response.
+        """
+        from starkbank.error import InvalidSignatureError
+
+        if path != self.path:
+            return HTTPStatus.NOT_FOUND
+
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED
+
+        signature = headers.get('digital-signature')
+        if not signature:
+            return HTTPStatus.BAD_REQUEST
+
+        try:
+            loop = asyncio.get_running_loop()
+            event = await loop.run_in_executor(
+                None, self._parse_event, body.decode('utf-8'), signature
+            )
+        except InvalidSignatureError as sig_error:
+            receiver_logger.error(f'Invalid signature error: {sig_error}')
+            return HTTPStatus.UNAUTHORIZED
+        except Exception as e:
+            receiver_logger.error(f'Error parsing webhook callback: {e}')
+            return HTTPStatus.BAD_REQUEST
+
+        handled = loop.create_future()
+        try:
+            self.queue.put_nowait((event, handled))
+        except asyncio.QueueFull:
+            # Stark Bank retries the callback later
+            receiver_logger.warning('Webhook event queue is full.')
+            return HTTPStatus.SERVICE_UNAVAILABLE
+
+        try:
+            await handled
+        except Exception:
+            # Stark Bank delivers the event again later
+            return HTTPStatus.INTERNAL_SERVER_ERROR
+
+        return HTTPStatus.OK
+
+    def _parse_event(self, content, signature):
+        """
+        Verify the signature of a callback and parse its event.
+        """
+        return self.integration.parse_event(content, signature)
+
+    def _handle_event(self, event):
+        """
+        Dispatch an event and wait until it is handled, raising its errors.
+        """
+        result = self.integration.dispatch_event(event).result()
+        if isinstance(result, Future):
+            # The handler deferred its work, such as a batched transfer
+            result.result()
+
+    def _write_response(self, writer, status, keep_alive):
+        """
+        Write an empty HTTP response with the given status.
+        """
+        connection = 'keep-alive' if keep_alive else 'close'
+        writer.write(
+            f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Length: 0\r\n'
+            f'Connection: {connection}\r\n\r\n'.encode('latin-1')
+        )
+
+    async def _worker(self):
+        """
+        Hand the queued events to the integration, one at a time.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            event, handled = await self.queue.get()
+            try:
+                await loop.run_in_executor(None, self._handle_event, event)
+            except StarkbankIntegrationError as sie:
+                receiver_logger.error(f'Webhook event handling error: {sie}')
+                _resolve(handled, sie)
+            except Exception as e:
+                receiver_logger.error(f'Unexpected webhook event error: {e}')
+                _resolve(handled, e)
+            else:
+                _resolve(handled)
+            finally:
+                self.queue.task_done()
+
+
+def _resolve(handled, error=None):
+    """
+    Resolve the future awaited by a callback, unless it was cancelled.
+    """
+    if handled.done():
+        return
+    if error is None:
+        handled.set_result(None)
+    else:
+        handled.set_exception(error)
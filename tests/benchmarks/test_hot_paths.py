@@ -0,0 +1,143 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+import starkbank
+from ellipticcurve import PrivateKey
+from requests.structures import CaseInsensitiveDict
+from starkcore.utils.api import api_json
+
+from starkbank_webhook_test.auth.authenticator import Authenticator
+from starkbank_webhook_test.generators.invoice_data import FakerPool
+from starkbank_webhook_test.mock_api.server import MockStarkbankServer
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+
+PRIVATE_KEY = PrivateKey().toPem()
+
+
+@pytest.fixture(scope='module')
+def mock_api():
+    """
+    Serve the Stark Bank public key from a local mock server.
+    """
+    with MockStarkbankServer(payment_rate=0) as server:
+        pool = ConnectionPool(base_url=server.url)
+        pool.install_sdk()
+        yield server
+        ConnectionPool.uninstall_sdk()
+        pool.close()
+
+
+@pytest.fixture
+def integration():
+    """
+    Create an integration with a seeded invoice data generator.
+    """
+    integration = StarkbankIntegration(
+        'sandbox',
+        '5656565656565656',
+        PRIVATE_KEY,
+        'project',
+        'https://example.com/webhook',
+    )
+    integration.user = integration.authenticator.authenticate()
+    integration.faker_pool = FakerPool(seed=42)
+    yield integration
+    integration.disable_signature_cache()
+    integration.connection_pool.close()
+
+
+@pytest.fixture
+def paid_invoice_callback(mock_api):
+    """
+    Build a webhook callback of a paid invoice, signed by the mock server.
+    """
+    content = json.dumps(
+        {
+            'event': {
+                'id': '5000000000000001',
+                'subscription': 'invoice',
+                'isDelivered': False,
+                'created': '2023-12-08T12:00:00.000000+00:00',
+                'workspaceId': '1',
+                'log': {
+                    'id': '5000000000000002',
+                    'type': 'credited',
+                    'created': '2023-12-08T12:00:00.000000+00:00',
+                    'errors': [],
+                    'invoice': {
+                        'id': '5000000000000003',
+                        'amount': 10000,
+                        'fee': 50,
+                        'name': 'Iron Bank S.A.',
+                        'taxId': '012.345.678-90',
+                        'status': 'paid',
+                    },
+                },
+            }
+        }
+    )
+    callback = requests.Response()
+    callback.status_code = 200
+    callback.headers = CaseInsensitiveDict(
+        {'Digital-Signature': mock_api.sign(content)}
+    )
+    callback._content = content.encode('utf-8')
+    callback._content_consumed = True
+    return callback
+
+
+def test_generate_random_invoice_data(benchmark, integration):
+    """
+    Benchmark the generation of the random invoice data.
+    """
+    data = benchmark(integration._generate_random_invoice_data)
+
+    assert {'amount', 'taxId', 'name'} <= set(data)
+
+
+def test_issue_single_invoice_payload(benchmark, integration):
+    """
+    Benchmark building and serializing a random invoice payload.
+    """
+    with patch(
+        'starkbank.invoice.create',
+        side_effect=lambda invoices, user: [api_json(i) for i in invoices],
+    ):
+        payloads = benchmark(integration._issue_single_invoice)
+
+    assert payloads[0]['amount'] > 0
+
+
+@pytest.mark.parametrize('signature_cache', [False, True])
+def test_process_webhook_events(
+    benchmark, integration, paid_invoice_callback, signature_cache
+):
+    """
+    Benchmark verifying, parsing and dispatching a paid invoice callback.
+    """
+    if signature_cache:
+        integration.enable_signature_cache()
+
+    with patch(
+        'starkbank.transfer.create',
+        side_effect=lambda transfers, user: transfers,
+    ) as mock_create:
+        benchmark(integration.process_webhook_events, paid_invoice_callback)
+
+    assert mock_create.call_args.args[0][0].amount == 9950
+
+
+def test_authenticate(benchmark):
+    """
+    Benchmark creating the authenticated Stark Bank user.
+    """
+    authenticator = Authenticator(
+        'sandbox', '5656565656565656', PRIVATE_KEY, 'project'
+    )
+
+    user = benchmark(authenticator.authenticate)
+
+    assert isinstance(user, starkbank.Project)
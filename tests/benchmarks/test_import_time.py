@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ('faker', 'starkbank', 'requests', 'kami_logging')
+
+
+def _python(code):
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.mark.parametrize(
+    'module',
+    [
+        'main',
+        'starkbank_webhook_test.starkbank_integration',
+        'starkbank_webhook_test.services.invoice_generator',
+        'starkbank_webhook_test.services.transfer_generator',
+    ],
+)
+def test_module_does_not_import_heavy_modules(module):
+    """
+    Test that a module defers the SDK, Faker and requests imports.
+    """
+    loaded = _python(
+        f'import sys, {module}; '
+        f'print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    )
+
+    assert loaded.strip() == ''
+
+
+@pytest.mark.parametrize(
+    'module',
+    [
+        'main',
+        'starkbank_webhook_test.starkbank_integration',
+        'starkbank_webhook_test.services.invoice_generator',
+        'starkbank_webhook_test.services.transfer_generator',
+    ],
+)
+def test_import_time(benchmark, module):
+    """
+    Benchmark starting an interpreter and importing a module.
+    """
+    benchmark.pedantic(_python, args=(f'import {module}',), rounds=5)
@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from starkbank_webhook_test.async_integration import AsyncStarkbankIntegration
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegrationError,
+)
+
+
+class TestAsyncStarkbankIntegration(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit test case for the AsyncStarkbankIntegration class.
+    """
+
+    def setUp(self):
+        """
+        Set up common variables for tests.
+        """
+        self.integration = AsyncStarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+            max_concurrency=4,
+        )
+        self.addCleanup(self.integration.close)
+
+    def test_init_invalid_concurrency(self):
+        """
+        Test failure during initialization with an invalid concurrency limit.
+        """
+        with self.assertRaises(StarkbankIntegrationError):
+            AsyncStarkbankIntegration(
+                environment='sandbox',
+                id='1234567890',
+                private_key='valid_private_key_content',
+                auth_type='project',
+                webhook_url='http://example.com/webhook',
+                max_concurrency=0,
+            )
+
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.ConnectionPool.install_sdk'
+    )
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.Authenticator.authenticate',
+        autospec=True,
+    )
+    async def test_connect_success(self, mock_authenticate, mock_install_sdk):
+        """
+        Test successful connection to Stark Bank API.
+        """
+        await self.integration.connect()
+        self.assertIsInstance(self.integration.user, Mock)
+
+    async def test_create_transfers_respects_concurrency_limit(self):
+        """
+        Test that no more than max_concurrency requests are in flight.
+        """
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        external_ids = set()
+
+        def create_transfer(amount, external_id):
+            nonlocal in_flight, peak
+            external_ids.add(external_id)
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            if amount < 0:
+                raise StarkbankIntegrationError('Invalid amount')
+            return True
+
+        with patch.object(
+            self.integration.integration,
+            '_create_transfer',
+            side_effect=create_transfer,
+        ):
+            results = await self.integration.create_transfers(
+                [100] * 15 + [-1]
+            )
+
+        self.assertEqual(peak, 4)
+        self.assertEqual(len(external_ids), 16)
+        self.assertEqual(results[:15], [True] * 15)
+        self.assertIsInstance(results[15], StarkbankIntegrationError)
+
+    @patch('starkbank.invoice.create')
+    async def test_issue_invoices_success(self, mock_create):
+        """
+        Test that the invoices are sent in concurrent chunks.
+        """
+        mock_create.side_effect = lambda invoices, user: invoices
+
+        results = await self.integration.issue_invoices(10, batch_size=3)
+
+        self.assertEqual(mock_create.call_count, 4)
+        self.assertEqual([r.size for r in results], [3, 3, 3, 1])
+        self.assertTrue(all(r.succeeded for r in results))
+
+    @patch('starkbank_webhook_test.starkbank_integration.ConnectionPool.get')
+    async def test_listen_success(self, mock_get):
+        """
+        Test that listen returns the webhook response.
+        """
+        mock_response = Mock()
+        mock_get.return_value = mock_response
+
+        response = await self.integration.listen()
+
+        self.assertEqual(response, mock_response)
+
+
+if __name__ == '__main__':
+    unittest.main()
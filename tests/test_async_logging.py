@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import queue
+import tempfile
+import unittest
+
+from starkbank_webhook_test.async_logging import (
+    BatchingQueueListener,
+    QueueLogging,
+)
+
+
+class RecordingBatchHandler(logging.Handler):
+    """
+    A handler recording the size of each batch it receives.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def emit_batch(self, records):
+        self.batches.append([record.getMessage() for record in records])
+
+
+class TestQueueLogging(unittest.TestCase):
+    """
+    Unit test case for the QueueLogging class.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary log file and a test logger.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file_path = os.path.join(directory.name, 'logs/service.log')
+        self.logger = logging.getLogger('queue_logging_test')
+        self.logger.setLevel(logging.DEBUG)
+
+    def _lines(self):
+        with open(self.file_path, encoding='utf-8') as log_file:
+            return log_file.read().splitlines()
+
+    def test_stop_writes_every_record(self):
+        """
+        Test that the queued records are written when the pipeline stops.
+        """
+        pipeline = QueueLogging(self.file_path, [self.logger.name])
+        pipeline.start()
+
+        for index in range(500):
+            self.logger.info(f'Invoice issued. Invoice ID: {index}')
+        pipeline.stop()
+
+        lines = self._lines()
+        self.assertEqual(len(lines), 500)
+        self.assertEqual(lines[-1], 'Invoice issued. Invoice ID: 499')
+        self.assertFalse(pipeline.running)
+
+    def test_json_lines(self):
+        """
+        Test that each record is written as a JSON object.
+        """
+        with QueueLogging(self.file_path, [self.logger.name], json_lines=True):
+            self.logger.warning('Webhook event queue is full.')
+
+        entry = json.loads(self._lines()[0])
+        self.assertEqual(entry['level'], 'WARNING')
+        self.assertEqual(entry['logger'], self.logger.name)
+        self.assertEqual(entry['message'], 'Webhook event queue is full.')
+
+    def test_loggers_are_restored(self):
+        """
+        Test that the records still propagate and stopping detaches the queue.
+        """
+        pipeline = QueueLogging(self.file_path, [self.logger.name])
+
+        pipeline.start()
+        with self.assertLogs(level=logging.INFO) as console:
+            self.logger.info('Invoice issued.')
+        self.assertTrue(self.logger.propagate)
+        self.assertEqual(
+            console.output, [f'INFO:{self.logger.name}:Invoice issued.']
+        )
+
+        pipeline.stop()
+        pipeline.stop()
+        self.assertEqual(self.logger.handlers, [])
+        self.assertEqual(self._lines(), ['Invoice issued.'])
+
+    def test_invalid_batch_size(self):
+        """
+        Test failure during initialization with an invalid batch size.
+        """
+        with self.assertRaises(ValueError):
+            QueueLogging(self.file_path, [], batch_size=0)
+
+
+class TestBatchingQueueListener(unittest.TestCase):
+    """
+    Unit test case for the BatchingQueueListener class.
+    """
+
+    def test_records_are_batched(self):
+        """
+        Test that the queued records are handed over in bounded batches.
+        """
+        log_queue = queue.SimpleQueue()
+        handler = RecordingBatchHandler()
+        listener = BatchingQueueListener(log_queue, handler, batch_size=4)
+
+        for index in range(10):
+            log_queue.put(
+                logging.LogRecord(
+                    'test', logging.INFO, __file__, 0, str(index), None, None
+                )
+            )
+        listener.start()
+        listener.stop()
+
+        self.assertEqual([len(batch) for batch in handler.batches], [4, 4, 2])
+        self.assertEqual(handler.batches[-1], ['8', '9'])
+
+
+if __name__ == '__main__':
+    unittest.main()
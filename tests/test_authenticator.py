@@ -3,7 +3,11 @@ from unittest.mock import Mock, patch
 
 import starkbank
 
-from starkbank_webhook_test.auth.authenticator import AuthenticationError, Authenticator
+from starkbank_webhook_test.auth.authenticator import (
+    AuthenticationError,
+    Authenticator,
+)
+from starkbank_webhook_test.auth.credential_cache import credential_cache
 
 
 class TestAuthenticator(unittest.TestCase):
@@ -15,6 +19,8 @@ class TestAuthenticator(unittest.TestCase):
         """
         Set up common variables for tests.
         """
+        # Create the users again, so the patched SDK classes are called
+        credential_cache.clear()
         self.valid_private_key = """
         -----BEGIN EC PARAMETERS-----
         BgUrgQQACg==
@@ -0,0 +1,141 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import starkcore.utils.rest as sdk_rest
+
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """
+    A handler recording the client port of each request.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestConnectionPool(unittest.TestCase):
+    """
+    Unit test case for the ConnectionPool class.
+    """
+
+    def setUp(self):
+        """
+        Start a local HTTP server.
+        """
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), CountingHandler)
+        self.server.client_ports = set()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/webhook'
+
+    def test_init_invalid_pool_size(self):
+        """
+        Test failure during initialization with an invalid pool size.
+        """
+        with self.assertRaises(ValueError):
+            ConnectionPool(pool_size=0)
+
+    def test_connections_are_reused(self):
+        """
+        Test that sequential requests share a single connection.
+        """
+        pool = ConnectionPool()
+        self.addCleanup(pool.close)
+
+        for _ in range(5):
+            self.assertEqual(pool.get(self.url).status_code, 200)
+
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_keep_alive_disabled(self):
+        """
+        Test that each request opens a connection without keep-alive.
+        """
+        pool = ConnectionPool(keep_alive=False)
+        self.addCleanup(pool.close)
+
+        for _ in range(3):
+            pool.get(self.url)
+
+        self.assertEqual(len(self.server.client_ports), 3)
+
+    def test_default_timeout(self):
+        """
+        Test that requests get the pool timeout unless one is given.
+        """
+        pool = ConnectionPool(timeout=2)
+        self.addCleanup(pool.close)
+
+        with patch.object(pool.session, 'request') as mock_request:
+            pool.get(self.url)
+            pool.post(self.url, timeout=5)
+
+        self.assertEqual(mock_request.call_args_list[0].kwargs['timeout'], 2)
+        self.assertEqual(mock_request.call_args_list[1].kwargs['timeout'], 5)
+
+    def test_retries_only_idempotent_methods(self):
+        """
+        Test that retryable statuses are not retried for transfer creations.
+        """
+        pool = ConnectionPool(retries=4)
+        self.addCleanup(pool.close)
+
+        retry = pool.session.get_adapter(self.url).max_retries
+
+        self.assertEqual(retry.total, 4)
+        self.assertTrue(retry.is_retry('GET', 503))
+        self.assertFalse(retry.is_retry('POST', 503))
+
+    def test_set_retries(self):
+        """
+        Test that the retries of the next requests can be disabled.
+        """
+        pool = ConnectionPool(retries=4)
+        self.addCleanup(pool.close)
+
+        pool.set_retries(0)
+
+        self.assertEqual(pool.retries, 0)
+        self.assertEqual(
+            pool.session.get_adapter(self.url).max_retries.total, 0
+        )
+        with self.assertRaises(ValueError):
+            pool.set_retries(-1)
+
+    def test_install_sdk(self):
+        """
+        Test that the SDK requests are routed through the pool and restored.
+        """
+        original_get = sdk_rest.get
+        pool = ConnectionPool()
+        self.addCleanup(pool.close)
+
+        pool.install_sdk()
+        self.addCleanup(ConnectionPool.uninstall_sdk)
+
+        self.assertEqual(sdk_rest.get, pool.get)
+        self.assertEqual(sdk_rest.post, pool.post)
+
+        ConnectionPool.uninstall_sdk()
+
+        self.assertIs(sdk_rest.get, original_get)
+
+
+if __name__ == '__main__':
+    unittest.main()
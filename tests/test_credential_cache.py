@@ -0,0 +1,112 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import starkbank
+from ellipticcurve.privateKey import PrivateKey
+
+from starkbank_webhook_test.auth.credential_cache import CredentialCache
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+
+
+class TestCredentialCache(unittest.TestCase):
+    """
+    Unit test case for the CredentialCache class.
+    """
+
+    def setUp(self):
+        """
+        Set up an empty cache and two private keys.
+        """
+        self.cache = CredentialCache()
+        self.private_key = PrivateKey().toPem()
+        self.rotated_private_key = PrivateKey().toPem()
+
+    def test_user_is_reused(self):
+        """
+        Test that the same credentials share a single user.
+        """
+        user = self.cache.get('sandbox', '1', self.private_key, 'project')
+
+        self.assertIsInstance(user, starkbank.Project)
+        self.assertIs(
+            self.cache.get('sandbox', '1', self.private_key, 'project'), user
+        )
+        self.assertIsInstance(
+            self.cache.get('sandbox', '1', self.private_key, 'organization'),
+            starkbank.Organization,
+        )
+        self.assertEqual(len(self.cache), 2)
+
+    def test_rotated_key_replaces_user(self):
+        """
+        Test that a new private key creates a new user.
+        """
+        user = self.cache.get('sandbox', '1', self.private_key, 'project')
+
+        rotated = self.cache.get(
+            'sandbox', '1', self.rotated_private_key, 'project'
+        )
+
+        self.assertIsNot(rotated, user)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_concurrent_tenants(self):
+        """
+        Test that concurrent tenants get their own users without the global one.
+        """
+        global_user = starkbank.user
+        tenants = [str(index) for index in range(8)] * 4
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            users = list(
+                executor.map(
+                    lambda id: self.cache.get(
+                        'sandbox', id, self.private_key, 'project'
+                    ),
+                    tenants,
+                )
+            )
+
+        for id, user in zip(tenants, users):
+            self.assertEqual(user.id, id)
+            self.assertIs(user, users[tenants.index(id)])
+        self.assertEqual(len(self.cache), 8)
+        self.assertIs(starkbank.user, global_user)
+
+    def test_invalid_auth_type(self):
+        """
+        Test failure with an invalid authentication type.
+        """
+        with self.assertRaises(ValueError):
+            self.cache.get('sandbox', '1', self.private_key, 'invalid')
+
+    @patch('starkbank.invoice.create')
+    def test_integrations_pass_their_own_user(self, mock_create):
+        """
+        Test that each integration sends its requests with its own user.
+        """
+        integrations = [
+            StarkbankIntegration(
+                environment='sandbox',
+                id=id,
+                private_key=self.private_key,
+                auth_type='project',
+                webhook_url='https://example.com/webhook',
+            )
+            for id in ('1', '2')
+        ]
+        for integration in integrations:
+            integration.connect()
+        self.addCleanup(integrations[0].connection_pool.uninstall_sdk)
+
+        for integration in integrations:
+            integration._issue_single_invoice()
+            self.assertIs(
+                mock_create.call_args.kwargs['user'], integration.user
+            )
+            self.assertEqual(integration.user.id, integration.authenticator.id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegration,
+    StarkbankIntegrationError,
+)
+from starkbank_webhook_test.webhook.dedup_store import DedupStore
+
+
+class TestDedupStore(unittest.TestCase):
+    """
+    Unit test case for the DedupStore class.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary database path.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'state/dedup.sqlite3')
+
+    def test_claim_only_once(self):
+        """
+        Test that a key is claimed by a single caller.
+        """
+        store = DedupStore(self.path)
+        self.addCleanup(store.close)
+
+        self.assertFalse(store.seen('event:1'))
+        self.assertTrue(store.claim('event:1'))
+        self.assertFalse(store.claim('event:1'))
+        self.assertFalse(store.seen('event:1'))
+        store.complete('event:1')
+        self.assertTrue(store.seen('event:1'))
+        self.assertFalse(store.claim('event:1'))
+
+    def test_claims_survive_restart(self):
+        """
+        Test that the claimed keys are kept after reopening the store.
+        """
+        store = DedupStore(self.path)
+        store.claim('invoice:1')
+        store.complete('invoice:1')
+        store.close()
+
+        store = DedupStore(self.path)
+        self.addCleanup(store.close)
+
+        self.assertTrue(store.seen('invoice:1'))
+        self.assertFalse(store.claim('invoice:1'))
+
+    def test_claims_are_shared_between_consumers(self):
+        """
+        Test that two consumers on the same database never claim the same key.
+        """
+        first = DedupStore(self.path)
+        second = DedupStore(self.path)
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+
+        self.assertTrue(first.claim('event:1'))
+        self.assertFalse(second.claim('event:1'))
+
+        # A key released by a consumer is claimed at once by the other
+        first.release('event:1')
+        self.assertTrue(second.claim('event:1'))
+
+    def test_release(self):
+        """
+        Test that a released key can be claimed again.
+        """
+        store = DedupStore(self.path)
+        self.addCleanup(store.close)
+
+        store.claim('event:1')
+        store.release('event:1')
+
+        self.assertTrue(store.claim('event:1'))
+
+    def test_abandoned_claims_expire(self):
+        """
+        Test that a claim left by a crashed consumer is claimed again.
+        """
+        store = DedupStore(self.path, claim_timeout=60)
+        self.addCleanup(store.close)
+        store.claim('event:1')
+        store.claim('event:2')
+        store.complete('event:2')
+
+        with patch('time.time', return_value=time.time() + 61):
+            self.assertTrue(store.claim('event:1'))
+            self.assertFalse(store.claim('event:2'))
+
+        self.assertEqual(len(store), 2)
+        with self.assertRaises(ValueError):
+            DedupStore(self.path, claim_timeout=0)
+
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._create_transfer'
+    )
+    def test_integration_skips_duplicated_payouts(self, mock_create_transfer):
+        """
+        Test that redelivered events and paid invoices transfer only once.
+        """
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        integration.enable_event_deduplication(path=self.path)
+        self.addCleanup(integration.disable_event_deduplication)
+
+        def paid_event(event_id):
+            event = Mock(id=event_id, subscription='invoice')
+            event.log.type = 'credited'
+            event.log.invoice.id = 'invoice-1'
+            event.log.invoice.status = 'paid'
+            event.log.invoice.amount = 1000
+            event.log.invoice.fee = 10
+            return event
+
+        integration.dispatch_event(paid_event('1'))
+        integration.dispatch_event(paid_event('1'))
+        integration.dispatch_event(paid_event('2'))
+
+        mock_create_transfer.assert_called_once_with(990, 'invoice-invoice-1')
+
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._create_transfer',
+        side_effect=StarkbankIntegrationError('Transfer error'),
+    )
+    def test_integration_retries_failed_payouts(self, mock_create_transfer):
+        """
+        Test that an event whose transfer failed is processed again.
+        """
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        integration.enable_event_deduplication(path=self.path)
+        self.addCleanup(integration.disable_event_deduplication)
+
+        event = Mock(id='1', subscription='invoice')
+        event.log.type = 'credited'
+        event.log.invoice.status = 'paid'
+        event.log.invoice.amount = 1000
+        event.log.invoice.fee = 10
+
+        for _ in range(2):
+            with self.assertRaises(StarkbankIntegrationError):
+                integration.dispatch_event(event)
+
+        self.assertEqual(mock_create_transfer.call_count, 2)
+
+    @patch('starkbank.transfer.create')
+    def test_integration_settles_batched_payouts(self, mock_create):
+        """
+        Test that the keys of a batched payout are settled with its transfer.
+        """
+        responses = iter([Exception('Internal error'), None])
+
+        def create_transfers(transfers, user):
+            error = next(responses)
+            if error is not None:
+                raise error
+            return transfers
+
+        mock_create.side_effect = create_transfers
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        integration.enable_event_deduplication(path=self.path)
+        self.addCleanup(integration.disable_event_deduplication)
+        integration.enable_transfer_batching(max_items=1, max_wait=60)
+        self.addCleanup(integration.disable_transfer_batching)
+        store = integration.dedup_store
+
+        event = Mock(id='1', subscription='invoice')
+        event.log.type = 'credited'
+        event.log.invoice.id = 'invoice-1'
+        event.log.invoice.status = 'paid'
+        event.log.invoice.amount = 1000
+        event.log.invoice.fee = 10
+
+        def wait_until(condition):
+            # The keys are settled by the callbacks of the transfer futures
+            deadline = time.monotonic() + 5
+            while not condition():
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+
+        failed = integration.dispatch_event(event).result()
+        self.assertIsNotNone(failed.exception(timeout=1))
+        wait_until(lambda: len(store) == 0)
+
+        created = integration.dispatch_event(event).result()
+        created.result(timeout=1)
+        wait_until(lambda: store.seen('event:1'))
+        self.assertTrue(store.seen('invoice:invoice-1'))
+        self.assertIsNone(integration.dispatch_event(event).result())
+        self.assertEqual(mock_create.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import starkbank
+from ellipticcurve import PrivateKey
+
+from starkbank_webhook_test.mock_api.server import MockStarkbankServer
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+from starkbank_webhook_test.webhook.catch_up import EventCatchUp, _today
+from starkbank_webhook_test.webhook.dispatcher import completed
+
+
+def event(event_id, is_delivered=False):
+    return SimpleNamespace(id=event_id, is_delivered=is_delivered)
+
+
+class FakeEvents:
+    """
+    Pages of events with an offset cursor, newest first.
+    """
+
+    def __init__(self, events, fail_at=None):
+        self.events = list(reversed(events))
+        self.fail_at = fail_at
+        self.calls = []
+
+    def page(self, cursor, limit, after):
+        self.calls.append((cursor, after))
+        offset = int(cursor or 0)
+        if offset == self.fail_at:
+            raise ConnectionError('API down')
+        end = offset + limit
+        return (
+            self.events[offset:end],
+            str(end) if end < len(self.events) else None,
+        )
+
+
+class TestEventCatchUp(unittest.TestCase):
+    """
+    Unit test case for the EventCatchUp class.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary state file path.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'state/catch_up.json')
+
+    def _state(self):
+        with open(self.path) as state_file:
+            return json.load(state_file)
+
+    def test_walk_dispatches_undelivered_events(self):
+        """
+        Test that the undelivered events are dispatched oldest first.
+        """
+        events = FakeEvents(
+            [
+                event(str(index), is_delivered=index % 3 == 0)
+                for index in range(10)
+            ]
+        )
+        dispatch = Mock(return_value=completed())
+        update_event = Mock()
+        catch_up = EventCatchUp(
+            events.page, update_event, dispatch, path=self.path, limit=4
+        )
+
+        totals = catch_up.run()
+
+        self.assertEqual(totals, {'dispatched': 6, 'skipped': 4, 'failed': 0})
+        dispatched = [call.args[0].id for call in dispatch.call_args_list]
+        self.assertEqual(sorted(dispatched, key=int), sorted(dispatched))
+        self.assertEqual(
+            sorted(call.args[0] for call in update_event.call_args_list),
+            sorted(dispatched),
+        )
+        state = self._state()
+        self.assertEqual(state['after'], _today().isoformat())
+        self.assertIsNone(state['cursor'])
+
+    def test_interrupted_walk_resumes_from_cursor(self):
+        """
+        Test that a walk interrupted by an error resumes from its last page.
+        """
+        events = FakeEvents(
+            [event(str(index)) for index in range(10)], fail_at=8
+        )
+        dispatch = Mock(return_value=completed())
+        catch_up = EventCatchUp(
+            events.page, Mock(), dispatch, path=self.path, limit=4
+        )
+
+        with self.assertRaises(ConnectionError):
+            catch_up.run()
+        self.assertEqual(self._state()['cursor'], '8')
+        after = self._state()['after']
+
+        events.fail_at = None
+        catch_up.run()
+
+        self.assertEqual(events.calls[-1], ('8', after))
+        self.assertEqual(dispatch.call_count, 10)
+        self.assertEqual(self._state()['after'], _today().isoformat())
+
+    def test_failed_events_keep_the_watermark(self):
+        """
+        Test that a failed event is left undelivered and walked again.
+        """
+        events = FakeEvents([event('1'), event('2')])
+        update_event = Mock()
+        catch_up = EventCatchUp(
+            events.page,
+            update_event,
+            Mock(side_effect=[ValueError('bad'), completed()]),
+            path=self.path,
+            lookback_days=3,
+        )
+        first_after = catch_up.load_state()['after']
+
+        totals = catch_up.run()
+
+        self.assertEqual(totals['failed'], 1)
+        update_event.assert_called_once_with('2')
+        self.assertEqual(self._state()['after'], first_after)
+
+    def test_concurrent_state_writes(self):
+        """
+        Test that the workers sharing a state path never clobber their writes.
+        """
+        catch_ups = [
+            EventCatchUp(Mock(), Mock(), Mock(), self.path) for _ in range(4)
+        ]
+        errors = []
+
+        def write(catch_up, worker):
+            try:
+                for cursor in range(50):
+                    catch_up.save_state({'cursor': f'{worker}:{cursor}'})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=write, args=(catch_up, worker))
+            for worker, catch_up in enumerate(catch_ups)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(self._state()['cursor'].endswith(':49'))
+        self.assertEqual(
+            os.listdir(os.path.dirname(self.path)), ['catch_up.json']
+        )
+
+    def test_invalid_parameters(self):
+        """
+        Test failure during initialization with invalid parameters.
+        """
+        for kwargs in (
+            {'limit': 0},
+            {'limit': 101},
+            {'workers': 0},
+            {'lookback_days': -1},
+        ):
+            with self.assertRaises(ValueError):
+                EventCatchUp(Mock(), Mock(), Mock(), self.path, **kwargs)
+        EventCatchUp(Mock(), Mock(), Mock(), self.path, lookback_days=0)
+
+    def test_integration_catch_up(self):
+        """
+        Test that the integration transfers the invoices paid while it was down.
+        """
+        server = MockStarkbankServer(payment_rate=0)
+        server.start()
+        self.addCleanup(server.stop)
+        pool = ConnectionPool(retries=0, base_url=server.url)
+        pool.install_sdk()
+        self.addCleanup(ConnectionPool.uninstall_sdk)
+        self.addCleanup(pool.close)
+        integration = StarkbankIntegration(
+            'sandbox',
+            '5656565656565656',
+            PrivateKey().toPem(),
+            'project',
+            'https://example.com/webhook',
+            connection_pool=pool,
+        )
+        integration.user = starkbank.Project(
+            environment='sandbox',
+            id='5656565656565656',
+            private_key=PrivateKey().toPem(),
+        )
+        invoice = {'amount': 1000, 'taxId': '012.345.678-90', 'name': 'Iron'}
+        for _ in range(2):
+            pool.post(
+                'https://sandbox.api.starkbank.com/v2/invoice',
+                json={'invoices': [invoice] * 15},
+            )
+        for invoice_id in list(server.invoices):
+            server._pay_invoice(invoice_id)
+        delivered = next(iter(server.events.values()))
+        delivered['isDelivered'] = True
+
+        totals = integration.catch_up_events(path=self.path, limit=10)
+
+        self.assertEqual(totals['dispatched'], 29)
+        self.assertEqual(totals['skipped'], 1)
+        self.assertEqual(len(server.transfers), 29)
+        self.assertTrue(
+            all(event['isDelivered'] for event in server.events.values())
+        )
+
+        totals = integration.catch_up_events(path=self.path, limit=10)
+
+        self.assertEqual(totals['dispatched'], 0)
+        self.assertEqual(len(server.transfers), 29)
+
+
+if __name__ == '__main__':
+    unittest.main()
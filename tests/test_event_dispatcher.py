@@ -0,0 +1,147 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+from starkbank_webhook_test.webhook.dispatcher import EventDispatcher
+
+
+def event(subscription, log_type, event_id='1'):
+    return SimpleNamespace(
+        id=event_id,
+        subscription=subscription,
+        log=SimpleNamespace(type=log_type, errors=[]),
+    )
+
+
+class TestEventDispatcher(unittest.TestCase):
+    """
+    Unit test case for the EventDispatcher class.
+    """
+
+    def setUp(self):
+        """
+        Set up a dispatcher closed at the end of each test.
+        """
+        self.dispatcher = EventDispatcher()
+        self.addCleanup(self.dispatcher.close)
+
+    def test_handlers_are_resolved_by_log_type(self):
+        """
+        Test the lookup by subscription and log type, then by subscription.
+        """
+        credited, other = Mock(), Mock()
+        self.dispatcher.register('invoice', credited, ['credited', 'paid'])
+        self.dispatcher.register('invoice', other)
+
+        self.assertIs(
+            self.dispatcher.resolve(event('invoice', 'credited')), credited
+        )
+        self.assertIs(
+            self.dispatcher.resolve(event('invoice', 'paid')), credited
+        )
+        self.assertIs(
+            self.dispatcher.resolve(event('invoice', 'created')), other
+        )
+        self.assertIsNone(self.dispatcher.resolve(event('deposit', 'created')))
+        self.assertEqual(self.dispatcher.subscriptions, ['invoice'])
+
+        self.dispatcher.unregister('invoice')
+        self.assertIsNone(self.dispatcher.resolve(event('invoice', 'created')))
+
+    def test_coroutine_handlers(self):
+        """
+        Test that coroutine handlers run to completion.
+        """
+
+        async def handler(event):
+            return event.id
+
+        for start in (False, True):
+            with self.subTest(start=start):
+                if start:
+                    self.dispatcher.start()
+                future = self.dispatcher.submit(
+                    handler, event('boleto', 'paid')
+                )
+                self.assertEqual(future.result(timeout=5), '1')
+
+    def test_subscriptions_run_on_separate_pools(self):
+        """
+        Test that a slow subscription does not delay the others.
+        """
+        release = threading.Event()
+        threads = {}
+
+        def slow_handler(event):
+            threads['transfer'] = threading.current_thread().name
+            release.wait(5)
+
+        def fast_handler(event):
+            threads['invoice'] = threading.current_thread().name
+
+        self.dispatcher.start(workers={'invoice': 2})
+        slow = self.dispatcher.submit(
+            slow_handler, event('transfer', 'success')
+        )
+        fast = self.dispatcher.submit(
+            fast_handler, event('invoice', 'credited')
+        )
+
+        fast.result(timeout=5)
+        self.assertFalse(slow.done())
+        release.set()
+        slow.result(timeout=5)
+
+        self.assertTrue(threads['invoice'].startswith('events_invoice'))
+        self.assertTrue(threads['transfer'].startswith('events_transfer'))
+
+    def test_inline_errors_are_raised(self):
+        """
+        Test that the handler errors are raised when not started.
+        """
+        with self.assertRaises(ValueError):
+            self.dispatcher.submit(
+                Mock(side_effect=ValueError('bad')), event('invoice', 'paid')
+            )
+
+        with self.assertRaises(ValueError):
+            self.dispatcher.start(workers={'invoice': 0})
+
+    @patch.object(StarkbankIntegration, '_process_transfer_event')
+    @patch.object(StarkbankIntegration, '_process_invoice_credit')
+    def test_integration_routes_events(self, mock_invoice, mock_transfer):
+        """
+        Test the routing of the integration and the release of failed events.
+        """
+        mock_invoice.side_effect = [ValueError('API down'), None]
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        integration.enable_event_deduplication(path=':memory:')
+        self.addCleanup(integration.disable_event_deduplication)
+        integration.enable_event_workers(workers={'invoice': 1})
+        self.addCleanup(integration.disable_event_workers)
+
+        credited = event('invoice', 'credited')
+        failed = integration.dispatch_event(credited)
+        self.assertIsInstance(failed.exception(timeout=5), ValueError)
+        integration.dispatch_event(credited).result(timeout=5)
+        integration.dispatch_event(event('transfer', 'failed', '2')).result(
+            timeout=5
+        )
+        unhandled = integration.dispatch_event(event('pix', 'created', '3'))
+
+        self.assertEqual(mock_invoice.call_count, 2)
+        mock_transfer.assert_called_once()
+        self.assertIsNone(unhandled.result())
+        self.assertFalse(integration.dedup_store.seen('event:3'))
+
+
+if __name__ == '__main__':
+    unittest.main()
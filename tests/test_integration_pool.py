@@ -0,0 +1,211 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from ellipticcurve.privateKey import PrivateKey
+
+from starkbank_webhook_test.settings import EngineSettings, SettingsError
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+from starkbank_webhook_test.tenants.pool import IntegrationPool, TenantConfig
+
+
+class TestIntegrationPool(unittest.TestCase):
+    """
+    Unit test case for the IntegrationPool class.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary private key file.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.private_key_path = os.path.join(self.directory, 'private.pem')
+        with open(self.private_key_path, 'w') as private_key_file:
+            private_key_file.write(PrivateKey().toPem())
+
+    def _tenant(self, name, **settings):
+        return TenantConfig(
+            name=name,
+            engine=EngineSettings(
+                id=name, webhook_url=f'https://example.com/{name}'
+            ),
+            private_key_path=self.private_key_path,
+            **settings,
+        )
+
+    def _pool(self, tenants, workers=1):
+        pool = IntegrationPool(tenants, workers=workers)
+        self.addCleanup(pool.stop)
+        return pool
+
+    def test_tenants_are_served_fairly(self):
+        """
+        Test that a tenant backlog does not delay the other tenants.
+        """
+        pool = self._pool(
+            [
+                self._tenant('busy', rate_limit=1000, burst=10),
+                self._tenant('quiet', rate_limit=1000, burst=10),
+            ]
+        )
+        order = []
+
+        def record(integration):
+            order.append(integration.authenticator.id)
+
+        futures = [pool.submit('busy', record) for _ in range(6)]
+        futures += [pool.submit('quiet', record) for _ in range(2)]
+        pool.start()
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertEqual(order[:4], ['busy', 'quiet', 'busy', 'quiet'])
+        self.assertEqual(pool.stats()['busy']['completed'], 6)
+
+    def test_rate_limit(self):
+        """
+        Test that the tasks of a tenant start at its rate limit.
+        """
+        pool = self._pool([self._tenant('limited', rate_limit=50)], workers=4)
+        start_times = []
+
+        pool.start()
+        futures = [
+            pool.submit(
+                'limited', lambda _: start_times.append(time.monotonic())
+            )
+            for _ in range(5)
+        ]
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertGreaterEqual(start_times[-1] - start_times[0], 0.07)
+
+    def test_max_in_flight(self):
+        """
+        Test that a tenant never runs more tasks than its limit at once.
+        """
+        pool = self._pool(
+            [
+                self._tenant(
+                    'tenant', rate_limit=1000, burst=8, max_in_flight=2
+                )
+            ],
+            workers=4,
+        )
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def task(_):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+        pool.start()
+        futures = [pool.submit('tenant', task) for _ in range(8)]
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertEqual(max(peak), 2)
+
+    def test_task_error(self):
+        """
+        Test that a failed task resolves its future with the error.
+        """
+        pool = self._pool([self._tenant('tenant')])
+
+        def fail(_):
+            raise ValueError('API down')
+
+        pool.start()
+        future = pool.submit('tenant', fail)
+
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
+        self.assertEqual(pool.stats()['tenant']['failed'], 1)
+        with self.assertRaises(ValueError):
+            pool.submit('unknown', fail)
+
+    @patch.object(StarkbankIntegration, 'connect')
+    @patch.object(StarkbankIntegration, 'issue_invoices_in_batches')
+    def test_run(self, mock_issue, mock_connect):
+        """
+        Test that each tenant issues a cycle of its load profile in batches.
+        """
+        pool = self._pool(
+            [
+                self._tenant(
+                    'single',
+                    params={
+                        'quantity_interval': (3, 3),
+                        'webhook_interval': 0,
+                    },
+                    rate_limit=1000,
+                ),
+                self._tenant(
+                    'batched',
+                    params={
+                        'load_profile': {'shape': 'step', 'steps': [[1, 5]]},
+                        'batch_size': 2,
+                        'webhook_interval': 0,
+                    },
+                    rate_limit=1000,
+                ),
+            ],
+            workers=2,
+        )
+
+        pool.run(duration=0.2)
+
+        self.assertEqual(mock_connect.call_count, 2)
+        self.assertCountEqual(
+            [call.args for call in mock_issue.call_args_list],
+            [(1, 1)] * 3 + [(2, 2), (2, 2), (1, 2)],
+        )
+        self.assertFalse(pool.running)
+
+        with self.assertRaises(SettingsError):
+            IntegrationPool(
+                [self._tenant('shop', params={'load_profile': {'shape': 'x'}})]
+            )
+
+    def test_from_file(self):
+        """
+        Test loading the tenants and rejecting invalid ones.
+        """
+        settings_file_path = os.path.join(self.directory, 'tenants.json')
+        tenant = {
+            'name': 'shop',
+            'engine': {'id': '1', 'webhook_url': 'https://example.com/shop'},
+            'private_key_path': self.private_key_path,
+            'rate_limit': 2,
+        }
+        with open(settings_file_path, 'w') as settings_file:
+            json.dump({'workers': 4, 'tenants': [tenant]}, settings_file)
+
+        pool = IntegrationPool.from_file(settings_file_path)
+
+        self.assertEqual(pool.tenants, ['shop'])
+        self.assertEqual(pool.workers, 4)
+
+        for invalid in ({'rate_limit': 0}, {'max_in_flight': 0}):
+            with self.subTest(invalid=invalid):
+                with self.assertRaises(SettingsError):
+                    TenantConfig.from_json(dict(tenant, **invalid))
+
+        with self.assertRaises(ValueError):
+            IntegrationPool([self._tenant('shop'), self._tenant('shop')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from starkbank_webhook_test.generators.invoice_data import (
+    FakerPool,
+    SyntheticCorpus,
+)
+from starkbank_webhook_test.starkbank_integration import (
+    INVOICE_RULE_KEYS,
+    StarkbankIntegration,
+)
+
+
+class TestFakerPool(unittest.TestCase):
+    """
+    Unit test case for the FakerPool and SyntheticCorpus classes.
+    """
+
+    def test_get_reuses_instance_per_worker(self):
+        """
+        Test that each worker builds its Faker instance only once.
+        """
+        pool = FakerPool()
+        sources = []
+
+        def worker():
+            sources.append(pool.get())
+            sources.append(pool.get())
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIs(sources[0], sources[1])
+        self.assertIs(sources[2], sources[3])
+        self.assertIsNot(sources[0], sources[2])
+
+    @patch('faker.Faker')
+    def test_get_builds_faker_lazily(self, mock_faker):
+        """
+        Test that no Faker instance is built before it is needed.
+        """
+        pool = FakerPool(seed=10)
+        mock_faker.assert_not_called()
+
+        pool.get()
+
+        mock_faker.assert_called_once_with('pt_BR')
+        mock_faker.return_value.seed_instance.assert_called_once_with(10)
+
+    def test_seeded_pool_is_reproducible(self):
+        """
+        Test that pools with the same seed generate the same values.
+        """
+        values = []
+        for _ in range(2):
+            fake = FakerPool(seed=7).get()
+            values.append([fake.cpf(), fake.name(), fake.word()])
+
+        self.assertEqual(values[0], values[1])
+
+    def test_seeded_random_is_reproducible(self):
+        """
+        Test that the worker Random instances follow the seed.
+        """
+        draws = []
+        for seed in (7, 7, 8):
+            random = FakerPool(seed=seed).random()
+            draws.append([random.random() for _ in range(3)])
+
+        self.assertEqual(draws[0], draws[1])
+        self.assertNotEqual(draws[0], draws[2])
+
+    def test_seeded_invoice_data_is_reproducible(self):
+        """
+        Test that the seed reproduces the invoice data of the integration.
+        """
+        generated = []
+        for _ in range(2):
+            integration = StarkbankIntegration(
+                environment='sandbox',
+                id='1234567890',
+                private_key='valid_private_key_content',
+                auth_type='project',
+                webhook_url='http://example.com/webhook',
+            )
+            integration.faker_pool = FakerPool(seed=42, corpus_size=50)
+            invoices = [
+                integration._generate_random_invoice_data() for _ in range(20)
+            ]
+            # The dates are relative to the current time
+            generated.append(
+                [
+                    {
+                        field: value
+                        for field, value in data.items()
+                        if field not in ('due', 'discounts', 'rules')
+                    }
+                    for data in invoices
+                ]
+            )
+
+        self.assertEqual(generated[0], generated[1])
+
+    def test_corpus_samples_from_pools(self):
+        """
+        Test that the corpus only returns precomputed values.
+        """
+        corpus = FakerPool(seed=3, corpus_size=50).get()
+
+        self.assertIsInstance(corpus, SyntheticCorpus)
+        self.assertEqual(len(corpus.cpfs), 50)
+        self.assertIn(corpus.cpf(), corpus.cpfs)
+        self.assertIn(corpus.name(), corpus.names)
+        self.assertIn(corpus.currency_code(), corpus.currency_codes)
+        words = corpus.words(nb=20)
+        self.assertEqual(len(words), 20)
+        self.assertTrue(set(words) <= set(corpus.word_pool))
+        self.assertTrue(1 <= corpus.random_int(1, 10) <= 10)
+
+    def test_corpus_invalid_size(self):
+        """
+        Test failure when building a corpus with an invalid size.
+        """
+        with self.assertRaises(ValueError):
+            SyntheticCorpus(FakerPool().get(), size=0)
+
+    def test_invoice_data_is_valid(self):
+        """
+        Test that the rules and discounts are accepted by the API.
+        """
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        integration.faker_pool = FakerPool(seed=42, corpus_size=50)
+        start = datetime.utcnow()
+
+        for _ in range(200):
+            data = integration._generate_random_invoice_data()
+            rule_keys = [rule.key for rule in data.get('rules', [])]
+            self.assertTrue(set(rule_keys) <= set(INVOICE_RULE_KEYS))
+            self.assertEqual(len(rule_keys), len(set(rule_keys)))
+            for discount in data.get('discounts', []):
+                self.assertLess(start, discount['due'])
+                self.assertLess(discount['due'], data['due'])
+
+
+if __name__ == '__main__':
+    unittest.main()
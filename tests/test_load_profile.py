@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from starkbank_webhook_test.generators.load_profile import (
+    LoadProfile,
+    ReplayProfile,
+    build_profile,
+)
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegration,
+    StarkbankIntegrationError,
+)
+
+
+class StopRun(Exception):
+    pass
+
+
+class TestLoadProfile(unittest.TestCase):
+    """
+    Unit test case for the load profiles.
+    """
+
+    def test_seeded_profiles_are_reproduced(self):
+        """
+        Test that a seed reproduces the quantities of every cycle.
+        """
+        for settings in (
+            None,
+            {'shape': 'sine', 'mean': 50, 'amplitude': 20, 'period': 10},
+        ):
+            with self.subTest(settings=settings):
+                settings = dict(settings or {}, jitter=0.2)
+                first = build_profile(settings, seed=42).quantities(50)
+                second = build_profile(settings, seed=42).quantities(50)
+                other = build_profile(settings, seed=7).quantities(50)
+
+                self.assertEqual(first, second)
+                self.assertNotEqual(first, other)
+                self.assertEqual(
+                    build_profile(settings, seed=42).quantity(30), first[30]
+                )
+
+    def test_shapes(self):
+        """
+        Test the quantities of each shape.
+        """
+        cases = [
+            ({'minimum': 3, 'maximum': 3}, [3, 3, 3]),
+            (
+                {'shape': 'ramp', 'start': 10, 'end': 0, 'cycles': 2},
+                [10, 5, 0],
+            ),
+            ({'shape': 'step', 'steps': [[1, 4], [2, 8]]}, [4, 8, 8]),
+            ({'shape': 'spike', 'base': 1, 'peak': 9, 'at': 2}, [1, 1, 9]),
+            (
+                {'shape': 'sine', 'mean': 4, 'amplitude': 4, 'period': 2},
+                [8, 0, 8],
+            ),
+            ({'shape': 'replay', 'counts': [5, 6], 'loop': True}, [5, 6, 5]),
+        ]
+        for settings, quantities in cases:
+            with self.subTest(settings=settings):
+                self.assertEqual(
+                    build_profile(settings).quantities(3), quantities
+                )
+
+    def test_profile_requires_a_level(self):
+        """
+        Test that a profile without a level cannot be built.
+        """
+        with self.assertRaises(TypeError):
+            LoadProfile()
+
+    def test_replay_from_service_log(self):
+        """
+        Test that the invoice service log file is replayed as a trace.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'service.log')
+        with open(path, 'w') as log_file:
+            log_file.write(
+                'INFO Issuing 12 random invoices.\n'
+                'INFO Invoice issued. Invoice ID: 5656565656565656\n'
+                '7\n'
+                'INFO Issuing 0 random invoices.\n'
+            )
+
+        profile = build_profile({'shape': 'replay', 'trace': path})
+
+        self.assertIsInstance(profile, ReplayProfile)
+        self.assertEqual(profile.quantities(4), [12, 7, 0, 0])
+
+    def test_invalid_profiles(self):
+        """
+        Test failure when building invalid profiles.
+        """
+        for settings in (
+            {'shape': 'square'},
+            {'shape': 'ramp', 'start': 0},
+            {'shape': 'ramp', 'start': 0, 'end': 1, 'cycles': 0},
+            {'shape': 'step', 'steps': []},
+            {'shape': 'spike', 'base': 1, 'peak': 2, 'length': 3, 'every': 2},
+            {'shape': 'replay', 'counts': [1, -1]},
+            {'minimum': 5, 'maximum': 1},
+            {'jitter': 2},
+        ):
+            with self.subTest(settings=settings):
+                with self.assertRaises(ValueError):
+                    build_profile(settings)
+
+    @patch('starkbank_webhook_test.starkbank_integration.Scheduler')
+    def test_integration_issues_profile_quantities(self, mock_scheduler):
+        """
+        Test that each cycle issues the quantity of the load profile.
+        """
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        params = {
+            'repetition_time': 1,
+            'duration_time': 1,
+            'batch_size': 10,
+            'load_profile': {'shape': 'step', 'steps': [[2, 3], [1, 5]]},
+        }
+        issued = []
+
+        def issue_invoices(num_invoices, batch_size):
+            issued.append(num_invoices)
+            if len(issued) == 4:
+                raise StopRun()
+
+        with patch.object(
+            integration,
+            'issue_invoices_in_batches',
+            side_effect=issue_invoices,
+        ):
+            with self.assertRaises(StopRun):
+                integration.issue_random_invoices(params)
+
+        self.assertEqual(issued, [3, 3, 5, 5])
+
+        params['load_profile'] = {'shape': 'spike'}
+        with self.assertRaises(StarkbankIntegrationError):
+            integration.issue_random_invoices(params)
+
+
+if __name__ == '__main__':
+    unittest.main()
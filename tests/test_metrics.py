@@ -0,0 +1,226 @@
+import unittest
+from unittest.mock import Mock
+
+import requests
+from starkbank.error import InternalServerError, InvalidSignatureError
+
+from starkbank_webhook_test.metrics.exporter import (
+    MetricsDumper,
+    MetricsServer,
+    start_exporters,
+)
+from starkbank_webhook_test.metrics.histogram import LatencyHistogram
+from starkbank_webhook_test.metrics.registry import (
+    MetricsRegistry,
+    classify_outcome,
+    timed_with,
+)
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegrationError,
+)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """
+    Unit test case for the LatencyHistogram class.
+    """
+
+    def test_percentiles_within_precision(self):
+        """
+        Test that the percentiles keep two significant figures.
+        """
+        histogram = LatencyHistogram(highest=60, significant_figures=2)
+        for microseconds in range(1, 100001):
+            histogram.record(microseconds / 1e6)
+
+        for percentile, expected in ((50, 0.05), (99, 0.099), (99.9, 0.0999)):
+            self.assertAlmostEqual(
+                histogram.percentile(percentile),
+                expected,
+                delta=expected * 0.01,
+            )
+        self.assertEqual(histogram.count, 100000)
+        self.assertEqual(histogram.max, 0.1)
+
+    def test_values_above_highest_are_clamped(self):
+        """
+        Test that values above the highest trackable value are kept.
+        """
+        histogram = LatencyHistogram(highest=1)
+
+        histogram.record(30)
+
+        self.assertLessEqual(histogram.percentile(100), 30)
+        self.assertEqual(histogram.count, 1)
+
+    def test_merge_and_reset(self):
+        """
+        Test merging two histograms and resetting one.
+        """
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.001)
+        second.record(0.5)
+
+        first.merge(second)
+
+        self.assertEqual(first.count, 2)
+        self.assertEqual(first.min, 0.001)
+        self.assertEqual(first.max, 0.5)
+
+        first.reset()
+
+        self.assertEqual(first.count, 0)
+        self.assertEqual(first.percentile(99), 0.0)
+
+    def test_invalid_significant_figures(self):
+        """
+        Test failure during initialization with an invalid precision.
+        """
+        with self.assertRaises(ValueError):
+            LatencyHistogram(significant_figures=0)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """
+    Unit test case for the MetricsRegistry class and the timed_with decorator.
+    """
+
+    def setUp(self):
+        """
+        Set up an empty registry.
+        """
+        self.registry = MetricsRegistry()
+
+    def _wrapped_error(self, error):
+        try:
+            try:
+                raise error
+            except Exception as e:
+                raise StarkbankIntegrationError(f'Wrapped: {e}')
+        except StarkbankIntegrationError as wrapped:
+            return wrapped
+
+    def test_classify_outcome(self):
+        """
+        Test that the outcome is found in the chain of wrapped errors.
+        """
+        self.assertEqual(classify_outcome(None), 'success')
+        self.assertEqual(
+            classify_outcome(
+                self._wrapped_error(InvalidSignatureError('bad'))
+            ),
+            'signature_error',
+        )
+        self.assertEqual(
+            classify_outcome(self._wrapped_error(InternalServerError())),
+            'api_error',
+        )
+        self.assertEqual(
+            classify_outcome(self._wrapped_error(ValueError('bad'))),
+            'error',
+        )
+
+    def test_timed_with(self):
+        """
+        Test that the decorated calls are recorded per outcome.
+        """
+
+        @timed_with(self.registry)
+        def process(fail):
+            if fail:
+                raise self._wrapped_error(InternalServerError())
+            return 'done'
+
+        self.assertEqual(process(False), 'done')
+        with self.assertRaises(StarkbankIntegrationError):
+            process(True)
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot[('process', 'success')]['count'], 1)
+        self.assertEqual(snapshot[('process', 'api_error')]['count'], 1)
+
+    def test_render_prometheus(self):
+        """
+        Test the Prometheus text of the histograms and counters.
+        """
+        self.registry.observe('connect', 'success', 0.25)
+        self.registry.increment('events_total', outcome='duplicated')
+
+        text = self.registry.render_prometheus()
+
+        self.assertIn(
+            '# TYPE starkbank_operation_latency_seconds summary', text
+        )
+        self.assertIn(
+            'starkbank_operation_latency_seconds{operation="connect",'
+            'outcome="success",quantile="0.99"} 0.25',
+            text,
+        )
+        self.assertIn(
+            'starkbank_operation_calls_total{operation="connect",'
+            'outcome="success"} 1',
+            text,
+        )
+        self.assertIn('starkbank_events_total{outcome="duplicated"} 1', text)
+
+
+class TestMetricsExporters(unittest.TestCase):
+    """
+    Unit test case for the MetricsServer and MetricsDumper classes.
+    """
+
+    def setUp(self):
+        """
+        Set up a registry with a recorded call.
+        """
+        self.registry = MetricsRegistry()
+        self.registry.observe('listen_webhook_events', 'success', 0.01)
+
+    def test_metrics_server(self):
+        """
+        Test scraping the metrics endpoint.
+        """
+        server = MetricsServer(self.registry, host='127.0.0.1', port=0)
+        server.start()
+        self.addCleanup(server.stop)
+
+        url = f'http://127.0.0.1:{server.port}'
+        response = requests.get(f'{url}/metrics', timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('operation="listen_webhook_events"', response.text)
+        self.assertEqual(requests.get(url, timeout=5).status_code, 404)
+
+    def test_metrics_dumper(self):
+        """
+        Test that stopping the dumper writes a last dump.
+        """
+        logger = Mock()
+        dumper = MetricsDumper(self.registry, logger, interval=60)
+        dumper.start()
+
+        dumper.stop()
+
+        message = logger.info.call_args.args[0]
+        self.assertIn('Operation: listen_webhook_events', message)
+        self.assertIn('p99.9: 10.0ms', message)
+
+    def test_start_exporters(self):
+        """
+        Test that only the exporters in the settings are started.
+        """
+        self.assertEqual(start_exporters(self.registry, {}), [])
+
+        exporters = start_exporters(
+            self.registry,
+            {'host': '127.0.0.1', 'port': 0, 'dump_interval': 60},
+        )
+        for exporter in exporters:
+            self.addCleanup(exporter.stop)
+
+        self.assertIsInstance(exporters[0], MetricsServer)
+        self.assertIsInstance(exporters[1], MetricsDumper)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import json
+import time
+import unittest
+
+import starkbank
+from ellipticcurve import PrivateKey
+from starkbank import Invoice
+
+from starkbank_webhook_test.mock_api.server import MockStarkbankServer
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+
+
+class TestMockStarkbankServer(unittest.TestCase):
+    """
+    Unit test case for the MockStarkbankServer class.
+    """
+
+    def setUp(self):
+        """
+        Point a connection pool at a local mock server.
+        """
+        self.server = MockStarkbankServer(seed=7)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.pool = ConnectionPool(retries=0, base_url=self.server.url)
+        self.addCleanup(self.pool.close)
+        self.user = starkbank.Project(
+            environment='sandbox',
+            id='5656565656565656',
+            private_key=PrivateKey().toPem(),
+        )
+
+    def _invoice(self, amount=1000):
+        return {'amount': amount, 'taxId': '012.345.678-90', 'name': 'Iron'}
+
+    def _post(self, path, payload):
+        return self.pool.post(
+            'https://sandbox.api.starkbank.com/v2' + path, json=payload
+        )
+
+    def test_pool_rewrites_only_starkbank_urls(self):
+        """
+        Test that the pool redirects the Stark Bank hosts to the base URL.
+        """
+        self.assertEqual(
+            self.pool._resolve('https://api.starkbank.com/v2/invoice'),
+            f'{self.server.url}/v2/invoice',
+        )
+        self.assertEqual(
+            self.pool._resolve('https://example.com/webhook'),
+            'https://example.com/webhook',
+        )
+
+    def test_sdk_creates_invoices_and_events(self):
+        """
+        Test the SDK creating invoices paid by the mock server.
+        """
+        self.pool.install_sdk()
+        self.addCleanup(ConnectionPool.uninstall_sdk)
+
+        invoices = starkbank.invoice.create(
+            [Invoice(amount=1000, tax_id='012.345.678-90', name='Iron')],
+            user=self.user,
+        )
+
+        self.assertEqual(invoices[0].status, 'created')
+        self.assertIn(invoices[0].id, self.server.invoices)
+
+        for _ in range(100):
+            if self.server.events:
+                break
+            time.sleep(0.01)
+
+        events = list(starkbank.event.query(user=self.user))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].log.invoice.id, invoices[0].id)
+        self.assertEqual(events[0].log.invoice.status, 'paid')
+
+    def test_signed_events_are_verified_by_the_integration(self):
+        """
+        Test that the integration verifies an event signed by the mock server.
+        """
+        self.pool.install_sdk()
+        self.addCleanup(ConnectionPool.uninstall_sdk)
+        integration = StarkbankIntegration(
+            'sandbox',
+            '5656565656565656',
+            PrivateKey().toPem(),
+            'project',
+            'https://example.com/webhook',
+            connection_pool=self.pool,
+        )
+        integration.user = self.user
+        self.addCleanup(integration.disable_signature_cache)
+        self.server.payment_rate = 0
+
+        self._post('/invoice', {'invoices': [self._invoice()]})
+        event = self.server._pay_invoice(next(iter(self.server.invoices)))
+        content = json.dumps({'event': event})
+
+        integration.enable_signature_cache()
+        parsed = integration.parse_event(content, self.server.sign(content))
+
+        self.assertEqual(parsed.id, event['id'])
+        self.assertEqual(parsed.log.invoice.status, 'paid')
+
+    def test_invalid_creation(self):
+        """
+        Test that invoices missing required fields are rejected.
+        """
+        response = self._post('/invoice', {'invoices': [{'amount': 10}]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()['errors'][0]['code'], 'invalidInvoice'
+        )
+
+    def test_throttling(self):
+        """
+        Test that the requests above the rate limit are answered with 429.
+        """
+        self.server.rate_limit = 1
+        self.server.burst = 2
+        self.server._tokens = 2
+
+        statuses = [
+            self._post('/transfer', {'transfers': []}).status_code
+            for _ in range(3)
+        ]
+
+        self.assertEqual(statuses[2], 429)
+        self.assertEqual(self.server.stats['throttled'], 1)
+
+    def test_error_rate(self):
+        """
+        Test that every request fails with an error rate of 1.
+        """
+        self.server.error_rate = 1.0
+
+        response = self.pool.get('https://api.starkbank.com/v2/public-key')
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.server.stats['failed'], 1)
+
+    def test_event_delivery_flag(self):
+        """
+        Test that events can be marked as delivered and filtered.
+        """
+        self.server.payment_rate = 0
+        self._post('/invoice', {'invoices': [self._invoice()]})
+        event = self.server._pay_invoice(next(iter(self.server.invoices)))
+
+        self.pool.patch(
+            f'https://api.starkbank.com/v2/event/{event["id"]}',
+            json={'isDelivered': True},
+        )
+        response = self.pool.get(
+            'https://api.starkbank.com/v2/event?isDelivered=false'
+        )
+
+        self.assertEqual(response.json()['events'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
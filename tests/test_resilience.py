@@ -0,0 +1,213 @@
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+from starkbank.error import InputErrors, InternalServerError, UnknownError
+
+from starkbank_webhook_test.network.resilience import (
+    Backoff,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    classify_error,
+)
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegration,
+    StarkbankIntegrationError,
+)
+
+# The UnknownError raised by the SDK for a 429 response
+TOO_MANY_REQUESTS = (
+    b'{"errors": [{"code": "tooManyRequests", '
+    b'"message": "Rate limit exceeded"}]}'
+)
+
+
+class FakeClock:
+    """
+    A monotonic clock that only advances when told to.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestResilience(unittest.TestCase):
+    """
+    Unit test case for the retry policy and the circuit breaker.
+    """
+
+    def setUp(self):
+        """
+        Replace the time module used by the resilience layer with a fake clock.
+        """
+        self.clock = FakeClock()
+        patcher = patch(
+            'starkbank_webhook_test.network.resilience.time', self.clock
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _wrapped(self, error):
+        try:
+            try:
+                raise error
+            except Exception as e:
+                raise StarkbankIntegrationError(f'Wrapped: {e}')
+        except StarkbankIntegrationError as wrapped:
+            return wrapped
+
+    def test_classify_error(self):
+        """
+        Test the classification of the wrapped Stark Bank and HTTP errors.
+        """
+        response = requests.Response()
+        response.status_code = 429
+
+        cases = [
+            (UnknownError(TOO_MANY_REQUESTS), 'throttled'),
+            (requests.exceptions.HTTPError(response=response), 'throttled'),
+            (InternalServerError(), 'transient'),
+            (UnknownError(b'<html>502 Bad Gateway</html>'), 'transient'),
+            (UnknownError('ConnectTimeout: timed out'), 'transient'),
+            (requests.exceptions.ConnectTimeout(), 'transient'),
+            (UnknownError('ReadTimeout: None'), 'ambiguous'),
+            (requests.exceptions.ReadTimeout(), 'ambiguous'),
+            (requests.exceptions.ConnectionError(), 'ambiguous'),
+            (
+                InputErrors([dict(code='invalidAmount', message='')]),
+                'permanent',
+            ),
+            (ValueError('bad'), 'permanent'),
+        ]
+        for error, kind in cases:
+            with self.subTest(error=error):
+                self.assertEqual(classify_error(self._wrapped(error)), kind)
+
+    def test_backoff_is_jittered_and_capped(self):
+        """
+        Test that the delays grow exponentially up to the maximum delay.
+        """
+        backoff = Backoff(base_delay=1, max_delay=8, seed=42)
+
+        delays = [backoff.delay(attempt) for attempt in range(1, 50)]
+
+        self.assertTrue(all(0 <= delay <= 8 for delay in delays))
+        self.assertLessEqual(backoff.delay(1), 1)
+        self.assertGreater(len(set(delays)), 40)
+        self.assertEqual(Backoff(seed=1).delay(3), Backoff(seed=1).delay(3))
+
+    def test_retry_transient_errors(self):
+        """
+        Test that transient errors are retried with a backoff.
+        """
+        function = Mock(side_effect=[InternalServerError(), 'created'])
+        policy = RetryPolicy(max_attempts=3, backoff=Backoff(seed=1))
+
+        self.assertEqual(policy.call(function), 'created')
+        self.assertEqual(function.call_count, 2)
+        self.assertEqual(len(self.clock.sleeps), 1)
+
+    def test_permanent_errors_are_not_retried(self):
+        """
+        Test that permanent and non-retried errors are raised at once.
+        """
+        function = Mock(
+            side_effect=InputErrors([dict(code='invalidAmount', message='')])
+        )
+        with self.assertRaises(InputErrors):
+            RetryPolicy(max_attempts=3).call(function)
+        self.assertEqual(function.call_count, 1)
+
+        function = Mock(side_effect=InternalServerError())
+        with self.assertRaises(InternalServerError):
+            RetryPolicy(max_attempts=3, retry_on=('throttled',)).call(function)
+        self.assertEqual(function.call_count, 1)
+
+    def test_circuit_breaker(self):
+        """
+        Test that the circuit opens, sheds load and closes after a trial call.
+        """
+        breaker = CircuitBreaker(window=4, minimum_calls=4, reset_timeout=30)
+        policy = RetryPolicy(max_attempts=1, breaker=breaker)
+        failing = Mock(side_effect=UnknownError(TOO_MANY_REQUESTS))
+
+        for _ in range(4):
+            with self.assertRaises(UnknownError):
+                policy.call(failing)
+
+        self.assertEqual(breaker.state, 'open')
+        self.clock.now += 10
+        with self.assertRaises(CircuitOpenError) as context:
+            policy.call(failing)
+        self.assertEqual(context.exception.retry_after, 20)
+        self.assertEqual(failing.call_count, 4)
+
+        self.clock.now += 20
+        self.assertEqual(policy.call(Mock(return_value='ok')), 'ok')
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_half_open_failure_reopens(self):
+        """
+        Test that a failed trial call opens the circuit again.
+        """
+        breaker = CircuitBreaker(window=2, minimum_calls=1, reset_timeout=10)
+        breaker.record(False)
+        self.clock.now += 10
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record(False)
+
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+
+    def test_integration_policies(self):
+        """
+        Test that transfers are only retried when throttled, and that the
+        policies replace the retries of the connection pool.
+        """
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        integration.enable_resilience(max_attempts=3, minimum_calls=10)
+        self.assertEqual(integration.connection_pool.retries, 0)
+
+        for error in (
+            InternalServerError(),
+            UnknownError('ReadTimeout: None'),
+            UnknownError(b'<html>504 Gateway Timeout</html>'),
+        ):
+            with patch(
+                'starkbank.transfer.create', side_effect=error
+            ) as mock_create:
+                with self.assertRaises(StarkbankIntegrationError):
+                    integration._create_transfer(990)
+            self.assertEqual(mock_create.call_count, 1)
+
+        with patch(
+            'starkbank.transfer.create',
+            side_effect=[UnknownError(TOO_MANY_REQUESTS), [Mock()]],
+        ) as mock_create:
+            self.assertTrue(integration._create_transfer(990))
+        self.assertEqual(mock_create.call_count, 2)
+
+        integration.disable_resilience()
+        self.assertEqual(integration.retry_policies, {})
+        self.assertEqual(integration.connection_pool.retries, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import patch
+
+from starkbank_webhook_test.scheduling.scheduler import Scheduler
+
+
+class FakeClock:
+    """
+    A monotonic clock that only advances when told to.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestScheduler(unittest.TestCase):
+    """
+    Unit test case for the Scheduler class.
+    """
+
+    def setUp(self):
+        """
+        Replace the time module used by the scheduler with a fake clock.
+        """
+        self.clock = FakeClock()
+        patcher = patch(
+            'starkbank_webhook_test.scheduling.scheduler.time', self.clock
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_init_invalid_parameters(self):
+        """
+        Test failure during initialization with invalid parameters.
+        """
+        with self.assertRaises(ValueError):
+            Scheduler(rate=0)
+        with self.assertRaises(ValueError):
+            Scheduler(rate=1, mode='invalid')
+        with self.assertRaises(ValueError):
+            Scheduler(rate=1, mode='token_bucket', burst=0)
+
+    def test_deadline_discounts_work_time(self):
+        """
+        Test that the time spent between ticks is discounted from the wait.
+        """
+        scheduler = Scheduler(rate=2)
+        release_times = []
+
+        for _ in range(4):
+            scheduler.wait()
+            release_times.append(self.clock.now)
+            # Simulate a request taking 0.3s
+            self.clock.now += 0.3
+
+        self.assertEqual(release_times, [0.0, 0.5, 1.0, 1.5])
+        self.assertEqual(scheduler.lag, 0.0)
+
+    def test_deadline_reports_lag(self):
+        """
+        Test that a slow caller is reported as behind schedule.
+        """
+        scheduler = Scheduler(rate=10)
+        scheduler.wait()
+        self.clock.now += 0.35
+
+        lag = scheduler.wait()
+
+        self.assertAlmostEqual(lag, 0.25)
+        self.assertAlmostEqual(scheduler.lag, 0.25)
+
+    def test_set_rate_moves_next_tick(self):
+        """
+        Test that a new rate applies from the last released tick.
+        """
+        scheduler = Scheduler(rate=1)
+        scheduler.wait()
+
+        scheduler.set_rate(4)
+        scheduler.wait()
+        scheduler.wait()
+
+        self.assertEqual(self.clock.now, 0.5)
+        self.assertEqual(scheduler.interval, 0.25)
+        with self.assertRaises(ValueError):
+            scheduler.set_rate(0)
+
+    def test_try_tick_does_not_block(self):
+        """
+        Test that try_tick only releases the ticks already due.
+        """
+        scheduler = Scheduler(rate=2, mode='token_bucket', burst=2)
+
+        self.assertTrue(scheduler.try_tick())
+        self.assertTrue(scheduler.try_tick())
+        self.assertFalse(scheduler.try_tick())
+        self.assertEqual(scheduler.delay(), 0.5)
+
+        self.clock.now += 0.5
+
+        self.assertEqual(scheduler.delay(), 0.0)
+        self.assertTrue(scheduler.try_tick())
+        self.assertEqual(scheduler.ticks, 3)
+        self.assertEqual(self.clock.now, 0.5)
+
+    def test_token_bucket_allows_burst(self):
+        """
+        Test that the token bucket releases a burst and then paces ticks.
+        """
+        scheduler = Scheduler(rate=1, mode='token_bucket', burst=3)
+        release_times = []
+
+        for _ in range(5):
+            scheduler.wait()
+            release_times.append(self.clock.now)
+
+        self.assertEqual(release_times, [0.0, 0.0, 0.0, 1.0, 2.0])
+
+    def test_poisson_is_reproducible_with_seed(self):
+        """
+        Test that the poisson mode keeps the average rate and honors the seed.
+        """
+        schedules = []
+        for _ in range(2):
+            self.clock.now = 0.0
+            scheduler = Scheduler(rate=100, mode='poisson', seed=42)
+            for _ in range(1000):
+                scheduler.wait()
+            schedules.append(self.clock.now)
+
+        self.assertEqual(schedules[0], schedules[1])
+        self.assertAlmostEqual(schedules[0], 10.0, delta=1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import json
+import os
+import tempfile
+import unittest
+
+from starkbank_webhook_test.settings import (
+    ServiceSettings,
+    SettingsError,
+    SettingsStore,
+)
+
+SETTINGS = {
+    'workers': 2,
+    'engine': {
+        'environment': 'sandbox',
+        'id': '1234567890',
+        'auth_type': 'project',
+        'webhook_url': 'https://example.com/webhook',
+        'connection_pool': {'pool_size': 4},
+    },
+    'params': {
+        'quantity_interval': [8, 12],
+        'repetition_time': 180,
+        'duration_time': 24,
+        'pacing': 'deadline',
+        'transfer_batch': {'max_size': 50},
+    },
+}
+
+
+class TestSettings(unittest.TestCase):
+    """
+    Unit test case for the ServiceSettings and SettingsStore classes.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary settings file and an empty store.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_file_path = os.path.join(directory.name, 'settings.json')
+        self.private_key_path = os.path.join(directory.name, 'private.pem')
+        self._write(SETTINGS)
+        with open(self.private_key_path, 'w') as private_key_file:
+            private_key_file.write('private key')
+        self.store = SettingsStore()
+
+    def _write(self, content, modified=None):
+        with open(self.settings_file_path, 'w') as settings_file:
+            json.dump(content, settings_file)
+        if modified is not None:
+            os.utime(self.settings_file_path, ns=(modified, modified))
+
+    def _with_params(self, **params):
+        return dict(SETTINGS, params=dict(SETTINGS['params'], **params))
+
+    def test_from_file(self):
+        """
+        Test that the settings file is parsed into read-only settings.
+        """
+        settings = ServiceSettings.from_file(self.settings_file_path)
+
+        self.assertEqual(settings.workers, 2)
+        self.assertEqual(settings.engine.id, '1234567890')
+        self.assertEqual(settings.engine.connection_pool['pool_size'], 4)
+        self.assertEqual(settings.params['quantity_interval'], (8, 12))
+        with self.assertRaises(TypeError):
+            settings.params['repetition_time'] = 1
+        with self.assertRaises(TypeError):
+            settings.params['transfer_batch']['max_size'] = 1
+
+    def test_invalid_settings(self):
+        """
+        Test failure with invalid values in the settings file.
+        """
+        invalid_settings = [
+            self._with_params(quantity_interval=[12, 8]),
+            self._with_params(quantity_interval=[8]),
+            self._with_params(repetition_time=0),
+            self._with_params(pacing='invalid'),
+            self._with_params(batch_size=-1),
+            self._with_params(receiver=8080),
+            dict(SETTINGS, workers=-1),
+            dict(SETTINGS, engine={'environment': 'staging'}),
+            dict(SETTINGS, engine={'token': 'secret'}),
+        ]
+        for content in invalid_settings:
+            self._write(content)
+            with self.subTest(content=content):
+                with self.assertRaises(SettingsError):
+                    ServiceSettings.from_file(self.settings_file_path)
+
+    def test_load_is_cached(self):
+        """
+        Test that each settings file is only read once.
+        """
+        settings = self.store.load(self.settings_file_path)
+        self._write(self._with_params(repetition_time=60))
+
+        self.assertIs(self.store.load(self.settings_file_path), settings)
+
+    def test_reload_after_change(self):
+        """
+        Test that the settings are read again when the file changes.
+        """
+        settings = self.store.load(self.settings_file_path)
+
+        self.assertIs(self.store.reload(self.settings_file_path), settings)
+
+        self._write(
+            self._with_params(repetition_time=60),
+            modified=settings.modified + 1,
+        )
+        reloaded = self.store.reload(self.settings_file_path)
+
+        self.assertEqual(reloaded.params['repetition_time'], 60)
+        self.assertIs(self.store.load(self.settings_file_path), reloaded)
+
+    def test_reload_keeps_valid_settings(self):
+        """
+        Test that an invalid change keeps the previous settings.
+        """
+        settings = self.store.load(self.settings_file_path)
+
+        self._write(
+            self._with_params(repetition_time=-1),
+            modified=settings.modified + 1,
+        )
+
+        with self.assertLogs('settings', level='ERROR'):
+            reloaded = self.store.reload(self.settings_file_path)
+        self.assertIs(reloaded, settings)
+
+    def test_private_key_is_cached(self):
+        """
+        Test that the private key file is only read once.
+        """
+        self.assertEqual(
+            self.store.private_key(self.private_key_path), 'private key'
+        )
+        os.remove(self.private_key_path)
+
+        self.assertEqual(
+            self.store.private_key(self.private_key_path), 'private key'
+        )
+
+        self.store.clear()
+        with self.assertRaises(FileNotFoundError):
+            self.store.private_key(self.private_key_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
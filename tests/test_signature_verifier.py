@@ -0,0 +1,181 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from ellipticcurve import Ecdsa, PrivateKey
+from starkbank.error import InvalidSignatureError
+
+from starkbank_webhook_test.auth import signature_verifier
+from starkbank_webhook_test.auth.signature_verifier import SignatureVerifier
+
+
+class TestSignatureVerifier(unittest.TestCase):
+    """
+    Unit test case for the SignatureVerifier class.
+    """
+
+    def setUp(self):
+        """
+        Set up a local key pair playing the Stark Bank key.
+        """
+        self.private_key = PrivateKey()
+        self.public_key_pem = self.private_key.publicKey().toPem()
+        self.verifier = SignatureVerifier(key_ttl=3600)
+        patcher = patch.object(
+            self.verifier,
+            '_fetch_public_key',
+            side_effect=lambda: self.public_key_pem,
+        )
+        self.mock_fetch_public_key = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.verifier.close)
+
+    def _signed_event(self, event_id, private_key=None):
+        content = json.dumps(
+            {
+                'event': {
+                    'id': event_id,
+                    'subscription': 'invoice',
+                    'isDelivered': False,
+                    'created': '2023-12-08T12:00:00.000000+00:00',
+                    'log': {
+                        'id': f'log-{event_id}',
+                        'type': 'credited',
+                        'errors': [],
+                        'created': '2023-12-08T12:00:00.000000+00:00',
+                        'invoice': {
+                            'id': f'invoice-{event_id}',
+                            'amount': 1000,
+                            'fee': 10,
+                            'status': 'paid',
+                            'taxId': '012.345.678-90',
+                            'name': 'John Doe',
+                        },
+                    },
+                }
+            }
+        )
+        signature = Ecdsa.sign(content, private_key or self.private_key)
+        return content, signature.toBase64()
+
+    def test_parse_success(self):
+        """
+        Test that a valid event is verified and parsed.
+        """
+        content, signature = self._signed_event('1')
+
+        event = self.verifier.parse(content, signature)
+
+        self.assertEqual(event.id, '1')
+        self.assertEqual(event.subscription, 'invoice')
+
+    def test_parse_invalid_signature(self):
+        """
+        Test failure when the signature does not match the content.
+        """
+        content, _ = self._signed_event('1')
+        _, signature = self._signed_event('2')
+
+        with self.assertRaises(InvalidSignatureError):
+            self.verifier.parse(content, signature)
+        with self.assertRaises(InvalidSignatureError):
+            self.verifier.parse(content, 'not a signature')
+
+    @patch('starkbank_webhook_test.auth.signature_verifier.Ecdsa.verify')
+    def test_parse_memoizes_redelivered_events(self, mock_verify):
+        """
+        Test that a redelivered event skips the ECDSA verification.
+        """
+        mock_verify.return_value = True
+        content, signature = self._signed_event('1')
+
+        first = self.verifier.parse(content, signature)
+        second = self.verifier.parse(content, signature)
+
+        self.assertIs(first, second)
+        mock_verify.assert_called_once()
+
+    def test_public_key_is_cached_and_refreshed(self):
+        """
+        Test that the key is fetched once and refreshed on key rotation.
+        """
+        content, signature = self._signed_event('1')
+        self.verifier.parse(content, signature)
+        self.assertEqual(self.mock_fetch_public_key.call_count, 1)
+
+        # Stark Bank rotates its key
+        self.private_key = PrivateKey()
+        self.public_key_pem = self.private_key.publicKey().toPem()
+        content, signature = self._signed_event('2')
+
+        event = self.verifier.parse(content, signature)
+
+        self.assertEqual(event.id, '2')
+        self.assertEqual(self.mock_fetch_public_key.call_count, 2)
+
+    @patch('starkbank_webhook_test.auth.signature_verifier.time')
+    def test_public_key_expires_after_ttl(self, mock_time):
+        """
+        Test that the public key is fetched again after its TTL.
+        """
+        mock_time.monotonic.return_value = 0
+        self.verifier.public_key()
+        mock_time.monotonic.return_value = 3599
+        self.verifier.public_key()
+        self.assertEqual(self.mock_fetch_public_key.call_count, 1)
+
+        mock_time.monotonic.return_value = 3600
+        self.verifier.public_key()
+        self.assertEqual(self.mock_fetch_public_key.call_count, 2)
+
+    def test_memoized_events_are_bounded(self):
+        """
+        Test that the least recently used events are evicted.
+        """
+        self.verifier.cache_size = 2
+        for event_id in ('1', '2', '3'):
+            self.verifier.parse(*self._signed_event(event_id))
+
+        self.assertEqual(len(self.verifier._events), 2)
+
+    def test_parse_batch_on_process_pool(self):
+        """
+        Test that a batch is verified on the process pool, keeping the order.
+        """
+        self.verifier.processes = 2
+        items = [self._signed_event(str(i)) for i in range(6)]
+        items[3] = (items[3][0], self._signed_event('other')[1])
+
+        results = self.verifier.parse_batch(items)
+
+        self.assertEqual(
+            [result.id for i, result in enumerate(results) if i != 3],
+            ['0', '1', '2', '4', '5'],
+        )
+        self.assertIsInstance(results[3], InvalidSignatureError)
+
+    def test_public_key_pem_is_parsed_once_per_process(self):
+        """
+        Test that the items of a worker reuse the parsed public key.
+        """
+        signature_verifier._load_public_key.cache_clear()
+        self.addCleanup(signature_verifier._load_public_key.cache_clear)
+        items = [self._signed_event(str(i)) for i in range(3)]
+
+        with patch.object(
+            signature_verifier.PublicKey,
+            'fromPem',
+            wraps=signature_verifier.PublicKey.fromPem,
+        ) as mock_from_pem:
+            for content, signature in items:
+                self.assertTrue(
+                    signature_verifier._verify_signature(
+                        content, signature, self.public_key_pem
+                    )
+                )
+
+        mock_from_pem.assert_called_once_with(self.public_key_pem)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -230,7 +230,7 @@ class TestStarkbankIntegration(unittest.TestCase):
         self, mock_sleep, mock_issue_single_invoice
     ):
         # Mock _issue_single_invoice
-        mock_issue_single_invoice.return_value = Mock()
+        mock_issue_single_invoice.return_value = [Mock()]
 
         integration = StarkbankIntegration(
             environment=self.valid_environment,
@@ -247,13 +247,195 @@ class TestStarkbankIntegration(unittest.TestCase):
         # Check if _issue_single_invoice was called 5 times
         assert mock_issue_single_invoice.call_count == 5
 
-    @patch('starkbank_webhook_test.starkbank_integration.requests')
-    def test_listen_webhook_events_success(self, mock_requests):
-        # Mock the requests.get method
+    @patch('starkbank.invoice.create')
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._generate_random_invoice_data',
+        autospec=True,
+    )
+    def test_issue_invoices_in_batches_success(
+        self, mock_generate_data, mock_create
+    ):
+        mock_generate_data.return_value = {
+            'amount': 5000,
+            'taxId': '012.345.678-90',
+            'name': 'John Doe',
+        }
+        mock_create.side_effect = lambda invoices, user: invoices
+
+        integration = StarkbankIntegration(
+            environment=self.valid_environment,
+            id=self.valid_id,
+            private_key=self.valid_private_key,
+            auth_type=self.valid_auth_type,
+            webhook_url=self.valid_webhook_url,
+        )
+
+        results = integration.issue_invoices_in_batches(250, batch_size=100)
+
+        # 250 invoices must be sent in 3 requests of 100, 100 and 50
+        self.assertEqual(mock_create.call_count, 3)
+        self.assertEqual([r.size for r in results], [100, 100, 50])
+        self.assertTrue(all(r.succeeded for r in results))
+
+    @patch('starkbank.invoice.create')
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._find_invoices',
+        return_value=[],
+    )
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._generate_random_invoice_data',
+        autospec=True,
+    )
+    def test_issue_invoices_in_batches_retries_failed_chunk_only(
+        self, mock_generate_data, mock_find, mock_create
+    ):
+        mock_generate_data.return_value = {
+            'amount': 5000,
+            'taxId': '012.345.678-90',
+            'name': 'John Doe',
+        }
+        # The second chunk fails once and succeeds on the retry
+        mock_create.side_effect = [
+            ['first'],
+            Exception('Internal server error'),
+            ['second'],
+        ]
+
+        integration = StarkbankIntegration(
+            environment=self.valid_environment,
+            id=self.valid_id,
+            private_key=self.valid_private_key,
+            auth_type=self.valid_auth_type,
+            webhook_url=self.valid_webhook_url,
+        )
+
+        results = integration.issue_invoices_in_batches(
+            2, batch_size=1, retry_delay=0.001
+        )
+
+        self.assertEqual(mock_create.call_count, 3)
+        mock_find.assert_called_once()
+        self.assertEqual([r.attempts for r in results], [1, 2])
+        self.assertEqual(results[1].invoices, ['second'])
+        self.assertTrue(all(r.succeeded for r in results))
+
+    @patch('starkbank.invoice.create', side_effect=Exception('API down'))
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._find_invoices',
+        return_value=[],
+    )
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._generate_random_invoice_data',
+        autospec=True,
+    )
+    def test_issue_invoices_in_batches_failure(
+        self, mock_generate_data, mock_find, mock_create
+    ):
+        mock_generate_data.return_value = {
+            'amount': 5000,
+            'taxId': '012.345.678-90',
+            'name': 'John Doe',
+        }
+
+        integration = StarkbankIntegration(
+            environment=self.valid_environment,
+            id=self.valid_id,
+            private_key=self.valid_private_key,
+            auth_type=self.valid_auth_type,
+            webhook_url=self.valid_webhook_url,
+        )
+
+        results = integration.issue_invoices_in_batches(
+            3, batch_size=100, max_retries=2, retry_delay=0.001
+        )
+
+        self.assertEqual(mock_create.call_count, 3)
+        self.assertFalse(results[0].succeeded)
+        self.assertIsInstance(results[0].error, StarkbankIntegrationError)
+
+    @patch('starkbank.invoice.create', side_effect=TimeoutError('timeout'))
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._find_invoices',
+    )
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.StarkbankIntegration._generate_random_invoice_data',
+        autospec=True,
+    )
+    def test_issue_invoices_in_batches_finds_timed_out_chunk(
+        self, mock_generate_data, mock_find, mock_create
+    ):
+        """
+        Test that a chunk created by a timed out request is not sent again.
+        """
+        mock_generate_data.return_value = {
+            'amount': 5000,
+            'taxId': '012.345.678-90',
+            'name': 'John Doe',
+            'tags': ['coffee'],
+        }
+        mock_find.side_effect = lambda tags: ['created']
+
+        integration = StarkbankIntegration(
+            environment=self.valid_environment,
+            id=self.valid_id,
+            private_key=self.valid_private_key,
+            auth_type=self.valid_auth_type,
+            webhook_url=self.valid_webhook_url,
+        )
+
+        results = integration.issue_invoices_in_batches(
+            2, batch_size=100, retry_delay=0.001
+        )
+
+        mock_create.assert_called_once()
+        (chunk_tag,) = mock_find.call_args.args[0]
+        self.assertTrue(chunk_tag.startswith('chunk-'))
+        invoices = mock_create.call_args.args[0]
+        self.assertTrue(
+            all(invoice.tags == ['coffee', chunk_tag] for invoice in invoices)
+        )
+        self.assertTrue(results[0].succeeded)
+        self.assertEqual(results[0].invoices, ['created'])
+
+    def test_build_invoice_sends_optional_fields(self):
+        """
+        Test that the generated optional fields are set on the invoice.
+        """
+        integration = StarkbankIntegration(
+            environment=self.valid_environment,
+            id=self.valid_id,
+            private_key=self.valid_private_key,
+            auth_type=self.valid_auth_type,
+            webhook_url=self.valid_webhook_url,
+        )
+
+        invoice = integration._build_invoice(
+            {
+                'amount': 5000,
+                'taxId': '012.345.678-90',
+                'name': 'John Doe',
+                'fine': 2.5,
+                'expiration': 3600,
+                'tags': ['coffee'],
+                'descriptions': [{'key': 'Coffee', 'value': 'BRL10.0'}],
+            }
+        )
+
+        self.assertEqual(invoice.fine, 2.5)
+        self.assertEqual(invoice.expiration.total_seconds(), 3600)
+        self.assertEqual(invoice.tags, ['coffee'])
+        self.assertEqual(len(invoice.descriptions), 1)
+
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.ConnectionPool.get',
+        autospec=True,
+    )
+    def test_listen_webhook_events_success(self, mock_get):
+        # Mock the ConnectionPool.get method
         mock_response = Mock()
-        mock_response.data = b'{"subscription": "invoice"}'
+        mock_response.content = b'{"subscription": "invoice"}'
         mock_response.headers = {'Digital-Signature': 'valid_signature'}
-        mock_requests.get.return_value = mock_response
+        mock_get.return_value = mock_response
 
         integration = StarkbankIntegration(
             environment='sandbox',
@@ -269,13 +451,18 @@ class TestStarkbankIntegration(unittest.TestCase):
         # Check if the method returned the expected result
         self.assertEqual(response, mock_response)
 
-        # Check if requests.get was called with the correct URL
-        mock_requests.get.assert_called_with('http://example.com/webhook')
+        # Check if the pooled session was called with the correct URL
+        mock_get.assert_called_with(
+            integration.connection_pool,
+            'http://example.com/webhook',
+            stream=True,
+        )
 
-    @patch('requests.get', side_effect=Exception('Request error'))
-    def test_listen_webhook_events_failure(self, mock_requests):
-        # Mock the requests.get method to simulate a request exception
-        mock_requests.get.side_effect = Exception('Request error')
+    @patch(
+        'starkbank_webhook_test.starkbank_integration.ConnectionPool.get',
+        side_effect=Exception('Request error'),
+    )
+    def test_listen_webhook_events_failure(self, mock_get):
 
         integration = StarkbankIntegration(
             environment='sandbox',
@@ -303,11 +490,12 @@ class TestStarkbankIntegration(unittest.TestCase):
     ):
         # Mock the event.parse method
         mock_event_instance = Mock(subscription='invoice')
+        mock_event_instance.log.type = 'credited'
         mock_event.parse.return_value = mock_event_instance
 
         # Create a mock response object
         mock_response = Mock()
-        mock_response.data.decode.return_value = 'mock_response_data'
+        mock_response.content.decode.return_value = 'mock_response_data'
         mock_response.headers = {'Digital-Signature': 'mock_signature'}
 
         # Call the method with the mock response
@@ -323,6 +511,7 @@ class TestStarkbankIntegration(unittest.TestCase):
 
         # Check if _process_invoice_credit method was called
         mock_process_invoice_credit.assert_called_with(mock_event_instance)
+        mock_response.close.assert_called_once()
 
     @patch('starkbank.Event')
     def test_process_webhook_events_failure(self, mock_event):
@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from starkbank_webhook_test.supervisor import ServiceSupervisor
+
+
+def crashing_service():
+    sys.exit(1)
+
+
+def finishing_service():
+    pass
+
+
+def long_running_service():
+    time.sleep(60)
+
+
+class TestServiceSupervisor(unittest.TestCase):
+    """
+    Unit test case for the ServiceSupervisor class.
+    """
+
+    def _wait_until(self, supervisor, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            supervisor.check()
+            time.sleep(0.01)
+
+    def test_crashed_workers_are_restarted(self):
+        """
+        Test that a worker exiting with an error is restarted.
+        """
+        supervisor = ServiceSupervisor(restart_delay=0)
+        supervisor.add_service('crashing', crashing_service, workers=2)
+        supervisor.start()
+        self.addCleanup(supervisor.stop)
+
+        self._wait_until(
+            supervisor,
+            lambda: all(worker.restarts >= 2 for worker in supervisor.workers),
+        )
+
+        self.assertTrue(
+            all(worker.restarts >= 2 for worker in supervisor.workers)
+        )
+        self.assertFalse(any(worker.finished for worker in supervisor.workers))
+
+    def test_restart_delay_backs_off(self):
+        """
+        Test that a crashing worker waits longer before each restart.
+        """
+        supervisor = ServiceSupervisor(restart_delay=60)
+        supervisor.add_service('crashing', crashing_service)
+        supervisor.start()
+        self.addCleanup(supervisor.stop)
+
+        worker = supervisor.workers[0]
+        self._wait_until(supervisor, lambda: worker.next_start)
+
+        self.assertEqual(worker.restarts, 0)
+        self.assertGreater(worker.next_start - time.monotonic(), 50)
+
+    def test_restarts_reset_after_stable_run(self):
+        """
+        Test that a worker crashing after a stable run restarts without delay.
+        """
+        supervisor = ServiceSupervisor(restart_delay=60, stable_after=0)
+        supervisor.add_service('crashing', crashing_service)
+        supervisor.start()
+        self.addCleanup(supervisor.stop)
+
+        worker = supervisor.workers[0]
+        worker.restarts = 5
+        self._wait_until(supervisor, lambda: worker.next_start)
+
+        self.assertEqual(worker.restarts, 0)
+        self.assertLess(worker.next_start - time.monotonic(), 61)
+
+    def test_finished_workers_are_not_restarted(self):
+        """
+        Test that the supervisor ends when every worker finishes cleanly.
+        """
+        supervisor = ServiceSupervisor(poll_interval=0.01)
+        supervisor.add_service('finishing', finishing_service, workers=3)
+
+        supervisor.run()
+
+        self.assertTrue(all(worker.finished for worker in supervisor.workers))
+        self.assertTrue(
+            all(worker.restarts == 0 for worker in supervisor.workers)
+        )
+
+    def test_stop_terminates_workers(self):
+        """
+        Test that stopping the supervisor stops the running workers cleanly.
+        """
+        supervisor = ServiceSupervisor()
+        supervisor.add_service('long_running', long_running_service, workers=2)
+        supervisor.start()
+        # Let the workers install their signal handlers
+        time.sleep(0.2)
+
+        supervisor.stop()
+
+        for worker in supervisor.workers:
+            self.assertFalse(worker.process.is_alive())
+            self.assertEqual(worker.process.exitcode, 0)
+
+    def test_load_workers(self):
+        """
+        Test reading the number of workers from a settings file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            settings_file_path = os.path.join(directory, 'settings.json')
+            with open(settings_file_path, 'w') as settings_file:
+                json.dump({'workers': 4, 'params': {}}, settings_file)
+
+            self.assertEqual(
+                ServiceSupervisor.load_workers(settings_file_path), 4
+            )
+
+            with open(settings_file_path, 'w') as settings_file:
+                json.dump({'params': {}}, settings_file)
+
+            self.assertEqual(
+                ServiceSupervisor.load_workers(settings_file_path), 1
+            )
+
+            with open(settings_file_path, 'w') as settings_file:
+                json.dump({'workers': -1}, settings_file)
+
+            with self.assertRaises(ValueError):
+                ServiceSupervisor.load_workers(settings_file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from starkbank.error import InputErrors
+
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+from starkbank_webhook_test.transfers.batcher import TransferBatcher
+
+
+class TestTransferBatcher(unittest.TestCase):
+    """
+    Unit test case for the TransferBatcher class.
+    """
+
+    def test_init_invalid_parameters(self):
+        """
+        Test failure during initialization with invalid parameters.
+        """
+        with self.assertRaises(ValueError):
+            TransferBatcher(Mock(), max_items=0)
+        with self.assertRaises(ValueError):
+            TransferBatcher(Mock(), max_wait=-1)
+
+    def test_flush_when_batch_is_full(self):
+        """
+        Test that a full batch is sent without waiting for max_wait.
+        """
+        create_transfers = Mock(side_effect=lambda transfers: transfers)
+        batcher = TransferBatcher(create_transfers, max_items=3, max_wait=60)
+        self.addCleanup(batcher.close)
+
+        futures = [batcher.submit(amount) for amount in range(6)]
+        results = [future.result(timeout=1) for future in futures]
+
+        self.assertEqual(results, list(range(6)))
+        self.assertEqual(create_transfers.call_count, 2)
+        create_transfers.assert_called_with([3, 4, 5])
+
+    def test_flush_after_max_wait(self):
+        """
+        Test that an incomplete batch is sent after max_wait.
+        """
+        create_transfers = Mock(side_effect=lambda transfers: transfers)
+        batcher = TransferBatcher(
+            create_transfers, max_items=100, max_wait=0.05
+        )
+        self.addCleanup(batcher.close)
+
+        start = time.monotonic()
+        futures = [batcher.submit(amount) for amount in range(3)]
+        for future in futures:
+            future.result(timeout=1)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        create_transfers.assert_called_once_with([0, 1, 2])
+
+    def test_close_sends_pending_transfers(self):
+        """
+        Test that closing the batcher sends the pending transfers.
+        """
+        create_transfers = Mock(side_effect=lambda transfers: transfers)
+        batcher = TransferBatcher(create_transfers, max_items=100, max_wait=60)
+
+        future = batcher.submit(10)
+        batcher.close()
+
+        self.assertEqual(future.result(timeout=0), 10)
+        with self.assertRaises(RuntimeError):
+            batcher.submit(20)
+
+    def test_input_errors_are_isolated_per_item(self):
+        """
+        Test that a rejected batch is re-sent one transfer at a time.
+        """
+        release = threading.Event()
+
+        def create_transfers(transfers):
+            release.wait(1)
+            if -1 in transfers:
+                raise InputErrors(
+                    [{'code': 'invalidAmount', 'message': 'Invalid amount'}]
+                )
+            return transfers
+
+        batcher = TransferBatcher(create_transfers, max_items=3, max_wait=60)
+        self.addCleanup(batcher.close)
+
+        futures = [batcher.submit(amount) for amount in (1, -1, 2)]
+        release.set()
+
+        self.assertEqual(futures[0].result(timeout=1), 1)
+        self.assertIsInstance(futures[1].exception(timeout=1), InputErrors)
+        self.assertEqual(futures[2].result(timeout=1), 2)
+
+    def test_request_error_fails_whole_batch(self):
+        """
+        Test that an unexpected request error fails every transfer of the batch.
+        """
+        create_transfers = Mock(side_effect=Exception('Internal error'))
+        batcher = TransferBatcher(create_transfers, max_items=2, max_wait=60)
+        self.addCleanup(batcher.close)
+
+        futures = [batcher.submit(amount) for amount in range(2)]
+
+        for future in futures:
+            self.assertEqual(
+                str(future.exception(timeout=1)), 'Internal error'
+            )
+        create_transfers.assert_called_once()
+
+    @patch('starkbank.transfer.create')
+    def test_integration_batches_paid_invoices(self, mock_create):
+        """
+        Test that paid invoices are transferred in a single request.
+        """
+        mock_create.side_effect = lambda transfers, user: transfers
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        integration.enable_transfer_batching(max_items=5, max_wait=60)
+        futures = []
+        submit_transfer = integration._submit_transfer
+
+        def capture_future(*args):
+            futures.append(submit_transfer(*args))
+            return futures[-1]
+
+        with patch.object(
+            integration, '_submit_transfer', side_effect=capture_future
+        ):
+            for amount in range(5):
+                event = Mock()
+                event.log.invoice.id = f'{amount}'
+                event.log.invoice.status = 'paid'
+                event.log.invoice.amount = 1000 + amount
+                event.log.invoice.fee = 10
+                integration._process_invoice_credit(event)
+        integration.disable_transfer_batching()
+
+        mock_create.assert_called_once()
+        transfers = mock_create.call_args.args[0]
+        self.assertEqual(
+            [t.amount for t in transfers], [990, 991, 992, 993, 994]
+        )
+        self.assertEqual(
+            [t.external_id for t in transfers],
+            [f'invoice-{amount}' for amount in range(5)],
+        )
+        self.assertEqual(len(futures), 5)
+        self.assertEqual(
+            [future.result(timeout=1) for future in futures], transfers
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from starkbank.error import InputErrors
+
+from starkbank_webhook_test.starkbank_integration import StarkbankIntegration
+from starkbank_webhook_test.transfers.outbox import TransferOutbox
+
+
+def build_transfer(amount, external_id):
+    return SimpleNamespace(amount=amount, external_id=external_id)
+
+
+def created(transfers):
+    return [
+        SimpleNamespace(
+            id=f'transfer-{transfer.external_id}',
+            amount=transfer.amount,
+            external_id=transfer.external_id,
+        )
+        for transfer in transfers
+    ]
+
+
+class TestTransferOutbox(unittest.TestCase):
+    """
+    Unit test case for the TransferOutbox class.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary outbox database path.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'state/outbox.sqlite3')
+
+    def _outbox(self, create_transfers, **kwargs):
+        kwargs.setdefault('path', self.path)
+        outbox = TransferOutbox(build_transfer, create_transfers, **kwargs)
+        self.addCleanup(outbox.close)
+        return outbox
+
+    def _wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_transfers_are_sent_in_batches(self):
+        """
+        Test that the added transfers are sent once, in batches.
+        """
+        create_transfers = Mock(side_effect=created)
+        outbox = self._outbox(create_transfers, batch_size=2, interval=60)
+
+        self.assertTrue(outbox.add('invoice-1', 990))
+        self.assertFalse(outbox.add('invoice-1', 990))
+        outbox.add('invoice-2', 1990)
+        outbox.add('invoice-3', 2990)
+        self._wait_for(lambda: outbox.depth == 0)
+
+        self.assertEqual(outbox.stats()['sent'], 3)
+        self.assertEqual(
+            outbox.status('invoice-2'), ('sent', 'transfer-invoice-2')
+        )
+        sent = [
+            transfer.external_id
+            for call in create_transfers.call_args_list
+            for transfer in call.args[0]
+        ]
+        self.assertEqual(sorted(sent), ['invoice-1', 'invoice-2', 'invoice-3'])
+
+    def test_reconcile_after_crash(self):
+        """
+        Test that the transfers left 'sending' are found or sent again.
+        """
+        self._outbox(Mock()).close()
+        connection = sqlite3.connect(self.path)
+        connection.executemany(
+            'INSERT INTO transfers (external_id, amount, status, attempts, '
+            "next_attempt_at, created_at) VALUES (?, ?, 'sending', 1, 0, 0)",
+            [('invoice-1', 990), ('invoice-2', 1990)],
+        )
+        connection.commit()
+        connection.close()
+
+        find_transfers = Mock(
+            side_effect=lambda ids: created([build_transfer(990, 'invoice-1')])
+        )
+        create_transfers = Mock(side_effect=created)
+        outbox = self._outbox(
+            create_transfers, find_transfers=find_transfers, interval=0.01
+        )
+        self._wait_for(lambda: outbox.depth == 0)
+
+        find_transfers.assert_called_once()
+        self.assertEqual(
+            outbox.status('invoice-1'), ('sent', 'transfer-invoice-1')
+        )
+        create_transfers.assert_called_once()
+        self.assertEqual(
+            [t.external_id for t in create_transfers.call_args.args[0]],
+            ['invoice-2'],
+        )
+
+    def test_pending_transfers_survive_restart(self):
+        """
+        Test that transfers not sent before closing are sent on the next start.
+        """
+        outbox = self._outbox(
+            Mock(side_effect=Exception('API down')), max_attempts=5
+        )
+        outbox.add('invoice-1', 990)
+        outbox.close()
+
+        create_transfers = Mock(side_effect=created)
+        connection = sqlite3.connect(self.path)
+        connection.execute('UPDATE transfers SET next_attempt_at = 0')
+        connection.commit()
+        connection.close()
+
+        outbox = self._outbox(create_transfers, interval=0.01)
+        self._wait_for(lambda: outbox.depth == 0)
+
+        self.assertEqual(outbox.status('invoice-1')[0], 'sent')
+
+    def test_failed_transfers(self):
+        """
+        Test the retries of request errors and the rejected transfers.
+        """
+        rejected = InputErrors([dict(code='invalidAmount', message='bad')])
+
+        def create_transfers(transfers):
+            if any(t.external_id == 'invoice-bad' for t in transfers):
+                raise rejected
+            return created(transfers)
+
+        outbox = self._outbox(create_transfers, interval=0.01)
+        outbox.add('invoice-1', 990)
+        outbox.add('invoice-bad', -1)
+        self._wait_for(lambda: outbox.depth == 0)
+
+        self.assertEqual(outbox.status('invoice-1')[0], 'sent')
+        self.assertEqual(outbox.status('invoice-bad')[0], 'failed')
+
+        failing = self._outbox(
+            Mock(side_effect=Exception('API down')),
+            interval=0.01,
+            max_attempts=2,
+            path=':memory:',
+        )
+        failing.add('invoice-2', 990)
+        self._wait_for(lambda: failing.depth == 0)
+
+        self.assertEqual(failing.stats()['failed'], 1)
+
+    def test_transfers_created_by_a_failed_request(self):
+        """
+        Test that a retried transfer already created is not sent again.
+        """
+        server = {}
+
+        def create_transfers(transfers):
+            if server:
+                raise InputErrors(
+                    [dict(code='invalidExternalId', message='already used')]
+                )
+            server.update((t.external_id, t) for t in created(transfers))
+            raise TimeoutError('timeout')
+
+        def find_transfers(external_ids):
+            return [server[id] for id in external_ids if id in server]
+
+        for find in (find_transfers, None):
+            with self.subTest(find_transfers=find):
+                server.clear()
+                create = Mock(side_effect=create_transfers)
+                outbox = self._outbox(
+                    create,
+                    find_transfers=find,
+                    interval=0.01,
+                    path=':memory:',
+                )
+                outbox.add('invoice-1', 990)
+                self._wait_for(lambda: outbox.depth == 0)
+
+                self.assertEqual(outbox.stats()['sent'], 1)
+                if find is None:
+                    self.assertEqual(create.call_count, 2)
+                    self.assertEqual(
+                        outbox.status('invoice-1'), ('sent', None)
+                    )
+                else:
+                    create.assert_called_once()
+                    self.assertEqual(
+                        outbox.status('invoice-1'),
+                        ('sent', 'transfer-invoice-1'),
+                    )
+
+    def test_invalid_parameters(self):
+        """
+        Test failure during initialization with invalid parameters.
+        """
+        for kwargs in ({'batch_size': 0}, {'interval': 0}):
+            with self.assertRaises(ValueError):
+                TransferOutbox(build_transfer, Mock(), **kwargs)
+
+    @patch('starkbank.transfer.create')
+    def test_integration_queues_paid_invoices(self, mock_create):
+        """
+        Test that paid invoices are transferred through the outbox.
+        """
+        mock_create.side_effect = lambda transfers, user: transfers
+        integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        integration.enable_transfer_outbox(path=self.path, interval=60)
+
+        event = Mock()
+        event.log.invoice.id = '42'
+        event.log.invoice.status = 'paid'
+        event.log.invoice.amount = 1000
+        event.log.invoice.fee = 10
+        integration._process_invoice_credit(event)
+        integration.disable_transfer_outbox()
+
+        transfer = mock_create.call_args.args[0][0]
+        self.assertEqual(transfer.amount, 990)
+        self.assertEqual(transfer.external_id, 'invoice-42')
+        self.assertEqual(transfer.tags, ['invoice-42'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import starkbank
+from ellipticcurve import PrivateKey
+
+from starkbank_webhook_test.mock_api.server import MockStarkbankServer
+from starkbank_webhook_test.network.connection_pool import ConnectionPool
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegration,
+    StarkbankIntegrationError,
+)
+from starkbank_webhook_test.transfers.tracker import TransferTracker
+
+
+class FakeTransfers:
+    """
+    Pages of transfers filtered by ID, with an offset cursor.
+    """
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.calls = []
+
+    def page(self, ids, cursor, limit):
+        self.calls.append(list(ids))
+        offset = int(cursor or 0)
+        transfers = [
+            SimpleNamespace(id=id, status=self.statuses[id])
+            for id in ids
+            if id in self.statuses
+        ]
+        end = offset + limit
+        return (
+            transfers[offset:end],
+            str(end) if end < len(transfers) else None,
+        )
+
+
+class TestTransferTracker(unittest.TestCase):
+    """
+    Unit test case for the TransferTracker class.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary tracker database path.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'tracker.sqlite3')
+
+    def _tracker(self, page_transfers=None, **kwargs):
+        kwargs.setdefault('path', self.path)
+        tracker = TransferTracker(page_transfers, **kwargs)
+        self.addCleanup(tracker.close)
+        return tracker
+
+    def test_statuses_are_indexed_and_persisted(self):
+        """
+        Test the lookups, the ignored late statuses and the reload.
+        """
+        tracker = self._tracker()
+        tracker.record('invoice-1', 'transfer-1')
+        tracker.record('invoice-2', 'transfer-2')
+
+        self.assertTrue(tracker.update('transfer-1', 'success'))
+        self.assertFalse(tracker.update('transfer-1', 'processing'))
+        self.assertFalse(tracker.update('transfer-3', 'success'))
+
+        self.assertEqual(
+            tracker.lookup('invoice-1'), ('transfer-1', 'success')
+        )
+        self.assertTrue(tracker.paid_out('invoice-1'))
+        self.assertFalse(tracker.paid_out('invoice-2'))
+        self.assertIsNone(tracker.lookup('invoice-3'))
+        self.assertEqual(tracker.invoice('transfer-2'), 'invoice-2')
+        self.assertEqual(tracker.pending(), ['transfer-2'])
+        tracker.close()
+
+        tracker = self._tracker()
+        self.assertEqual(len(tracker), 2)
+        self.assertEqual(tracker.stats(), {'success': 1, 'created': 1})
+
+    def test_reconcile_in_pages(self):
+        """
+        Test that the pending transfers are queried in pages of IDs.
+        """
+        transfers = FakeTransfers(
+            {f'transfer-{index}': 'success' for index in range(5)}
+        )
+        transfers.statuses['transfer-5'] = 'processing'
+        tracker = self._tracker(transfers.page, page_size=2)
+        for index in range(7):
+            tracker.record(f'invoice-{index}', f'transfer-{index}')
+        tracker.update('transfer-0', 'failed')
+
+        updated = tracker.reconcile()
+
+        self.assertEqual(updated, 5)
+        self.assertEqual([len(ids) for ids in transfers.calls], [2, 2, 2])
+        self.assertEqual(tracker.lookup('invoice-0'), ('transfer-0', 'failed'))
+        self.assertEqual(
+            sorted(tracker.pending()), ['transfer-5', 'transfer-6']
+        )
+
+    def test_periodic_reconciliation(self):
+        """
+        Test that the background thread reconciles every interval.
+        """
+        transfers = FakeTransfers({'transfer-1': 'success'})
+        tracker = self._tracker(transfers.page, interval=0.01)
+        tracker.record('invoice-1', 'transfer-1')
+
+        deadline = time.monotonic() + 5
+        while not tracker.paid_out('invoice-1'):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_invalid_parameters(self):
+        """
+        Test failure during initialization with invalid parameters.
+        """
+        for kwargs in (
+            {'page_size': 0},
+            {'page_size': 101},
+            {'interval': 0},
+            {'interval': 1, 'page_transfers': None},
+        ):
+            with self.assertRaises(ValueError):
+                TransferTracker(**dict({'page_transfers': Mock()}, **kwargs))
+
+    def test_integration_tracks_payouts(self):
+        """
+        Test that the integration tracks the transfers of the paid invoices.
+        """
+        server = MockStarkbankServer(payment_rate=0)
+        server.start()
+        self.addCleanup(server.stop)
+        pool = ConnectionPool(retries=0, base_url=server.url)
+        pool.install_sdk()
+        self.addCleanup(ConnectionPool.uninstall_sdk)
+        self.addCleanup(pool.close)
+        integration = StarkbankIntegration(
+            'sandbox',
+            '5656565656565656',
+            PrivateKey().toPem(),
+            'project',
+            'https://example.com/webhook',
+            connection_pool=pool,
+        )
+        integration.user = starkbank.Project(
+            environment='sandbox',
+            id='5656565656565656',
+            private_key=PrivateKey().toPem(),
+        )
+        with self.assertRaises(StarkbankIntegrationError):
+            integration.transfer_status('1')
+
+        integration.enable_transfer_tracking(path=self.path, interval=None)
+        self.addCleanup(integration.disable_transfer_tracking)
+        invoice = {'amount': 1000, 'taxId': '012.345.678-90', 'name': 'Iron'}
+        pool.post(
+            'https://sandbox.api.starkbank.com/v2/invoice',
+            json={'invoices': [invoice] * 3},
+        )
+        invoice_ids = list(server.invoices)
+        for invoice_id in invoice_ids:
+            server._pay_invoice(invoice_id)
+        integration.catch_up_events(
+            path=os.path.join(os.path.dirname(self.path), 'catch_up.json')
+        )
+
+        transfer_ids = {}
+        for invoice_id in invoice_ids:
+            transfer_id, status = integration.transfer_status(invoice_id)
+            self.assertEqual(status, 'created')
+            self.assertEqual(
+                server.transfers[transfer_id]['externalId'],
+                f'invoice-{invoice_id}',
+            )
+            transfer_ids[invoice_id] = transfer_id
+
+        first, second, third = invoice_ids
+        server.transfers[transfer_ids[first]]['status'] = 'success'
+        server.transfers[transfer_ids[second]]['status'] = 'failed'
+        transfer_event = SimpleNamespace(
+            id='event-1',
+            subscription='transfer',
+            log=SimpleNamespace(
+                type='processing',
+                errors=[],
+                transfer=SimpleNamespace(
+                    id=transfer_ids[third], status='processing'
+                ),
+            ),
+        )
+        integration.dispatch_event(transfer_event)
+
+        self.assertEqual(integration.transfer_tracker.reconcile(), 2)
+        self.assertEqual(integration.transfer_status(first)[1], 'success')
+        self.assertEqual(integration.transfer_status(second)[1], 'failed')
+        self.assertEqual(integration.transfer_status(third)[1], 'processing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+from ellipticcurve import Ecdsa, PrivateKey
+from requests.structures import CaseInsensitiveDict
+
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegration,
+    StarkbankIntegrationError,
+    WebhookEventError,
+)
+from starkbank_webhook_test.webhook.batch import (
+    BatchFormatError,
+    iter_signed_events,
+)
+
+
+def split(data: bytes, size: int):
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+class TestWebhookBatch(unittest.TestCase):
+    """
+    Unit test case for the batched webhook event ingestion.
+    """
+
+    def setUp(self):
+        """
+        Set up an integration verifying events with a local key pair.
+        """
+        self.private_key = PrivateKey()
+        process_patcher = patch.object(
+            StarkbankIntegration, '_process_invoice_credit'
+        )
+        self.mock_process = process_patcher.start()
+        self.addCleanup(process_patcher.stop)
+        self.integration = StarkbankIntegration(
+            environment='sandbox',
+            id='1234567890',
+            private_key='valid_private_key_content',
+            auth_type='project',
+            webhook_url='http://example.com/webhook',
+        )
+        self.integration.enable_signature_cache()
+        patcher = patch.object(
+            self.integration.signature_verifier,
+            '_fetch_public_key',
+            side_effect=lambda: self.private_key.publicKey().toPem(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.integration.disable_signature_cache)
+
+    def _signed_event(self, event_id, signature=None):
+        content = json.dumps(
+            {
+                'event': {
+                    'id': event_id,
+                    'subscription': 'invoice',
+                    'isDelivered': False,
+                    'created': '2023-12-08T12:00:00.000000+00:00',
+                    'log': {
+                        'id': f'log-{event_id}',
+                        'type': 'credited',
+                        'errors': [],
+                        'created': '2023-12-08T12:00:00.000000+00:00',
+                        'invoice': {
+                            'id': f'invoice-{event_id}',
+                            'amount': 1000,
+                            'fee': 10,
+                            'status': 'paid',
+                            'taxId': '012.345.678-90',
+                            'name': 'João Ninguém',
+                        },
+                    },
+                }
+            },
+            ensure_ascii=False,
+        )
+        if signature is None:
+            signature = Ecdsa.sign(content, self.private_key).toBase64()
+        return {'content': content, 'signature': signature}
+
+    def _response(self, body: str, headers=None):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(
+            headers or {'Content-Type': 'application/x-ndjson'}
+        )
+        response._content = body.encode('utf-8')
+        response._content_consumed = True
+        response.raw = Mock()
+        return response
+
+    def test_stream_parsing(self):
+        """
+        Test that JSON arrays and NDJSON are parsed across any chunk boundary.
+        """
+        items = [self._signed_event(str(index)) for index in range(3)]
+        expected = [(item['content'], item['signature']) for item in items]
+        bodies = [
+            json.dumps(items, ensure_ascii=False),
+            '\n'.join(json.dumps(i, ensure_ascii=False) for i in items) + '\n',
+            '[]',
+        ]
+
+        for body in bodies:
+            for size in (1, 7, 4096):
+                with self.subTest(body=body[:10], size=size):
+                    events = list(
+                        iter_signed_events(split(body.encode('utf-8'), size))
+                    )
+                    self.assertEqual(events, expected if body != '[]' else [])
+
+    def test_malformed_batches(self):
+        """
+        Test failure when parsing malformed batches.
+        """
+        for body in (
+            b'[{"content": "{}", "signature": "s"},]',
+            b'[{"content": "{}", "signature": "s"}',
+            b'[{"content": "{}", "signature": "s"} {}]',
+            b'{"content": {}, "signature": "s"}',
+            b'[] []',
+            b'{"content": "{}", "signat',
+        ):
+            with self.subTest(body=body):
+                with self.assertRaises(BatchFormatError):
+                    list(iter_signed_events([body]))
+
+    def test_single_event_response(self):
+        """
+        Test that a signed single event response is dispatched and closed.
+        """
+        item = self._signed_event('1')
+        response = self._response(
+            item['content'], headers={'Digital-Signature': item['signature']}
+        )
+
+        dispatched = self.integration.process_webhook_events(response)
+
+        self.assertEqual(dispatched, 1)
+        self.assertEqual(self.mock_process.call_args.args[0].id, '1')
+        response.raw.release_conn.assert_called_once()
+
+    def test_batch_is_dispatched_in_order(self):
+        """
+        Test that a batch of events is verified and dispatched in order.
+        """
+        items = [self._signed_event(str(index)) for index in range(300)]
+        body = '\n'.join(json.dumps(item) for item in items)
+
+        response = self._response(body)
+
+        dispatched = self.integration.process_webhook_events(response)
+
+        self.assertEqual(dispatched, 300)
+        response.raw.release_conn.assert_called_once()
+        self.assertEqual(
+            [call.args[0].id for call in self.mock_process.call_args_list],
+            [str(index) for index in range(300)],
+        )
+
+    def test_invalid_events_do_not_stop_the_batch(self):
+        """
+        Test that the valid events are dispatched when others are rejected.
+        """
+        forged = self._signed_event(
+            '2', signature=self._signed_event('3')['signature']
+        )
+        items = [self._signed_event('1'), forged, self._signed_event('3')]
+
+        with self.assertRaises(StarkbankIntegrationError) as context:
+            self.integration.process_webhook_events(
+                self._response(json.dumps(items))
+            )
+
+        self.assertIsInstance(context.exception, WebhookEventError)
+        self.assertIn('Rejected: 1', str(context.exception))
+        self.assertEqual(
+            [call.args[0].id for call in self.mock_process.call_args_list],
+            ['1', '3'],
+        )
+
+    def test_malformed_batch_error(self):
+        """
+        Test that the events before a malformed item are still dispatched.
+        """
+        body = json.dumps(self._signed_event('1')) + '\n{"content": 1}\n'
+
+        with self.assertRaises(StarkbankIntegrationError) as context:
+            self.integration.process_webhook_events(self._response(body))
+
+        self.assertIn(
+            'Invalid webhook batch after 1 events', str(context.exception)
+        )
+        self.mock_process.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import asyncio
+import unittest
+from concurrent.futures import Future
+from unittest.mock import Mock, patch
+
+from starkbank.error import InvalidSignatureError
+
+from starkbank_webhook_test.starkbank_integration import (
+    StarkbankIntegrationError,
+)
+from starkbank_webhook_test.webhook.dispatcher import completed
+from starkbank_webhook_test.webhook.receiver import WebhookReceiver
+
+
+class TestWebhookReceiver(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit test case for the WebhookReceiver class.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Start a receiver on a free local port.
+        """
+        self.integration = Mock()
+        self.receiver = WebhookReceiver(
+            self.integration, host='127.0.0.1', port=0, path='/webhook'
+        )
+        patcher = patch.object(self.receiver, '_parse_event')
+        self.mock_parse_event = patcher.start()
+        self.addCleanup(patcher.stop)
+        await self.receiver.start()
+
+    async def asyncTearDown(self):
+        await self.receiver.stop()
+
+    async def _send(self, *requests):
+        """
+        Send raw requests on a single connection and return the status codes.
+        """
+        reader, writer = await asyncio.open_connection(
+            '127.0.0.1', self.receiver.port
+        )
+        statuses = []
+        for request in requests:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            statuses.append(int(status_line.split()[1]))
+            while (await reader.readline()) != b'\r\n':
+                pass
+        writer.close()
+        return statuses
+
+    def _callback(self, body=b'{"event": {}}', signature='valid_signature'):
+        headers = f'POST /webhook HTTP/1.1\r\nContent-Length: {len(body)}\r\n'
+        if signature:
+            headers += f'Digital-Signature: {signature}\r\n'
+        return (headers + '\r\n').encode() + body
+
+    async def test_callback_is_verified_and_dispatched(self):
+        """
+        Test that a valid callback is answered and its event dispatched.
+        """
+        event = Mock(subscription='invoice')
+        self.mock_parse_event.return_value = event
+
+        statuses = await self._send(self._callback(), self._callback())
+        await self.receiver.queue.join()
+
+        self.assertEqual(statuses, [200, 200])
+        self.mock_parse_event.assert_called_with(
+            '{"event": {}}', 'valid_signature'
+        )
+        self.assertEqual(self.integration.dispatch_event.call_count, 2)
+        self.integration.dispatch_event.assert_called_with(event)
+
+    async def test_callback_is_answered_once_handled(self):
+        """
+        Test that a callback is only acknowledged once its event is handled.
+        """
+        self.mock_parse_event.return_value = Mock(subscription='invoice')
+        transfer = Future()
+        self.integration.dispatch_event.side_effect = [
+            completed(transfer),
+            StarkbankIntegrationError('Transfer error'),
+        ]
+
+        sent = asyncio.create_task(self._send(self._callback()))
+        await asyncio.sleep(0.1)
+        self.assertFalse(sent.done())
+        transfer.set_result(Mock())
+
+        self.assertEqual(await sent, [200])
+        self.assertEqual(await self._send(self._callback()), [500])
+
+    async def test_invalid_signature_is_rejected(self):
+        """
+        Test that a callback with an invalid signature is not dispatched.
+        """
+        self.mock_parse_event.side_effect = InvalidSignatureError(
+            'The provided signature and content do not match'
+        )
+
+        statuses = await self._send(self._callback())
+
+        self.assertEqual(statuses, [401])
+        self.integration.dispatch_event.assert_not_called()
+
+    async def test_invalid_requests_are_rejected(self):
+        """
+        Test the responses to wrong methods, paths and missing signatures.
+        """
+        statuses = await self._send(
+            b'GET /webhook HTTP/1.1\r\n\r\n',
+            b'POST /other HTTP/1.1\r\nContent-Length: 0\r\n\r\n',
+            self._callback(signature=None),
+        )
+
+        self.assertEqual(statuses, [405, 404, 400])
+        self.mock_parse_event.assert_not_called()
+
+    async def test_full_queue_answers_service_unavailable(self):
+        """
+        Test that callbacks are refused while the event queue is full.
+        """
+        self.receiver.queue = asyncio.Queue(maxsize=1)
+        self.receiver.queue.put_nowait((Mock(), None))
+        self.mock_parse_event.return_value = Mock()
+
+        statuses = await self._send(self._callback())
+        self.receiver.queue.get_nowait()
+        self.receiver.queue.task_done()
+
+        self.assertEqual(statuses, [503])
+
+
+if __name__ == '__main__':
+    unittest.main()